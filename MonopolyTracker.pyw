@@ -14,32 +14,35 @@ from tkinter.messagebox import showwarning, showinfo, showerror, askyesno
 from ttkSimpleDialog.ttkSimpleDialog import askinteger, askstring
 
 import helpers
+from engine import GameSession
+from engine.history import History
+from engine.journal import Journal, has_saved_session, restore_session
+from engine.projection import Projection
 from helpers.gvars import *
 from models import *
+from models.events import *
 from models.exceptions import *
 
 
 def exc_hook(exc_class, message, traceback):
     """Global exception handler"""
-    helpers.write_error(exc_class, message, traceback)
+    error_log.log(exc_class, message, traceback)
     if exc_class is TclError:
         pass
-    elif exc_class in [AlreadyChosenValue, LimitReached, NotFound, PropertyAlreadyOwned, PropertyNotOwned,
-                       NotAuthorized, NoPaymentNeeded]:
+    elif issubclass(exc_class, helpers.EXPECTED_ERRORS):
         showerror(exc_class.__name__, message)
     else:
-        helpers.write_last_data(player_dict)
+        helpers.write_last_data(session.players)
         sys.__excepthook__(exc_class, message, traceback)
         graceful_exit()
 
 
 def error_handler(error):
     """Error handler that can be called"""
-    if type(error) in [AlreadyChosenValue, LimitReached, NotFound, PropertyAlreadyOwned, PropertyNotOwned,
-                       NotAuthorized, NoPaymentNeeded]:
+    if isinstance(error, helpers.EXPECTED_ERRORS):
         showerror(type(error).__name__, getattr(error, "message", getattr(error, "args", [repr(error)])[0]))
     else:
-        helpers.write_last_data(player_dict)
+        helpers.write_last_data(session.players)
         raise error
 
 
@@ -49,67 +52,57 @@ def bankrupt_err(player: Player):
             player.name, player.get_money(), abs(player.get_money()) + 1))
 
 
-def update_player_names(old_name: str, new_name: str):
-    """Update the names in the different functions of the program"""
-    global player_dict
-    unordered_player_dict = player_dict.copy()
-    for name, val in unordered_player_dict.items():
-        del player_dict[name]
-        if name == old_name:
-            player_dict[new_name] = val
-        else:
-            player_dict[name] = val
-    for widget in money_grid.winfo_children():
-        if type(widget) is ttk.Label:
-            player_name = widget.cget("text").split(":")[0]
-            if player_name == old_name:
-                widget.config(text="{}: {:,}".format(new_name, get_player(new_name).get_money()))
-    for widget in jail_grid.winfo_children():
-        if type(widget) is ttk.Label:
-            player_name = widget.cget("text").split(":")[0]
-            if player_name == old_name:
-                widget.config(text="{}: {}".format(new_name, get_player(new_name).in_jail))
-    player_selector.set_menu(new_name, *list(player_dict.keys()))
-    current_player.set(new_name)
-
-
-def update_money_grid():
-    for widget in money_grid.winfo_children():
-        if type(widget) is ttk.Label:
-            player_name = widget.cget("text").split(":")[0]
-            new_text = "{}: ${:,}".format(player_name, get_player(player_name).get_money())
-            widget.config(text=new_text)
-    for widget in networth_grid.winfo_children():
-        if type(widget) is ttk.Label:
-            player_name = widget.cget("text").split(":")[0]
-            new_text = "{}: ${:,}".format(player_name, get_player(player_name).get_networth())
-            widget.config(text=new_text)
-
-
-def update_jail_grid():
-    for widget in jail_grid.winfo_children():
-        if type(widget) is ttk.Label:
-            player_name = widget.cget("text").split(":")[0]
-            new_text = "{}: {}".format(player_name, get_player(player_name).in_jail)
-            widget.config(text=new_text)
+def get_label_texts(player: Player) -> dict:
+    """Get the text of the player's label in each of the grids"""
+    return {money_grid: "{}: ${:,}".format(player.name, player.get_money()),
+            networth_grid: "{}: ${:,}".format(player.name, player.get_networth()),
+            jail_grid: "{}: {}".format(player.name, player.in_jail)}
+
+
+def update_player_labels(players):
+    """Update the grid labels of the players, only touching the labels whose text changed"""
+    for player in players:
+        for grid, text in get_label_texts(player).items():
+            if label_texts[player][grid] != text:
+                player_labels[player][grid].config(text=text)
+                label_texts[player][grid] = text
+
+
+def update_player_names(player: Player):
+    """Update the names in the different widgets of the program"""
+    label_redraw.mark_dirty([player])
+    player_selector.set_menu(player.name, *list(session.players.keys()))
+    current_player.set(player.name)
+
+
+def on_session_event(event: str, player: Player, **data):
+    """Session subscriber that keeps the player names in the widgets in sync"""
+    if event == NAME:
+        update_player_names(player)
+
+
+def on_session_change(players: set):
+    """Session change listener that schedules a redraw of the grids and warns about bankrupt players"""
+    label_redraw.mark_dirty(players)
+    if projection_window is not None:
+        projection_window.cancel("Board changed")
+    for player in session.players.values():
+        if player in players:
+            bankrupt_err(player)
 
 
 def get_player(player_name: str = None) -> Player:
     """Get Player object from current selected player or provided name"""
     if player_name is None:
-        return player_dict[current_player.get()]
-    else:
-        try:
-            return player_dict[player_name]
-        except KeyError as e:
-            raise NotFound("Could not find player with name " + player_name) from e
+        return session.get_player(current_player.get())
+    return session.get_player(player_name)
 
 
 def ask_prop(title: str):
     prop_name = askstring(title, "Property Name")
     if prop_name is None or prop_name == "":
         raise NotFound("Property prompt canceled or name blank")
-    prop, non_exact = helpers.get_property(prop_name, card_set)
+    prop, non_exact = session.get_property(prop_name)
     if non_exact:
         if not askyesno("Non Exact", "Do you wish to proceed with most similar property?\nMost Similar Property: {}\n"
                                      "Entered: {}".format(prop.name, prop_name)):
@@ -131,7 +124,7 @@ def transfer_money_prompt():
     t_from = get_player()
     t_to = get_player(askstring("Transfer To", "Player"))
     money = askinteger("Transfer Money", "Amount")
-    helpers.transfer_money(t_from, t_to, money)
+    session.transfer_money(t_from, t_to, money)
 
 
 def add_property_prompt():
@@ -167,7 +160,7 @@ def sell_house_prompt():
     if type(prop) != NormalProperty:
         raise LimitReached("Railroads or Utilities cannot have houses")
     house_num = askinteger("Sell House(s)", "Amount")
-    prop.add_house(house_num)
+    prop.sell_house(house_num)
 
 
 def step_property_prompt():
@@ -180,31 +173,29 @@ def step_property_prompt():
         prop.step_property(get_player())
 
 
-def show_property_prompt(player: Player):
-    fp_list = helpers.get_formatted_property_list(get_player())
+def open_table_window(title: str, headings: list, rows: list, sort_column: int = None, reverse: bool = False):
     tl_win = Toplevel()
-    tl_win.title("{}'s Properties".format(player.name))
+    tl_win.title(title)
     tl_win.iconbitmap("res/icon.ico")
     tl_win.resizable(0, 0)
     tl_win.bind("<Return>", lambda e: tl_win.destroy())
     tl_win.wm_attributes("-topmost", 1)
     tl_win.wait_visibility()
     tl_win.grab_set()
-    scroll_win = helpers.ScrolledFrame(tl_win)
-    scroll_win.grid(row=0, column=0)
-    largest_width = 0
-    for line, line_text in enumerate(fp_list):
-        lab = ttk.Label(scroll_win.interior, text=line_text)
-        lab.grid(row=line, column=0)
-        if lab.winfo_reqwidth() > largest_width:
-            largest_width = lab.winfo_reqwidth()
-    scroll_win.canvas.config(width=largest_width + 20)
-    scroll_win.grid(row=0, column=0)
+    table = helpers.TableView(tl_win, headings, rows)
+    table.grid(row=0, column=0)
+    if sort_column is not None:
+        table.sort(sort_column, reverse)
     cls_btn = ttk.Button(tl_win, text="Close", command=tl_win.destroy)
     cls_btn.grid(row=1, column=0)
     cls_btn.focus_set()
 
 
+def show_property_prompt(player: Player):
+    open_table_window("{}'s Properties".format(player.name), helpers.PROPERTY_TABLE_HEADINGS,
+                      helpers.get_property_table(player.properties))
+
+
 def change_name_prompt():
     new_name = askstring("Change Name", "Name")
     get_player().change_name(new_name)
@@ -223,11 +214,11 @@ def add_auction_property_prompt():
 
 def transfer_all_properties_prompt():
     t_to = get_player(askstring("Transfer To", "Player"))
-    get_player().transfer_all_properties(t_to)
+    session.transfer_all_properties(get_player(), t_to)
 
 
 def show_winner():
-    winner, win_worth, tied = helpers.get_winner(player_dict)
+    winner, win_worth, tied = session.get_winner()
     if tied:
         showinfo("Winner",
                  "{}, and {} tied with a net worth of ${:,}".format(", ".join(winner[:-1]), winner[-1], win_worth))
@@ -235,30 +226,25 @@ def show_winner():
         showinfo("Winner", "{} wins with a net worth of ${:,}!".format(winner, win_worth))
 
 
+def projected_winner_prompt():
+    """Play simulated continuations of the board in the background and show the win probabilities as they come in"""
+    global projection_window
+    if projection_window is not None:
+        projection_window.cancel("Restarted")
+    projection = Projection(session, DEFAULTS.getint("projection_games", fallback=2000),
+                            DEFAULTS.getint("projection_rounds", fallback=30))
+    projection_window = helpers.ProjectionWindow(root, projection, error_log)
+
+
 def check_property_info_prompt():
     prop = ask_prop("Check Property Info")
-    val = prop.get_property_info()
-    tl_win = Toplevel()
-    tl_win.title("{}".format(prop.name))
-    tl_win.iconbitmap("res/icon.ico")
-    tl_win.resizable(0, 0)
-    tl_win.bind("<Return>", lambda e: tl_win.destroy())
-    tl_win.wm_attributes("-topmost", 1)
-    tl_win.wait_visibility()
-    tl_win.grab_set()
-    scroll_win = helpers.ScrolledFrame(tl_win)
-    scroll_win.grid(row=0, column=0)
-    largest_width = 0
-    for line, line_text in enumerate(val.split("\n")):
-        # ttk.Label(scroll_win.interior, text=line_text, justify=CENTER).grid(row=line, column=0)
-        lab = ttk.Label(scroll_win.interior, text=line_text, justify=CENTER)
-        lab.grid(row=line, column=0)
-        if lab.winfo_reqwidth() > largest_width:
-            largest_width = lab.winfo_reqwidth()
-    scroll_win.canvas.config(width=largest_width + 20)
-    cls_btn = ttk.Button(tl_win, text="Close", command=tl_win.destroy)
-    cls_btn.grid(row=1, column=0)
-    cls_btn.focus_set()
+    open_table_window(prop.name, ["Field", "Value"], helpers.get_property_info_table(prop))
+
+
+def board_info_prompt():
+    # Sorted by rent earned, highest first
+    open_table_window("Board Info", helpers.PROPERTY_TABLE_HEADINGS, helpers.get_property_table(session.card_set),
+                      sort_column=5, reverse=True)
 
 
 def property_average_prompt():
@@ -275,184 +261,258 @@ def dice_roll_prompt():
 
 
 def call_func(func, *args, **kwargs):
-    """Call a function with error parsing and pre/post-function actions (if any)"""
+    """Call a function as one session batch with error parsing and pre/post-function actions (if any)"""
     try:
-        func(*args, **kwargs)
+        with session.batch():
+            func(*args, **kwargs)
     except Exception as e:
-        helpers.write_error(*sys.exc_info())
+        error_log.log(*sys.exc_info())
+        error_handler(e)
+
+
+def call_history(func):
+    """Call undo or redo with error parsing, they're a session batch of their own so they can't go through call_func"""
+    try:
+        func()
+    except Exception as e:
+        error_log.log(*sys.exc_info())
         error_handler(e)
 
 
 def graceful_exit():
     """Perform exit operations"""
-    helpers.write_last_data(player_dict)
-    main.destroy()
+    helpers.write_last_data(session.players)
+    journal.close()
+    error_log.close()
+    if projection_window is not None:
+        projection_window.cancel("Closed")
+    if instrumentation is not None:
+        instrumentation.write_report("data/instrument_report.txt")
+        instrumentation.write_profile("data/profile.pstats")
+    root.destroy()
     sys.exit()
 
 
-# Set global exception handler
-sys.excepthook = exc_hook
-
-# Ensure data integrity
-helpers.assert_data()
-
-# Get property objects from card set
-card_set = helpers.process_card_set(helpers.get_card_set())
-
-# Create and setup tkinter window
-main = Tk()
-main.title("Monopoly Tracker v" + VERSION)
-main.iconbitmap("res/icon.ico")
-main.resizable(0, 0)
-main.protocol("WM_DELETE_WINDOW", graceful_exit)
+def main():
+    """Set up the session and the window and run the program"""
+    global error_log, instrumentation, call_func, update_player_labels, update_player_names, session, root, \
+        label_redraw, projection_window, journal, current_player, player_selector, money_grid, networth_grid, \
+        jail_grid, player_labels, label_texts
+
+    # Set global exception handler, errors are written to data/errors.jsonl in the background
+    error_log = helpers.ErrorLog()
+    sys.excepthook = exc_hook
+
+    # Cross check cached net worths against a full recompute when debugging
+    Player.check_networth = DEFAULTS.getboolean("debug_networth", fallback=False)
+
+    # Opt-in call counts and latency histograms of the hot paths (and a cProfile run), written out on exit
+    instrumentation = None
+    if DEFAULTS.getboolean("instrument", fallback=False) or DEFAULTS.getboolean("profile", fallback=False):
+        instrumentation = helpers.Instrumentation(profile=DEFAULTS.getboolean("profile", fallback=False))
+        if DEFAULTS.getboolean("instrument", fallback=False):
+            for prop_class in (NormalProperty, Railroad, Utility):
+                instrumentation.patch(prop_class, "step_property")
+            instrumentation.patch(GameSession, "get_property")
+            instrumentation.patch(Player, "get_networth")
+            call_func = instrumentation.wrap("call_func", call_func)
+            update_player_labels = instrumentation.wrap("update_player_labels", update_player_labels)
+            update_player_names = instrumentation.wrap("update_player_names", update_player_names)
+
+    # Create the game session from the card set
+    session = GameSession.from_card_set_file(DEFAULTS.getint("money"), DEFAULTS.getint("go_money"),
+                                             history_limit=DEFAULTS.getint("money_history_limit", fallback=0) or None)
+
+    # Create and setup tkinter window
+    root = Tk()
+    root.title("Monopoly Tracker v" + VERSION)
+    root.iconbitmap("res/icon.ico")
+    root.resizable(0, 0)
+    root.protocol("WM_DELETE_WINDOW", graceful_exit)
+
+    # Grid labels are redrawn once per frame at most, however many changes happen in between
+    label_redraw = helpers.RedrawScheduler(root, update_player_labels, DEFAULTS.getint("max_refresh_rate", fallback=30))
+
+    # Window of the projected winner, its projection is canceled whenever the board changes
+    projection_window = None
+
+    if has_saved_session() and askyesno("Restore Session", "Do you want to restore the last session?"):
+        # Load the last snapshot and replay the journal written after it
+        restore_session(session)
+    else:
+        # Get number of players
+        number_players = askinteger("Player Number", "Number of Players")
+
+        if number_players < 1 or number_players > 15:
+            showerror("Error", "Too many players")
+            sys.exit()
+
+        # Create player objects
+        for number in range(1, number_players + 1):
+            session.add_player(DEFAULTS["name_prefix"] + " " + str(number))
+
+    # The GUI and the journal follow every change to the session from here on, the journal starts from a fresh snapshot
+    session.subscribe(on_session_event)
+    session.subscribe_changes(on_session_change)
+    journal = Journal(session)
+    journal.snapshot()
+
+    # Every change from here on can be undone and redone
+    history = History(session)
+    root.bind("<Control-z>", lambda e: call_history(history.undo))
+    root.bind("<Control-y>", lambda e: call_history(history.redo))
+
+    # Set default options for widgets
+    btndopts = {}
+    btndefopts = {"padx": 4, "sticky": "we", "ipadx": 10}
+    framedefopts = {"columnspan": 3, "padx": 10, "pady": 10, "ipadx": 10, "ipady": 5, "sticky": "nesw"}
+
+    # Create frames
+    actions = ttk.LabelFrame(root, text="Gameplay Actions")
+    data_frame = ttk.LabelFrame(root, text="Data")
+    gameplay_money = ttk.LabelFrame(actions, text="Money")
+    gameplay_property = ttk.LabelFrame(actions, text="Property")
+    gameplay_misc = ttk.LabelFrame(actions, text="Misc.")
+    nongameplay_actions = ttk.LabelFrame(actions, text="Non-Gameplay Actions")
+    money_grid = ttk.LabelFrame(data_frame, text="Money")
+    networth_grid = ttk.LabelFrame(data_frame, text="Networth")
+    jail_grid = ttk.LabelFrame(data_frame, text="Jail")
+    actions.grid(row=0, column=0, padx=10, pady=10, sticky="nesw")
+    data_frame.grid(row=0, column=1, padx=10, pady=10, sticky="nesw")
+    data_frame.rowconfigure(0, weight=1)
+    money_grid.grid(row=1, column=0, **framedefopts)
+    networth_grid.grid(row=2, column=0, **framedefopts)
+    jail_grid.grid(row=3, column=0, **framedefopts)
+    data_frame.rowconfigure(4, weight=1)
+    gameplay_money.grid(row=1, column=0, **framedefopts)
+    gameplay_property.grid(row=2, column=0, **framedefopts)
+    gameplay_misc.grid(row=3, column=0, **framedefopts)
+    nongameplay_actions.grid(row=4, column=0, **framedefopts)
+
+    # Center widgets in frames by putting a buffer/spacer on the leftmost and rightmost columns of each frame
+    for frame in [money_grid, networth_grid, jail_grid, gameplay_money, gameplay_property, gameplay_misc,
+                  nongameplay_actions]:
+        frame.columnconfigure(0, weight=1)
+        frame.columnconfigure(4, weight=1)
+
+    # Create and place player widgets
+    current_player = StringVar()
+    player_selector = ttk.OptionMenu(actions, current_player, list(session.players.keys())[0],
+                                     *list(session.players.keys()))
+    player_selector.grid(row=0, column=1, columnspan=2, pady=15, sticky="we")
+    player_selector_label = ttk.Label(actions, text="Selected Player", width=18)
+    player_selector_label.grid(row=0, column=0, pady=15)
+
+    # Money widgets
+    add_money = ttk.Button(gameplay_money, text="Add Money", command=lambda: call_func(add_money_prompt), **btndopts)
+    add_money.grid(row=0, column=1, **btndefopts)
+    subtract_money = ttk.Button(gameplay_money, text="Subtract Money",
+                                command=lambda: call_func(subtract_money_prompt), **btndopts)
+    subtract_money.grid(row=0, column=2, **btndefopts)
+    transfer_money = ttk.Button(gameplay_money, text="Transfer Money",
+                                command=lambda: call_func(transfer_money_prompt), **btndopts)
+    transfer_money.grid(row=0, column=3, **btndefopts)
+    add_go_money = ttk.Button(gameplay_money, text="Add Go Money",
+                              command=lambda: call_func(get_player().add_go_money), **btndopts)
+    add_go_money.grid(row=1, column=1, **btndefopts)
+    ignore_bankrupt = ttk.Button(gameplay_money, text="Ignore Bankrupt",
+                                 command=lambda: call_func(get_player().ignore_bankrupt), **btndopts)
+    ignore_bankrupt.grid(row=1, column=2, **btndefopts)
+    unignore_bankrupt = ttk.Button(gameplay_money, text="Unignore Bankrupt",
+                                   command=lambda: call_func(get_player().unignore_bankrupt), **btndopts)
+    unignore_bankrupt.grid(row=1, column=3, **btndefopts)
+    check_net_worth = ttk.Button(gameplay_money, text="Check Net Worth",
+                                 command=lambda: call_func(check_net_worth_prompt), **btndopts)
+    check_net_worth.grid(row=2, column=1, **btndefopts)
+    show_money_graph = ttk.Button(gameplay_money, text="Show Money Graph",
+                                  command=lambda: call_func(get_player().show_money_graph), **btndopts)
+    show_money_graph.grid(row=2, column=2, **btndefopts)
+
+    # Property widgets
+    add_property = ttk.Button(gameplay_property, text="Add Property",
+                              command=lambda: call_func(add_property_prompt), **btndopts)
+    add_property.grid(row=0, column=1, **btndefopts)
+    add_auction_property = ttk.Button(gameplay_property, text="Add Auction Property",
+                                      command=lambda: call_func(add_auction_property_prompt), **btndopts)
+    add_auction_property.grid(row=0, column=2, **btndefopts)
+    transfer_property = ttk.Button(gameplay_property, text="Transfer Property",
+                                   command=lambda: call_func(transfer_property_prompt), **btndopts)
+    transfer_property.grid(row=0, column=3, **btndefopts)
+    mortgage_property = ttk.Button(gameplay_property, text="Mortgage Property",
+                                   command=lambda: call_func(mortgage_property_prompt), **btndopts)
+    mortgage_property.grid(row=1, column=1, **btndefopts)
+    unmortgage_property = ttk.Button(gameplay_property, text="Unmortgage Property",
+                                     command=lambda: call_func(unmortgage_property_prompt), **btndopts)
+    unmortgage_property.grid(row=1, column=2, **btndefopts)
+    transfer_all_properties = ttk.Button(gameplay_property, text="Transfer All Properties",
+                                         command=lambda: call_func(transfer_all_properties_prompt), **btndopts)
+    transfer_all_properties.grid(row=1, column=3, **btndefopts)
+    add_house = ttk.Button(gameplay_property, text="Add House(s)",
+                           command=lambda: call_func(add_house_prompt), **btndopts)
+    add_house.grid(row=2, column=1, **btndefopts)
+    sell_house = ttk.Button(gameplay_property, text="Sell House(s)",
+                            command=lambda: call_func(sell_house_prompt), **btndopts)
+    sell_house.grid(row=2, column=2, **btndefopts)
+    step_property = ttk.Button(gameplay_property, text="Step Property",
+                               command=lambda: call_func(step_property_prompt), **btndopts)
+    step_property.grid(row=2, column=3, **btndefopts)
+    show_properties = ttk.Button(gameplay_property, text="Show Properties",
+                                 command=lambda: call_func(show_property_prompt, get_player()), **btndopts)
+    show_properties.grid(row=3, column=1, **btndefopts)
+    property_average = ttk.Button(gameplay_property, text="Property Data",
+                                  command=lambda: call_func(property_average_prompt), **btndopts)
+    property_average.grid(row=3, column=2, **btndefopts)
+
+    # Misc. Widgets
+    jail = ttk.Button(gameplay_misc, text="Jail", command=lambda: call_func(get_player().jail), **btndopts)
+    jail.grid(row=0, column=1, **btndefopts)
+    unjail = ttk.Button(gameplay_misc, text="Unjail", command=lambda: call_func(get_player().unjail), **btndopts)
+    unjail.grid(row=0, column=2, **btndefopts)
+    change_name = ttk.Button(gameplay_misc, text="Change Name",
+                             command=lambda: call_func(change_name_prompt), **btndopts)
+    change_name.grid(row=0, column=3, **btndefopts)
+    check_winner = ttk.Button(gameplay_misc, text="Check Winner", command=lambda: call_func(show_winner), **btndopts)
+    check_winner.grid(row=1, column=1, **btndefopts)
+    projected_winner = ttk.Button(gameplay_misc, text="Projected Winner",
+                                  command=lambda: call_func(projected_winner_prompt), **btndopts)
+    projected_winner.grid(row=1, column=2, **btndefopts)
+    undo = ttk.Button(gameplay_misc, text="Undo", command=lambda: call_history(history.undo), **btndopts)
+    undo.grid(row=2, column=1, **btndefopts)
+    redo = ttk.Button(gameplay_misc, text="Redo", command=lambda: call_history(history.redo), **btndopts)
+    redo.grid(row=2, column=2, **btndefopts)
+
+    # Non-Gameplay Widgets
+    check_property_info = ttk.Button(nongameplay_actions, text="Check Property Info",
+                                     command=lambda: call_func(check_property_info_prompt), **btndopts)
+    check_property_info.grid(row=0, column=1, **btndefopts)
+    dice_roll = ttk.Button(nongameplay_actions, text="Dice Roll", command=lambda: call_func(dice_roll_prompt),
+                           **btndopts)
+    dice_roll.grid(row=0, column=2, **btndefopts)
+    board_info = ttk.Button(nongameplay_actions, text="Board Info",
+                            command=lambda: call_func(board_info_prompt), **btndopts)
+    board_info.grid(row=0, column=3, **btndefopts)
+
+    # Fill in money and jail frames, keeping the label of each player in each grid and the text it shows
+    player_labels = {}
+    label_texts = {}
+    row = 0
+    column = 1
+    for player in session.players.values():
+        label_texts[player] = get_label_texts(player)
+        player_labels[player] = {}
+        for grid, text in label_texts[player].items():
+            player_labels[player][grid] = ttk.Label(grid, text=text)
+            player_labels[player][grid].grid(row=row, column=column, padx=15, pady=5)
+        if column == 3:
+            column = 1
+            row += 1
+        else:
+            column += 1
+    del row, column, player
 
-# Get number of players
-number_players = askinteger("Player Number", "Number of Players")
+    root.mainloop()
 
-if number_players < 1 or number_players > 15:
-    showerror("Error", "Too many players")
-    sys.exit()
-
-# Create player objects
-player_dict = {}
-for number in range(1, number_players + 1):
-    player_dict[DEFAULTS["name_prefix"] + " " + str(number)] = Player("Player " + str(number), update_money_grid,
-                                                                      update_jail_grid, update_player_names,
-                                                                      bankrupt_err)
-
-# Set default options for widgets
-btndopts = {}
-btndefopts = {"padx": 4, "sticky": "we", "ipadx": 10}
-framedefopts = {"columnspan": 3, "padx": 10, "pady": 10, "ipadx": 10, "ipady": 5, "sticky": "nesw"}
-
-# Create frames
-actions = ttk.LabelFrame(main, text="Gameplay Actions")
-data_frame = ttk.LabelFrame(main, text="Data")
-gameplay_money = ttk.LabelFrame(actions, text="Money")
-gameplay_property = ttk.LabelFrame(actions, text="Property")
-gameplay_misc = ttk.LabelFrame(actions, text="Misc.")
-nongameplay_actions = ttk.LabelFrame(actions, text="Non-Gameplay Actions")
-money_grid = ttk.LabelFrame(data_frame, text="Money")
-networth_grid = ttk.LabelFrame(data_frame, text="Networth")
-jail_grid = ttk.LabelFrame(data_frame, text="Jail")
-actions.grid(row=0, column=0, padx=10, pady=10, sticky="nesw")
-data_frame.grid(row=0, column=1, padx=10, pady=10, sticky="nesw")
-data_frame.rowconfigure(0, weight=1)
-money_grid.grid(row=1, column=0, **framedefopts)
-networth_grid.grid(row=2, column=0, **framedefopts)
-jail_grid.grid(row=3, column=0, **framedefopts)
-data_frame.rowconfigure(4, weight=1)
-gameplay_money.grid(row=1, column=0, **framedefopts)
-gameplay_property.grid(row=2, column=0, **framedefopts)
-gameplay_misc.grid(row=3, column=0, **framedefopts)
-nongameplay_actions.grid(row=4, column=0, **framedefopts)
-
-# Center widgets in frames by putting a buffer/spacer on the leftmost and rightmost columns of each frame
-for frame in [money_grid, networth_grid, jail_grid, gameplay_money, gameplay_property, gameplay_misc,
-              nongameplay_actions]:
-    frame.columnconfigure(0, weight=1)
-    frame.columnconfigure(4, weight=1)
-
-# Create and place player widgets
-current_player = StringVar()
-player_selector = ttk.OptionMenu(actions, current_player, list(player_dict.keys())[0], *list(player_dict.keys()))
-player_selector.grid(row=0, column=1, columnspan=2, pady=15, sticky="we")
-player_selector_label = ttk.Label(actions, text="Selected Player", width=18)
-player_selector_label.grid(row=0, column=0, pady=15)
-
-# Money widgets
-add_money = ttk.Button(gameplay_money, text="Add Money", command=lambda: call_func(add_money_prompt), **btndopts)
-add_money.grid(row=0, column=1, **btndefopts)
-subtract_money = ttk.Button(gameplay_money, text="Subtract Money",
-                            command=lambda: call_func(subtract_money_prompt), **btndopts)
-subtract_money.grid(row=0, column=2, **btndefopts)
-transfer_money = ttk.Button(gameplay_money, text="Transfer Money",
-                            command=lambda: call_func(transfer_money_prompt), **btndopts)
-transfer_money.grid(row=0, column=3, **btndefopts)
-add_go_money = ttk.Button(gameplay_money, text="Add Go Money",
-                          command=lambda: call_func(get_player().add_go_money), **btndopts)
-add_go_money.grid(row=1, column=1, **btndefopts)
-ignore_bankrupt = ttk.Button(gameplay_money, text="Ignore Bankrupt",
-                             command=lambda: call_func(get_player().ignore_bankrupt), **btndopts)
-ignore_bankrupt.grid(row=1, column=2, **btndefopts)
-unignore_bankrupt = ttk.Button(gameplay_money, text="Unignore Bankrupt",
-                               command=lambda: call_func(get_player().unignore_bankrupt), **btndopts)
-unignore_bankrupt.grid(row=1, column=3, **btndefopts)
-check_net_worth = ttk.Button(gameplay_money, text="Check Net Worth",
-                             command=lambda: call_func(check_net_worth_prompt), **btndopts)
-check_net_worth.grid(row=2, column=1, **btndefopts)
-show_money_graph = ttk.Button(gameplay_money, text="Show Money Graph",
-                              command=lambda: call_func(get_player().show_money_graph), **btndopts)
-show_money_graph.grid(row=2, column=2, **btndefopts)
-
-# Property widgets
-add_property = ttk.Button(gameplay_property, text="Add Property",
-                          command=lambda: call_func(add_property_prompt), **btndopts)
-add_property.grid(row=0, column=1, **btndefopts)
-add_auction_property = ttk.Button(gameplay_property, text="Add Auction Property",
-                                  command=lambda: call_func(add_auction_property_prompt), **btndopts)
-add_auction_property.grid(row=0, column=2, **btndefopts)
-transfer_property = ttk.Button(gameplay_property, text="Transfer Property",
-                               command=lambda: call_func(transfer_property_prompt), **btndopts)
-transfer_property.grid(row=0, column=3, **btndefopts)
-mortgage_property = ttk.Button(gameplay_property, text="Mortgage Property",
-                               command=lambda: call_func(mortgage_property_prompt), **btndopts)
-mortgage_property.grid(row=1, column=1, **btndefopts)
-unmortgage_property = ttk.Button(gameplay_property, text="Unmortgage Property",
-                                 command=lambda: call_func(unmortgage_property_prompt), **btndopts)
-unmortgage_property.grid(row=1, column=2, **btndefopts)
-transfer_all_properties = ttk.Button(gameplay_property, text="Transfer All Properties",
-                                     command=lambda: call_func(transfer_all_properties_prompt), **btndopts)
-transfer_all_properties.grid(row=1, column=3, **btndefopts)
-add_house = ttk.Button(gameplay_property, text="Add House(s)",
-                       command=lambda: call_func(add_house_prompt), **btndopts)
-add_house.grid(row=2, column=1, **btndefopts)
-sell_house = ttk.Button(gameplay_property, text="Sell House(s)",
-                        command=lambda: call_func(sell_house_prompt), **btndopts)
-sell_house.grid(row=2, column=2, **btndefopts)
-step_property = ttk.Button(gameplay_property, text="Step Property",
-                           command=lambda: call_func(step_property_prompt), **btndopts)
-step_property.grid(row=2, column=3, **btndefopts)
-show_properties = ttk.Button(gameplay_property, text="Show Properties",
-                             command=lambda: call_func(show_property_prompt, get_player()), **btndopts)
-show_properties.grid(row=3, column=1, **btndefopts)
-property_average = ttk.Button(gameplay_property, text="Property Data",
-                              command=lambda: call_func(property_average_prompt), **btndopts)
-property_average.grid(row=3, column=2, **btndefopts)
-
-# Misc. Widgets
-jail = ttk.Button(gameplay_misc, text="Jail", command=lambda: call_func(get_player().jail), **btndopts)
-jail.grid(row=0, column=1, **btndefopts)
-unjail = ttk.Button(gameplay_misc, text="Unjail", command=lambda: call_func(get_player().unjail), **btndopts)
-unjail.grid(row=0, column=2, **btndefopts)
-change_name = ttk.Button(gameplay_misc, text="Change Name",
-                         command=lambda: call_func(change_name_prompt), **btndopts)
-change_name.grid(row=0, column=3, **btndefopts)
-check_winner = ttk.Button(gameplay_misc, text="Check Winner", command=lambda: call_func(show_winner), **btndopts)
-check_winner.grid(row=1, column=1, **btndefopts)
-
-# Non-Gameplay Widgets
-check_property_info = ttk.Button(nongameplay_actions, text="Check Property Info",
-                                 command=lambda: call_func(check_property_info_prompt), **btndopts)
-check_property_info.grid(row=0, column=1, **btndefopts)
-dice_roll = ttk.Button(nongameplay_actions, text="Dice Roll", command=lambda: call_func(dice_roll_prompt), **btndopts)
-dice_roll.grid(row=0, column=2, **btndefopts)
-
-# Fill in money and jail frames
-row = 0
-column = 1
-for player in player_dict.values():
-    ttk.Label(money_grid, text="{}: ${:,}".format(player.name, player.get_money())).grid(row=row, column=column,
-                                                                                         padx=15, pady=5)
-    ttk.Label(networth_grid, text="{}: ${:,}".format(player.name, player.get_networth())).grid(row=row, column=column,
-                                                                                               padx=15, pady=5)
-    ttk.Label(jail_grid, text="{}: {}".format(player.name, player.in_jail)).grid(row=row, column=column, padx=15,
-                                                                                 pady=5)
-    if column == 3:
-        column = 1
-        row += 1
-    else:
-        column += 1
-del row, column, player
 
-main.mainloop()
+# Process pool workers (the projected winner) import this script, only the main process runs the program
+if __name__ == "__main__":
+    main()
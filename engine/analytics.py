@@ -0,0 +1,204 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import argparse
+import functools
+import glob
+import os
+from itertools import islice
+from multiprocessing import Pool
+from typing import Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+from helpers.data import process_card_set
+from helpers.file import get_card_set
+from models.events import MONEY, NAME, PLAYER_ADDED, STEP
+from models.properties import Property, NormalProperty, Railroad
+from .journal import read_journal
+
+TIMING_BINS = 20  # Bankruptcy timing histogram bins, each one a twentieth of a game
+
+
+def iter_chunks(path: str, chunk_size: int = 10000) -> Iterator[List[dict]]:
+    """Yield the records of a journal in lists of at most chunk_size records"""
+    records = read_journal(path)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if len(chunk) == 0:
+            return
+        yield chunk
+
+
+def iter_paths(paths: Iterable[str]) -> Iterator[str]:
+    """Yield the journal files of the given files and directories (every game is one .jsonl file)"""
+    for path in paths:
+        if os.path.isdir(path):
+            yield from sorted(glob.glob(os.path.join(path, "**", "*.jsonl"), recursive=True))
+        else:
+            yield path
+
+
+def new_stats(properties: int) -> dict:
+    """Empty aggregated statistics"""
+    return {"games": 0, "events": 0, "players": 0, "bankruptcies": 0,
+            "steps": np.zeros(properties, dtype=np.int64), "rent": np.zeros(properties, dtype=np.int64),
+            "bankrupt_timing": np.zeros(TIMING_BINS, dtype=np.int64)}
+
+
+def merge_stats(stats: dict, other: dict):
+    """Add aggregated statistics of other games to stats"""
+    for key in stats:
+        stats[key] += other[key]
+
+
+def analyze_game(path: str, prop_names: Tuple[str], chunk_size: int = 10000) -> dict:
+    """Aggregate the journal of one game chunk by chunk.
+
+    Every step event counts as a landing on the property and adds its rent (an undone step takes them back). A player
+    is bankrupt if its money is at or below zero at the end of the game, at the event where its money last dropped
+    there.
+    """
+    prop_index = {name: prop_num for prop_num, name in enumerate(prop_names)}
+    stats = new_stats(len(prop_names))
+    players = {}  # Current name: player number, so renamed players stay the same player
+    money = []  # Last known money of every player
+    dropped_at = []  # Event number where the money of every player last dropped to zero or below, None if above
+    events = 0
+    for chunk in iter_chunks(path, chunk_size):
+        steps = [(prop_index[record["prop"]], record.get("steps", 1), record["rent"]) for record in chunk
+                 if record["event"] == STEP and record["prop"] in prop_index]
+        if len(steps) > 0:
+            steps = np.array(steps, dtype=np.int64)
+            np.add.at(stats["steps"], steps[:, 0], steps[:, 1])
+            np.add.at(stats["rent"], steps[:, 0], steps[:, 2])
+
+        for record_num, record in enumerate(chunk):
+            if record["event"] == NAME and record["old"] in players:
+                players[record["new"]] = players.pop(record["old"])
+            elif record["event"] == PLAYER_ADDED and record["player"] not in players:
+                players[record["player"]] = len(money)
+                money.append(record["money"])
+                dropped_at.append(None if record["money"] > 0 else events + record_num)
+            elif record["event"] == MONEY:
+                player_num = players.get(record["player"])
+                if player_num is None:
+                    player_num = players[record["player"]] = len(money)
+                    money.append(record["old"])
+                    dropped_at.append(None if record["old"] > 0 else 0)
+                if record["new"] <= 0 < money[player_num]:
+                    dropped_at[player_num] = events + record_num
+                elif record["new"] > 0:
+                    dropped_at[player_num] = None
+                money[player_num] = record["new"]
+        events += len(chunk)
+
+    stats["games"] = 1
+    stats["events"] = events
+    stats["players"] = len(money)
+    bankrupt = np.array([event for event in dropped_at if event is not None], dtype=np.float64)
+    stats["bankruptcies"] = len(bankrupt)
+    if len(bankrupt) > 0:
+        stats["bankrupt_timing"] += np.histogram(bankrupt / max(events, 1), bins=TIMING_BINS, range=(0, 1))[0]
+    return stats
+
+
+def analyze(paths: Iterable[str], card_set: List[Property], workers: int = None, chunk_size: int = 10000) -> dict:
+    """Aggregate every recorded game in the paths across a process pool, games are streamed to the workers and their
+    statistics merged as they finish so memory doesn't grow with the number of games"""
+    prop_names = tuple(prop.name for prop in card_set)
+    stats = new_stats(len(prop_names))
+    analyze_path = functools.partial(analyze_game, prop_names=prop_names, chunk_size=chunk_size)
+    with Pool(workers) as pool:
+        for game_stats in pool.imap_unordered(analyze_path, iter_paths(paths), chunksize=16):
+            merge_stats(stats, game_stats)
+    return stats
+
+
+def group_name(prop: Property) -> str:
+    """Name of the rent group of a property"""
+    if type(prop) is NormalProperty:
+        return prop.group["colour"].title()
+    return "Railroads" if type(prop) is Railroad else "Utilities"
+
+
+def group_rent(stats: dict, card_set: List[Property]) -> List[Tuple[str, int, int]]:
+    """Get the landings and rent earned by every rent group, most rent first"""
+    groups = {}
+    for prop_num, prop in enumerate(card_set):
+        steps, rent = groups.get(group_name(prop), (0, 0))
+        groups[group_name(prop)] = (steps + int(stats["steps"][prop_num]), rent + int(stats["rent"][prop_num]))
+    return sorted(((name, steps, rent) for name, (steps, rent) in groups.items()), key=lambda row: row[2],
+                  reverse=True)
+
+
+def timing_percentile(stats: dict, fraction: float) -> float:
+    """Get a percentile of the bankruptcy timing (as a fraction of the game) from the histogram"""
+    cumulative = np.cumsum(stats["bankrupt_timing"])
+    if cumulative[-1] == 0:
+        return float("nan")
+    return (np.searchsorted(cumulative, fraction * cumulative[-1]) + 1) / TIMING_BINS
+
+
+def format_summary(stats: dict, card_set: List[Property]) -> str:
+    """Format aggregated statistics as text"""
+    games = max(stats["games"], 1)
+    total_steps = max(int(stats["steps"].sum()), 1)
+    lines = ["{:,} games, {:,} events, {:,} players, {:,} bankruptcies ({:.2f} per game)".format(
+        stats["games"], stats["events"], stats["players"], stats["bankruptcies"], stats["bankruptcies"] / games),
+        "Bankruptcy timing (share of the game played): P10 {:.0%}, P50 {:.0%}, P90 {:.0%}".format(
+            timing_percentile(stats, 0.1), timing_percentile(stats, 0.5), timing_percentile(stats, 0.9)),
+        "",
+        "{:<24} {:>10} {:>10} {:>14} {:>14}".format("Property", "Landing %", "Per Game", "Rent Earned", "Rent/Game")]
+    for prop_num in np.argsort(-stats["steps"], kind="stable"):
+        lines.append("{:<24} {:>10.2f} {:>10.2f} {:>14,} {:>14,.0f}".format(
+            card_set[prop_num].name, 100 * stats["steps"][prop_num] / total_steps, stats["steps"][prop_num] / games,
+            int(stats["rent"][prop_num]), stats["rent"][prop_num] / games))
+    lines += ["", "{:<24} {:>10} {:>14} {:>14}".format("Group", "Landing %", "Rent Earned", "Rent/Game")]
+    for name, steps, rent in group_rent(stats, card_set):
+        lines.append("{:<24} {:>10.2f} {:>14,} {:>14,.0f}".format(name, 100 * steps / total_steps, rent,
+                                                                  rent / games))
+    return "\n".join(lines)
+
+
+def show_summary_graph(stats: dict, card_set: List[Property]):
+    """Show a graph of how many times every property was stepped on and how much money it made across all games"""
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure()
+    ax1 = fig.add_subplot(111)
+    ax2 = ax1.twinx()
+    ax1.set_xlabel("Property Name")
+    ax1.set_ylabel("Times Stepped")
+    ax2.set_ylabel("Money Earned")
+
+    X = np.arange(len(card_set))
+    width = 0.35
+    ax1.bar(X - width / 2, stats["steps"], width, label="Steps", color="blue")
+    ax2.bar(X + width / 2, stats["rent"], width, label="Money Earned", color="green")
+    ax1.set_xticks(X)
+    ax1.set_xticklabels([prop.name for prop in card_set], rotation=90)
+    fig.legend(loc="upper left", bbox_to_anchor=(0, 1), bbox_transform=ax1.transAxes)
+    plt.title("{:,} Games".format(stats["games"]))
+    plt.show()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="League statistics over recorded game journals")
+    parser.add_argument("paths", nargs="+", help="journal files, or directories of them (one file per game)")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes (default: number of cores)")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="journal records read at once")
+    parser.add_argument("--graph", action="store_true", help="also show a graph of the steps and rent per property")
+    args = parser.parse_args()
+    card_set = process_card_set(get_card_set())
+    stats = analyze(args.paths, card_set, args.workers, args.chunk_size)
+    print(format_summary(stats, card_set))
+    if args.graph:
+        show_summary_graph(stats, card_set)
+
+
+if __name__ == "__main__":
+    main()
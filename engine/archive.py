@@ -0,0 +1,156 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import argparse
+import json
+import os
+from os.path import isfile
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from models import Player
+from models.exceptions import *
+from models.money_history import show_money_graph
+from models.properties import Property
+
+ARCHIVE_PATH = "data/archive"
+
+
+def game_columns(players: Dict[str, Player], card_set: List[Property]) -> dict:
+    """Get the columns of a finished game to archive: the money history of every player and the times stepped and
+    money earned of every property"""
+    return {
+        "players": [(name, player.get_money_history().first_index(), player.get_money_history().as_array().copy())
+                    for name, player in players.items()],
+        "properties": [prop.name for prop in card_set],
+        "steps": np.array([prop.times_stepped for prop in card_set], dtype=np.int64),
+        "rent": np.array([prop.stepped_price for prop in card_set], dtype=np.int64),
+    }
+
+
+class Archive:
+    """Append-only columnar archive of finished games.
+
+    Every column is stored as int64 values back to back in path.bin, and path.idx holds a JSON line per game with its
+    players and properties and where its columns are (offsets and lengths in values). Columns are read through a
+    memory map of path.bin, so reading a player's money history only pages in that history and returns a view
+    without copying. Appending a game writes its columns after the last indexed game and then its index line, so the
+    archive is never rewritten and a game cut short by a crash is overwritten by the next append.
+    """
+
+    def __init__(self, path: str = ARCHIVE_PATH):
+        self.data_path = path + ".bin"
+        self.index_path = path + ".idx"
+        self.games = []
+        if isfile(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self.games.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        break
+        self._data = None
+
+    def __len__(self) -> int:
+        return len(self.games)
+
+    def append(self, columns: dict) -> int:
+        """Add a finished game (see game_columns) to the end of the archive and return its game number"""
+        start = end = self.games[-1]["end"] if len(self.games) > 0 else 0
+        entry = {"game": len(self.games), "players": [], "properties": columns["properties"]}
+        arrays = []
+        for name, first, money in columns["players"]:
+            entry["players"].append({"name": name, "first": first, "offset": end, "length": len(money)})
+            arrays.append(money)
+            end += len(money)
+        for key in ("steps", "rent"):
+            entry[key] = end
+            arrays.append(columns[key])
+            end += len(columns[key])
+        entry["end"] = end
+
+        with open(self.data_path, "r+b" if isfile(self.data_path) else "wb") as f:
+            # Anything after the last indexed game is left over from an append that didn't finish
+            f.seek(start * 8)
+            f.truncate()
+            for array in arrays:
+                f.write(np.ascontiguousarray(array, dtype=np.int64).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.games.append(entry)
+        return entry["game"]
+
+    def _column(self, offset: int, length: int) -> np.ndarray:
+        """Get length values from an offset as a read-only view of the memory map"""
+        if self._data is None or offset + length > len(self._data):
+            # Mapped again when the archive grew since it was mapped
+            self._data = np.memmap(self.data_path, dtype=np.int64, mode="r")
+        return self._data[offset:offset + length]
+
+    def get_game(self, game: int) -> dict:
+        """Get the index entry of a game"""
+        if not 0 <= game < len(self.games):
+            raise NotFound("There is no game {} in the archive ({} games)".format(game, len(self.games)))
+        return self.games[game]
+
+    def get_players(self, game: int) -> List[str]:
+        """Get the names of the players of a game"""
+        return [player["name"] for player in self.get_game(game)["players"]]
+
+    def get_money(self, game: int, player: str) -> Tuple[int, np.ndarray]:
+        """Get the transaction number of the first kept value and the money history of a player in a game"""
+        for entry in self.get_game(game)["players"]:
+            if entry["name"] == player:
+                return entry["first"], self._column(entry["offset"], entry["length"])
+        raise NotFound("There is no player {} in game {}".format(player, game))
+
+    def get_steps(self, game: int) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """Get the property names of a game and how many times every property was stepped on and money it made"""
+        entry = self.get_game(game)
+        props = len(entry["properties"])
+        return entry["properties"], self._column(entry["steps"], props), self._column(entry["rent"], props)
+
+    def total_steps(self) -> Dict[str, Tuple[int, int]]:
+        """Get the times stepped and money earned of every property name summed over every game"""
+        totals = {}
+        for game in range(len(self.games)):
+            for name, steps, rent in zip(*self.get_steps(game)):
+                total_steps, total_rent = totals.get(name, (0, 0))
+                totals[name] = (total_steps + int(steps), total_rent + int(rent))
+        return totals
+
+    def show_money_graph(self, game: int, player: str, points: int = 2000, block: bool = False):
+        """Show the money history graph of a player in an archived game"""
+        first, money = self.get_money(game, player)
+        show_money_graph("{} (Game {})".format(player, game), money, first, points, block)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read an archive of finished games")
+    parser.add_argument("--archive", default=ARCHIVE_PATH, help="archive path, without the .bin or .idx extension")
+    parser.add_argument("--game", type=int, default=None, help="game to list the players and money of")
+    parser.add_argument("--player", default=None, help="player of --game to show the money graph of")
+    args = parser.parse_args()
+    archive = Archive(args.archive)
+    if args.game is None:
+        print("{:,} games".format(len(archive)))
+        for name, (steps, rent) in sorted(archive.total_steps().items(), key=lambda item: item[1][0], reverse=True):
+            print("{:<24} {:>10,} {:>14,}".format(name, steps, rent))
+    elif args.player is None:
+        for name in archive.get_players(args.game):
+            first, money = archive.get_money(args.game, name)
+            print("{:<24} {:>8,} transactions, final money {:,}".format(name, first + len(money), int(money[-1])))
+    else:
+        archive.show_money_graph(args.game, args.player, block=True)
+
+
+if __name__ == "__main__":
+    main()
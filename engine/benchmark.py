@@ -0,0 +1,296 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import argparse
+import atexit
+import copy
+import datetime
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+from statistics import median
+from time import perf_counter_ns
+from typing import Callable, Dict, List, Tuple
+
+from helpers.data import get_winner, process_card_set
+from helpers.file import get_card_set
+from helpers.model import get_property
+from models.properties import NormalProperty, Railroad, Utility
+from .journal import Journal, restore_session
+from .session import GameSession
+
+RESULTS_PATH = "data/benchmark.json"
+# Timings only compare on the same machine, so the baseline is kept with the local data (which isn't committed) and made
+# with --save-baseline
+BASELINE_PATH = "data/benchmark_baseline.json"
+# Typos and partial names of US card set properties, looked up with fuzzy matching
+QUERIES = ["boardwalk", "bordwalk", "park plce", "reading rail", "electric co", "st charles", "marvin gardns",
+           "illinois av", "short lin", "water work"]
+
+# Every benchmark is a setup function returning a callable to time and the number of operations one call does, and
+# optionally a callable that cleans up after the timing
+BENCHMARKS = {}
+
+
+def benchmark(name: str):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+def large_card_set(card_data: List[dict], copies: int) -> List[dict]:
+    """Make a bigger card set out of copies of a card set, with every copy's names and colours made unique"""
+    cards = []
+    for copy_num in range(copies):
+        for card in card_data:
+            card = copy.deepcopy(card)
+            card["name"] = "{} {}".format(card["name"], copy_num)
+            if card["type"] == "normal":
+                card["group"]["colour"] = "{} {}".format(card["group"]["colour"], copy_num)
+            cards.append(card)
+    return cards
+
+
+def scratch_dir() -> str:
+    """A temporary directory that's removed when the program exits"""
+    directory = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, directory, True)
+    return directory
+
+
+def new_session(card_data: List[dict], players: int, money: int = 10 ** 12) -> GameSession:
+    """A session with players that have enough money to never go bankrupt during a benchmark"""
+    session = GameSession(process_card_set(card_data), money, 200)
+    for player_num in range(players):
+        session.add_player("Player {}".format(player_num + 1))
+    return session
+
+
+@benchmark("get_property_small")
+def bench_get_property_small():
+    card_set = process_card_set(get_card_set())
+    return lambda: [get_property(query, card_set) for query in QUERIES], len(QUERIES)
+
+
+@benchmark("get_property_large")
+def bench_get_property_large():
+    card_set = process_card_set(large_card_set(get_card_set(), 20))
+    return lambda: [get_property(query, card_set) for query in QUERIES], len(QUERIES)
+
+
+@benchmark("property_index_large")
+def bench_property_index_large():
+    session = GameSession(process_card_set(large_card_set(get_card_set(), 20)), 1500, 200)
+    index = session.property_index
+    # Only unique queries so the result cache doesn't hide the lookup cost
+    queries = ["{} {}".format(query, num) for num in range(50) for query in QUERIES]
+
+    def run():
+        index._cache.clear()
+        for query in queries:
+            index.get(query)
+
+    return run, len(queries)
+
+
+def bench_step(prop_type: type):
+    session = new_session(get_card_set(), 2)
+    owner, visitor = session.players.values()
+    props = [prop for prop in session.card_set if type(prop) is prop_type]
+    for prop in props:
+        prop.buy(owner)
+    if prop_type is Utility:
+        return lambda: [prop.step_property(visitor, dice_roll=7) for prop in props], len(props)
+    return lambda: [prop.step_property(visitor) for prop in props], len(props)
+
+
+benchmark("step_normal")(lambda: bench_step(NormalProperty))
+benchmark("step_railroad")(lambda: bench_step(Railroad))
+benchmark("step_utility")(lambda: bench_step(Utility))
+
+
+def full_board(players: int) -> GameSession:
+    """A session where every property is owned, dealt out to the players in turn, with houses on full colour sets"""
+    session = new_session(get_card_set(), players)
+    owners = list(session.players.values())
+    for prop_num, prop in enumerate(session.card_set):
+        prop.buy(owners[prop_num % players])
+    for prop in session.card_set:
+        if type(prop) is NormalProperty and prop.check_colour_set():
+            prop.add_house(3)
+    return session
+
+
+@benchmark("get_networth_15")
+def bench_get_networth():
+    players = list(full_board(15).players.values())
+    return lambda: [player.get_networth() for player in players], len(players)
+
+
+@benchmark("compute_networth_15")
+def bench_compute_networth():
+    players = list(full_board(15).players.values())
+    return lambda: [player.compute_networth() for player in players], len(players)
+
+
+@benchmark("get_winner_15")
+def bench_get_winner():
+    session = full_board(15)
+    return lambda: get_winner(session.players), 1
+
+
+@benchmark("transfer_all_properties")
+def bench_transfer_all_properties():
+    session = full_board(2)
+    first, second = session.players.values()
+
+    def run():
+        first.transfer_all_properties(second)
+        second.transfer_all_properties(first)
+
+    return run, 2
+
+
+@benchmark("process_card_set")
+def bench_process_card_set():
+    return lambda: process_card_set(get_card_set()), 1
+
+
+@benchmark("journal_record")
+def bench_journal_record():
+    directory = scratch_dir()
+    session = new_session(get_card_set(), 4)
+    journal = Journal(session, os.path.join(directory, "journal.jsonl"), os.path.join(directory, "snapshot.json"),
+                      snapshot_every=10 ** 9)
+    player = session.players["Player 1"]
+    return lambda: [player.add_money(1) for _ in range(100)], 100, journal.close
+
+
+@benchmark("journal_snapshot")
+def bench_journal_snapshot():
+    directory = scratch_dir()
+    session = full_board(15)
+    journal = Journal(session, os.path.join(directory, "journal.jsonl"), os.path.join(directory, "snapshot.json"))
+    return journal.snapshot, 1, journal.close
+
+
+@benchmark("journal_restore")
+def bench_journal_restore():
+    directory = scratch_dir()
+    journal_path, snapshot_path = os.path.join(directory, "journal.jsonl"), os.path.join(directory, "snapshot.json")
+    session = full_board(15)
+    journal = Journal(session, journal_path, snapshot_path, snapshot_every=10 ** 9)
+    journal.snapshot()
+    for player in session.players.values():
+        for _ in range(100):
+            player.add_money(1)
+    journal.close()
+    card_data = get_card_set()
+    return lambda: restore_session(GameSession(process_card_set(card_data), 1500, 200), journal_path,
+                                   snapshot_path), 1
+
+
+def time_benchmark(run: Callable, ops: int, repeat: int, min_time: float) -> Dict[str, float]:
+    """Time a benchmark, calling it enough times for each of the repeats to take at least min_time seconds"""
+    run()
+    calls = 1
+    while True:
+        start = perf_counter_ns()
+        for _ in range(calls):
+            run()
+        elapsed = perf_counter_ns() - start
+        if elapsed >= min_time * 1e9:
+            break
+        calls *= 2
+    timings = [elapsed]
+    for _ in range(repeat - 1):
+        start = perf_counter_ns()
+        for _ in range(calls):
+            run()
+        timings.append(perf_counter_ns() - start)
+    per_op = [timing / (calls * ops) for timing in timings]
+    return {"ns_per_op": min(per_op), "median_ns_per_op": median(per_op), "ops": calls * ops}
+
+
+def run_benchmarks(names: List[str] = None, repeat: int = 5, min_time: float = 0.1) -> dict:
+    """Run benchmarks (all of them by default) and get their results with details of the machine"""
+    results = {}
+    for name in names or BENCHMARKS:
+        run, ops, *teardown = BENCHMARKS[name]()
+        try:
+            results[name] = time_benchmark(run, ops, repeat, min_time)
+        finally:
+            for close in teardown:
+                close()
+    return {"time": datetime.datetime.now().isoformat(), "python": platform.python_version(),
+            "platform": platform.platform(), "results": results}
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[Tuple[str, float, float, float, bool]]:
+    """Compare results to a baseline, returns (name, result, baseline, ratio, regressed) for every shared benchmark"""
+    comparison = []
+    for name, result in results["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        ratio = result["ns_per_op"] / base["ns_per_op"]
+        comparison.append((name, result["ns_per_op"], base["ns_per_op"], ratio, ratio > 1 + tolerance))
+    return comparison
+
+
+def format_results(results: dict, comparison: List[Tuple[str, float, float, float, bool]] = None) -> str:
+    """Format benchmark results, and their comparison to a baseline if given, as text"""
+    compared = {row[0]: row for row in comparison or []}
+    lines = ["{:<26} {:>14} {:>14} {:>14} {:>8}".format("Benchmark", "ns/op", "Median ns/op", "Baseline", "Ratio")]
+    for name, result in results["results"].items():
+        line = "{:<26} {:>14,.0f} {:>14,.0f}".format(name, result["ns_per_op"], result["median_ns_per_op"])
+        if name in compared:
+            _, _, base, ratio, regressed = compared[name]
+            line += " {:>14,.0f} {:>7.2f}x{}".format(base, ratio, " REGRESSION" if regressed else "")
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the models and helpers hot paths")
+    parser.add_argument("benchmarks", nargs="*", help="benchmarks to run (default: all of {})".format(
+        ", ".join(BENCHMARKS)))
+    parser.add_argument("--output", default=RESULTS_PATH, help="file the results are written to as JSON")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="also save the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="slowdown over the baseline counted as a regression (0.2: 20%%)")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repeats of every benchmark")
+    parser.add_argument("--min-time", type=float, default=0.1, help="minimum seconds every repeat takes")
+    args = parser.parse_args()
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error("unknown benchmark {}".format(name))
+
+    results = run_benchmarks(args.benchmarks or None, args.repeat, args.min_time)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    comparison = None
+    if os.path.isfile(args.baseline) and not args.save_baseline:
+        with open(args.baseline, "r") as f:
+            comparison = compare(results, json.load(f), args.tolerance)
+    elif not args.save_baseline:
+        print("No baseline at {}, run with --save-baseline to make one".format(args.baseline), file=sys.stderr)
+    print(format_results(results, comparison))
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+    if comparison is not None and any(row[4] for row in comparison):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,430 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+from array import array
+from typing import List, Union
+
+from models.events import HOUSES, MORTGAGE, STEP
+from models.exceptions import *
+from models.properties import Property, NormalProperty, Railroad, Utility
+from .session import GameSession
+from .state import apply_event, set_money
+
+NO_OWNER = -1
+NORMAL, RAILROAD, UTILITY = 0, 1, 2
+KINDS = {NormalProperty: NORMAL, Railroad: RAILROAD, Utility: UTILITY}
+
+# Columns of a BoardState and their array type codes
+PLAYER_COLUMNS = (("money", "q"), ("in_jail", "b"), ("bankrupt_ignored", "b"))
+PROPERTY_COLUMNS = (("owner", "b"), ("houses", "b"), ("mortgaged", "b"), ("times_stepped", "q"),
+                    ("stepped_price", "q"))
+
+
+class CardTable:
+    """The parts of a card set that never change during a game, shared by every board state made from it"""
+    __slots__ = ("names", "index", "kinds", "colours", "set_sizes", "members", "rent_tables", "prices",
+                 "house_prices", "mortgage_prices", "unmortgage_prices")
+
+    def __init__(self, card_set: List[Property]):
+        self.names = tuple(prop.name for prop in card_set)
+        self.index = {name: prop_num for prop_num, name in enumerate(self.names)}
+        self.kinds = tuple(KINDS[type(prop)] for prop in card_set)
+        self.colours = tuple(prop.group["colour"] if type(prop) is NormalProperty else None for prop in card_set)
+        # Number of properties of the same rent group needed for a full set (only used for normal properties)
+        self.set_sizes = tuple(prop.group["count"] if type(prop) is NormalProperty else 0 for prop in card_set)
+        # Properties sharing the rent group of every property (same colour, or every railroad / utility)
+        groups = {}
+        for prop_num, prop in enumerate(card_set):
+            groups.setdefault(prop.rent_group, []).append(prop_num)
+        self.members = tuple(tuple(groups[prop.rent_group]) for prop in card_set)
+        self.rent_tables = tuple(prop.rent_table for prop in card_set)
+        self.prices = tuple(prop.price for prop in card_set)
+        self.house_prices = tuple(getattr(prop, "house_price", 0) for prop in card_set)
+        self.mortgage_prices = tuple(prop.mortgage_price for prop in card_set)
+        self.unmortgage_prices = tuple(prop.unmortgage_price for prop in card_set)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+class BoardState:
+    """Compact copy of the state of a game, one array per column instead of one object per player and property.
+
+    Players and properties are referred to by their position (in the session and the card set). The card set data is
+    shared by every copy, so copy() only copies a few small arrays and fork() copies nothing until the fork is changed.
+    The game methods follow the same rules (and raise the same errors) as the Player and Property methods, but don't
+    notify anyone; apply_to writes a state back into a session, sending the events of every change.
+    """
+    __slots__ = ("table", "player_names", "money", "in_jail", "bankrupt_ignored", "owner", "houses", "mortgaged",
+                 "times_stepped", "stepped_price", "_shared")
+
+    def __init__(self, table: CardTable, player_names: List[str]):
+        self.table = table
+        self.player_names = list(player_names)
+        for column, typecode in PLAYER_COLUMNS:
+            setattr(self, column, array(typecode, bytes(array(typecode).itemsize * len(player_names))))
+        for column, typecode in PROPERTY_COLUMNS:
+            setattr(self, column, array(typecode, bytes(array(typecode).itemsize * len(table))))
+        for prop_num in range(len(table)):
+            self.owner[prop_num] = NO_OWNER
+        self._shared = False
+
+    @classmethod
+    def from_objects(cls, players: dict, card_set: List[Property], table: CardTable = None) -> 'BoardState':
+        """Copy the state of a player dict (name: Player) and its card set into new arrays, field by field, reusing the
+        card table if one is given"""
+        state = cls(table or CardTable(card_set), list(players))
+        player_nums = {player: player_num for player_num, player in enumerate(players.values())}
+        for player, player_num in player_nums.items():
+            state.money[player_num] = player.get_money()
+            state.in_jail[player_num] = player.in_jail
+            state.bankrupt_ignored[player_num] = player.bankrupt_ignored
+        for prop_num, prop in enumerate(card_set):
+            state.owner[prop_num] = player_nums[prop.owner] if prop.owner is not None else NO_OWNER
+            state.houses[prop_num] = getattr(prop, "houses", 0)
+            state.mortgaged[prop_num] = prop.mortgaged
+            state.times_stepped[prop_num] = prop.times_stepped
+            state.stepped_price[prop_num] = prop.stepped_price
+        return state
+
+    @classmethod
+    def from_session(cls, session: GameSession, table: CardTable = None) -> 'BoardState':
+        """Read the state of a session"""
+        return cls.from_objects(session.players, session.card_set, table)
+
+    def apply_to(self, session: GameSession):
+        """Write the state into a session (made from the same card set, with the same players) as one batch"""
+        players = [session.get_player(name) for name in self.player_names]
+        with session.batch():
+            for player_num, player in enumerate(players):
+                set_money(player, self.money[player_num])
+                if player.in_jail != bool(self.in_jail[player_num]):
+                    player.jail() if self.in_jail[player_num] else player.unjail()
+                if player.bankrupt_ignored != bool(self.bankrupt_ignored[player_num]):
+                    player.ignore_bankrupt() if self.bankrupt_ignored[player_num] else player.unignore_bankrupt()
+            for prop_num, prop in enumerate(session.card_set):
+                owner = players[self.owner[prop_num]] if self.owner[prop_num] != NO_OWNER else None
+                if prop.owner is owner:
+                    self._apply_property(prop, prop_num)
+                    continue
+                # The events of a property are sent by its owner, so they're sent before it loses it or after it
+                # gets a new one
+                if owner is None:
+                    self._apply_property(prop, prop_num)
+                if prop.owner is not None:
+                    prop.owner.remove_property(prop)
+                if owner is not None:
+                    owner.add_property(prop)
+                    self._apply_property(prop, prop_num)
+
+    def _apply_property(self, prop: Property, prop_num: int):
+        """Write the mortgage state, houses and step statistics of a property, sending their events through its
+        owner"""
+        mortgaged, houses = bool(self.mortgaged[prop_num]), self.houses[prop_num]
+        steps = self.times_stepped[prop_num] - prop.times_stepped
+        rent = self.stepped_price[prop_num] - prop.stepped_price
+        if prop.mortgaged == mortgaged and getattr(prop, "houses", 0) == houses and steps == 0 and rent == 0:
+            return
+        if prop.owner is None:
+            raise PropertyNotOwned("{} has no owner to send the changes of its state".format(prop.name))
+        if prop.mortgaged != mortgaged:
+            apply_event(MORTGAGE, prop.owner, {"prop": prop, "old": prop.mortgaged, "new": mortgaged})
+        if getattr(prop, "houses", 0) != houses:
+            apply_event(HOUSES, prop.owner, {"prop": prop, "old": prop.houses, "new": houses})
+        if steps != 0 or rent != 0:
+            apply_event(STEP, prop.owner, {"prop": prop, "rent": rent, "steps": steps})
+
+    def copy(self) -> 'BoardState':
+        """Get an independent copy of the state"""
+        state = BoardState.__new__(BoardState)
+        state.table = self.table
+        state.player_names = list(self.player_names)
+        for column, _ in PLAYER_COLUMNS + PROPERTY_COLUMNS:
+            setattr(state, column, getattr(self, column)[:])
+        state._shared = False
+        return state
+
+    def fork(self) -> 'BoardState':
+        """Get a copy of the state sharing its arrays until either of them is changed (copy on write)"""
+        state = BoardState.__new__(BoardState)
+        state.table = self.table
+        state.player_names = self.player_names
+        for column, _ in PLAYER_COLUMNS + PROPERTY_COLUMNS:
+            setattr(state, column, getattr(self, column))
+        state._shared = self._shared = True
+        return state
+
+    def _own(self):
+        """Copy the arrays shared with forks before changing them"""
+        if self._shared:
+            self.player_names = list(self.player_names)
+            for column, _ in PLAYER_COLUMNS + PROPERTY_COLUMNS:
+                setattr(self, column, getattr(self, column)[:])
+            self._shared = False
+
+    def key(self) -> bytes:
+        """Get a hashable key of everything that affects the rest of the game (not the step statistics)"""
+        return b"".join((self.money.tobytes(), self.in_jail.tobytes(), self.owner.tobytes(), self.houses.tobytes(),
+                         self.mortgaged.tobytes()))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, BoardState):
+            return NotImplemented
+        return self.table is other.table and self.player_names == other.player_names and \
+            all(getattr(self, column) == getattr(other, column) for column, _ in PLAYER_COLUMNS + PROPERTY_COLUMNS)
+
+    # Queries
+
+    def get_player_num(self, name: str) -> int:
+        """Get the position of a player by name"""
+        try:
+            return self.player_names.index(name)
+        except ValueError as e:
+            raise NotFound("Could not find player with name " + name) from e
+
+    def get_prop_num(self, name: str) -> int:
+        """Get the position of a property in the card set by its exact name"""
+        try:
+            return self.table.index[name]
+        except KeyError as e:
+            raise NotFound("Couldn't find property {} in property list.".format(name)) from e
+
+    def get_properties(self, player_num: int) -> List[int]:
+        """Get the properties a player owns"""
+        return [prop_num for prop_num, owner in enumerate(self.owner) if owner == player_num]
+
+    def group_count(self, prop_num: int) -> int:
+        """Get the number of properties of the rent group of a property its owner has"""
+        owner = self.owner[prop_num]
+        return sum(1 for member in self.table.members[prop_num] if self.owner[member] == owner)
+
+    def has_colour_set(self, prop_num: int) -> bool:
+        """Check whether the owner of a normal property has its entire colour set"""
+        return self.owner[prop_num] != NO_OWNER and self.group_count(prop_num) == self.table.set_sizes[prop_num]
+
+    def get_rent(self, prop_num: int, dice_roll: int = 0) -> int:
+        """Get the rent of an owned property as it is now"""
+        kind = self.table.kinds[prop_num]
+        if kind == NORMAL:
+            return self.table.rent_tables[prop_num][self.houses[prop_num] + 6 * self.has_colour_set(prop_num)]
+        rent = self.table.rent_tables[prop_num][self.group_count(prop_num)]
+        return rent * dice_roll if kind == UTILITY else rent
+
+    def get_value(self, prop_num: int) -> int:
+        """Get how much a property adds to its owner's net worth"""
+        value = self.table.prices[prop_num] + self.houses[prop_num] * self.table.house_prices[prop_num]
+        if self.mortgaged[prop_num]:
+            value -= self.table.unmortgage_prices[prop_num]
+        return value
+
+    def get_networth(self, player_num: int) -> int:
+        """Get the net worth of a player"""
+        return self.money[player_num] + sum(self.get_value(prop_num) for prop_num, owner in enumerate(self.owner)
+                                            if owner == player_num)
+
+    # Game actions, following the rules of the Player and Property methods of the same names
+
+    def _check_owned(self, prop_num: int):
+        """Raise PropertyNotOwned if the property has no owner"""
+        if self.owner[prop_num] == NO_OWNER:
+            raise PropertyNotOwned("This function requires this property to be owned")
+
+    def _check_normal(self, prop_num: int):
+        """Raise UnexpectedValue if the property isn't a normal property, the only kind with houses"""
+        if self.table.kinds[prop_num] != NORMAL:
+            raise UnexpectedValue("{} can't have houses".format(self.table.names[prop_num]))
+
+    def add_money(self, player_num: int, amount: int):
+        """Add money to a player, a negative amount takes money away"""
+        self._own()
+        self.money[player_num] += amount
+
+    def buy(self, player_num: int, prop_num: int, amount: int = None):
+        """Buy a property for its price, or for an auction amount"""
+        if self.owner[prop_num] != NO_OWNER:
+            raise PropertyAlreadyOwned("The property is already owned by {}, do you mean to transfer the property?"
+                                       .format(self.player_names[self.owner[prop_num]]))
+        self._own()
+        self.owner[prop_num] = player_num
+        self.money[player_num] -= self.table.prices[prop_num] if amount is None else amount
+
+    def transfer(self, prop_num: int, to: int):
+        """Transfer a property to another player"""
+        self._check_owned(prop_num)
+        self._own()
+        self.owner[prop_num] = to
+
+    def mortgage(self, prop_num: int):
+        """Mortgage a property, paying its owner the mortgage price"""
+        self._check_owned(prop_num)
+        if self.mortgaged[prop_num]:
+            raise AlreadyChosenValue("The property is already mortgaged")
+        self._own()
+        self.mortgaged[prop_num] = True
+        self.money[self.owner[prop_num]] += self.table.mortgage_prices[prop_num]
+
+    def unmortgage(self, prop_num: int):
+        """Unmortgage a property, its owner paying the unmortgage price"""
+        self._check_owned(prop_num)
+        if not self.mortgaged[prop_num]:
+            raise AlreadyChosenValue("The property is not mortgaged")
+        self._own()
+        self.mortgaged[prop_num] = False
+        self.money[self.owner[prop_num]] -= self.table.unmortgage_prices[prop_num]
+
+    def add_house(self, prop_num: int, num: int):
+        """Add houses to a property of a complete colour set, its owner paying for them"""
+        self._check_normal(prop_num)
+        self._check_owned(prop_num)
+        if not self.has_colour_set(prop_num):
+            raise LimitReached("You cannot have any houses without a colour set")
+        if self.houses[prop_num] + num > 5:
+            raise LimitReached("Adding too many houses. You can add at most {} houses"
+                               .format(5 - self.houses[prop_num]))
+        self._own()
+        self.houses[prop_num] += num
+        self.money[self.owner[prop_num]] -= self.table.house_prices[prop_num] * num
+
+    def sell_house(self, prop_num: int, num: int):
+        """Sell houses of a property for half their price"""
+        self._check_normal(prop_num)
+        self._check_owned(prop_num)
+        if self.houses[prop_num] - num < 0:
+            raise LimitReached("Selling too many houses. You can sell at most {} houses".format(self.houses[prop_num]))
+        self._own()
+        self.houses[prop_num] -= num
+        self.money[self.owner[prop_num]] += self.table.house_prices[prop_num] * num // 2
+
+    def step_property(self, player_num: int, prop_num: int, dice_roll: int = 0) -> int:
+        """Have a player step on a property and pay its owner, returns the rent"""
+        self._check_owned(prop_num)
+        owner = self.owner[prop_num]
+        if self.mortgaged[prop_num]:
+            raise NoPaymentNeeded("The property is mortgaged")
+        if self.in_jail[owner]:
+            raise NoPaymentNeeded("The property owner is in jail")
+        rent = self.get_rent(prop_num, dice_roll)
+        self._own()
+        self.money[player_num] -= rent
+        self.money[owner] += rent
+        self.times_stepped[prop_num] += 1
+        self.stepped_price[prop_num] += rent
+        return rent
+
+    # Read only views with the attribute names of Player and Property
+
+    def get_player(self, player_num: int) -> 'PlayerView':
+        """Get a read only view of a player"""
+        return PlayerView(self, player_num)
+
+    def get_property(self, prop_num: int) -> 'PropertyView':
+        """Get a read only view of a property"""
+        return PropertyView(self, prop_num)
+
+
+class PlayerView:
+    """A player of a BoardState, read through the same names as a Player without copying anything"""
+    __slots__ = ("state", "num")
+
+    def __init__(self, state: BoardState, num: int):
+        self.state = state
+        self.num = num
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PlayerView) and other.state is self.state and other.num == self.num
+
+    def __hash__(self) -> int:
+        return hash(self.num)
+
+    @property
+    def name(self) -> str:
+        return self.state.player_names[self.num]
+
+    @property
+    def in_jail(self) -> bool:
+        return bool(self.state.in_jail[self.num])
+
+    @property
+    def bankrupt_ignored(self) -> bool:
+        return bool(self.state.bankrupt_ignored[self.num])
+
+    @property
+    def properties(self) -> List['PropertyView']:
+        return [PropertyView(self.state, prop_num) for prop_num in self.state.get_properties(self.num)]
+
+    def get_money(self) -> int:
+        return self.state.money[self.num]
+
+    def get_networth(self) -> int:
+        return self.state.get_networth(self.num)
+
+    def check_bankrupt(self) -> bool:
+        return not self.bankrupt_ignored and self.get_money() <= 0
+
+
+class PropertyView:
+    """A property of a BoardState, read through the same names as a Property without copying anything"""
+    __slots__ = ("state", "num")
+
+    def __init__(self, state: BoardState, num: int):
+        self.state = state
+        self.num = num
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PropertyView) and other.state is self.state and other.num == self.num
+
+    def __hash__(self) -> int:
+        return hash(self.num)
+
+    @property
+    def name(self) -> str:
+        return self.state.table.names[self.num]
+
+    @property
+    def owner(self) -> Union[PlayerView, None]:
+        owner = self.state.owner[self.num]
+        return PlayerView(self.state, owner) if owner != NO_OWNER else None
+
+    @property
+    def houses(self) -> int:
+        return self.state.houses[self.num]
+
+    @property
+    def mortgaged(self) -> bool:
+        return bool(self.state.mortgaged[self.num])
+
+    @property
+    def times_stepped(self) -> int:
+        return self.state.times_stepped[self.num]
+
+    @property
+    def stepped_price(self) -> int:
+        return self.state.stepped_price[self.num]
+
+    @property
+    def price(self) -> int:
+        return self.state.table.prices[self.num]
+
+    @property
+    def house_price(self) -> int:
+        return self.state.table.house_prices[self.num]
+
+    @property
+    def mortgage_price(self) -> int:
+        return self.state.table.mortgage_prices[self.num]
+
+    @property
+    def unmortgage_price(self) -> int:
+        return self.state.table.unmortgage_prices[self.num]
+
+    def get_value(self) -> int:
+        return self.state.get_value(self.num)
+
+    def check_colour_set(self) -> bool:
+        return self.state.has_colour_set(self.num)
+
+    def get_current_rent(self) -> int:
+        return self.state.get_rent(self.num, 1)
@@ -0,0 +1,272 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple, Tuple
+
+from helpers.data import process_card_set
+from helpers.file import get_board, get_card_set, get_defaults
+from models.exceptions import *
+from models.properties import Property
+from .board_state import BoardState, CardTable, NO_OWNER, NORMAL
+from .rent_simulator import Board, simulate_landings
+from .session import GameSession
+
+BANKRUPT_SCORE = -10 ** 9  # Added to the score of a state where the player is in debt
+TRADE_PREMIUM = 1.5  # Trades are offered at this multiple of the property price
+BID_LEVELS = (0.5, 0.75, 1.0, 1.25, 1.5)  # Auction bids are tried at these multiples of the property price
+CACHE_SIZE = 200000
+
+# Landing weights of the worker process and its transposition cache, see _init_worker
+_worker_setup = None
+_cache = {}
+
+
+class Action(NamedTuple):
+    """A move of the evaluated player, prop is a position in the card set and other a player position"""
+    kind: str  # pass, build, sell_house, mortgage, unmortgage, trade or bid
+    prop: int = -1
+    amount: int = 0
+    other: int = -1
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+def _init_worker(weights: Tuple[tuple, tuple]):
+    global _worker_setup
+    _worker_setup = weights
+    _cache.clear()
+
+
+def landing_weights(board_layout: dict, card_set: List[Property], walkers: int = 20000, turns: int = 50,
+                    seed: int = 0) -> Tuple[tuple, tuple]:
+    """Get the chance of landing on every property of the card set in one turn and the mean roll landing on it"""
+    board = Board(board_layout, card_set)
+    landings, roll_sums = simulate_landings(board, walkers, turns, seed)
+    frequency = [0.0] * len(card_set)
+    mean_roll = [7.0] * len(card_set)
+    positions = {prop.name: position for position, prop in board.square_properties.items()}
+    for prop_num, prop in enumerate(card_set):
+        position = positions.get(prop.name)
+        if position is not None:
+            frequency[prop_num] = landings[position] / (walkers * turns)
+            mean_roll[prop_num] = roll_sums[position] / max(landings[position], 1)
+    return tuple(frequency), tuple(mean_roll)
+
+
+def round_flows(state: BoardState, weights: Tuple[tuple, tuple]) -> List[float]:
+    """Get the expected money every player gains (or loses) in one round from rent"""
+    frequency, mean_roll = weights
+    flows = [0.0] * len(state.player_names)
+    opponents = len(flows) - 1
+    for prop_num, owner in enumerate(state.owner):
+        if owner == NO_OWNER or state.mortgaged[prop_num] or state.in_jail[owner] or frequency[prop_num] == 0:
+            continue
+        expected = frequency[prop_num] * state.get_rent(prop_num, mean_roll[prop_num])
+        flows[owner] += expected * opponents
+        for player_num in range(len(flows)):
+            if player_num != owner:
+                flows[player_num] -= expected
+    return flows
+
+
+def advance_round(state: BoardState, weights: Tuple[tuple, tuple]):
+    """Move a round ahead, paying every player its expected rent"""
+    for player_num, flow in enumerate(round_flows(state, weights)):
+        state.add_money(player_num, round(flow))
+
+
+def score(state: BoardState, player_num: int) -> float:
+    """Score of a state for a player, its net worth ahead of the richest opponent"""
+    best_opponent = max((state.get_networth(other) for other in range(len(state.player_names)) if other != player_num),
+                        default=0)
+    value = state.get_networth(player_num) - best_opponent
+    if state.money[player_num] < 0:
+        value += BANKRUPT_SCORE
+    return value
+
+
+def candidate_actions(state: BoardState, player_num: int, auction: int = None) -> List[Action]:
+    """Get the moves the player can make: building, selling, (un)mortgaging, trading for properties that extend its
+    groups and, if a property is being auctioned, bids on it"""
+    table = state.table
+    money = state.money[player_num]
+    actions = [Action("pass")]
+    owned_groups = set()
+    for prop_num in state.get_properties(player_num):
+        owned_groups.add(table.members[prop_num])
+        houses = state.houses[prop_num]
+        if table.kinds[prop_num] == NORMAL:
+            if houses < 5 and money >= table.house_prices[prop_num] and state.has_colour_set(prop_num) and \
+                    not any(state.mortgaged[member] for member in table.members[prop_num]):
+                actions.append(Action("build", prop_num))
+            if houses > 0:
+                actions.append(Action("sell_house", prop_num))
+        if state.mortgaged[prop_num]:
+            if money >= table.unmortgage_prices[prop_num]:
+                actions.append(Action("unmortgage", prop_num))
+        elif not any(state.houses[member] for member in table.members[prop_num]):
+            actions.append(Action("mortgage", prop_num))
+    for prop_num, owner in enumerate(state.owner):
+        if owner not in (NO_OWNER, player_num) and table.members[prop_num] in owned_groups and \
+                not any(state.houses[member] for member in table.members[prop_num]):
+            amount = round(table.prices[prop_num] * TRADE_PREMIUM)
+            if money >= amount:
+                actions.append(Action("trade", prop_num, amount, owner))
+    if auction is not None and state.owner[auction] == NO_OWNER:
+        for level in BID_LEVELS:
+            amount = round(table.prices[auction] * level)
+            if money >= amount:
+                actions.append(Action("bid", auction, amount))
+    return actions
+
+
+def apply_action(state: BoardState, player_num: int, action: Action):
+    """Make a move on a state"""
+    if action.kind == "build":
+        state.add_house(action.prop, 1)
+    elif action.kind == "sell_house":
+        state.sell_house(action.prop, 1)
+    elif action.kind == "mortgage":
+        state.mortgage(action.prop)
+    elif action.kind == "unmortgage":
+        state.unmortgage(action.prop)
+    elif action.kind == "trade":
+        state.transfer(action.prop, player_num)
+        state.add_money(player_num, -action.amount)
+        state.add_money(action.other, action.amount)
+    elif action.kind == "bid":
+        state.buy(player_num, action.prop, action.amount)
+    elif action.kind != "pass":
+        raise UnexpectedValue("Unknown action {}".format(action.kind))
+
+
+def search(state: BoardState, player_num: int, depth: int, weights: Tuple[tuple, tuple], deadline: float) -> float:
+    """Best score the player can reach in depth rounds, taking one action before every round"""
+    if depth == 0:
+        return score(state, player_num)
+    key = (state.key(), player_num, depth)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+    if time.monotonic() > deadline:
+        raise _OutOfTime()
+    best = None
+    for action in candidate_actions(state, player_num):
+        child = state.fork()
+        apply_action(child, player_num, action)
+        advance_round(child, weights)
+        value = search(child, player_num, depth - 1, weights, deadline)
+        if best is None or value > best:
+            best = value
+    if len(_cache) >= CACHE_SIZE:
+        _cache.clear()
+    _cache[key] = best
+    return best
+
+
+def evaluate_action(state: BoardState, player_num: int, action: Action, max_depth: int, deadline: float,
+                    weights: Tuple[tuple, tuple] = None) -> Tuple[Action, float, int]:
+    """Score a root action by searching deeper and deeper until max_depth or the deadline, returns the score of the
+    deepest search that finished and its depth"""
+    weights = weights or _worker_setup
+    child = state.fork()
+    apply_action(child, player_num, action)
+    advance_round(child, weights)
+    value, depth = score(child, player_num), 1
+    try:
+        for next_depth in range(1, max_depth):
+            value, depth = search(child, player_num, next_depth, weights, deadline), next_depth + 1
+    except _OutOfTime:
+        pass
+    return action, value, depth
+
+
+def evaluate(players: dict, card_set: List[Property], player_name: str, board_layout: dict = None,
+             max_depth: int = 3, time_budget: float = 2.0, workers: int = None, auction: str = None,
+             weights: Tuple[tuple, tuple] = None) -> List[Tuple[Action, float, int]]:
+    """Score every move a player can make now, best first.
+
+    The state is read from the player dict and card set into a BoardState, and every move is searched up to max_depth
+    rounds ahead (the player moving again before every round, opponents only paying and collecting expected rent) in a
+    process pool, one root move per task. Searches stop deepening when the time budget runs out, states seen before are
+    looked up in a transposition cache. Returns (action, score, depth searched) tuples.
+    """
+    # The monotonic clock is system wide, so the deadline means the same in the worker processes
+    deadline = time.monotonic() + time_budget
+    state = BoardState.from_objects(players, card_set)
+    player_num = state.get_player_num(player_name)
+    if weights is None:
+        weights = landing_weights(board_layout or get_board(), card_set)
+    auction_num = state.get_prop_num(auction) if auction is not None else None
+    actions = candidate_actions(state, player_num, auction_num)
+
+    if workers == 1:
+        _init_worker(weights)
+        results = [evaluate_action(state, player_num, action, max_depth, deadline) for action in actions]
+    else:
+        workers = min(workers or os.cpu_count() or 1, len(actions))
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(weights,)) as executor:
+            futures = [executor.submit(evaluate_action, state, player_num, action, max_depth, deadline)
+                       for action in actions]
+            results = [future.result() for future in futures]
+    return sorted(results, key=lambda result: result[1], reverse=True)
+
+
+def describe_action(action: Action, table: CardTable, player_names: List[str]) -> str:
+    """Describe an action as text"""
+    name = table.names[action.prop] if action.prop >= 0 else None
+    if action.kind == "pass":
+        return "Do nothing"
+    if action.kind == "build":
+        return "Build a house on {}".format(name)
+    if action.kind == "sell_house":
+        return "Sell a house on {}".format(name)
+    if action.kind == "mortgage":
+        return "Mortgage {}".format(name)
+    if action.kind == "unmortgage":
+        return "Unmortgage {}".format(name)
+    if action.kind == "trade":
+        return "Buy {} from {} for ${:,}".format(name, player_names[action.other], action.amount)
+    return "Bid ${:,} on {}".format(action.amount, name)
+
+
+def format_evaluation(results: List[Tuple[Action, float, int]], table: CardTable, player_names: List[str],
+                      limit: int = 10) -> str:
+    """Format evaluated actions as text"""
+    lines = ["{:<50} {:>12} {:>6}".format("Action", "Score", "Depth")]
+    for action, value, depth in results[:limit]:
+        lines.append("{:<50} {:>12,.0f} {:>6}".format(describe_action(action, table, player_names), value, depth))
+    return "\n".join(lines)
+
+
+def main():
+    from .journal import has_saved_session, restore_session
+
+    parser = argparse.ArgumentParser(description="Suggest the best next move of a player in the saved session")
+    parser.add_argument("player", help="name of the player to suggest a move for")
+    parser.add_argument("--depth", type=int, default=3, help="rounds to look ahead")
+    parser.add_argument("--time", type=float, default=2.0, help="time budget in seconds")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes (default: number of cores)")
+    parser.add_argument("--auction", default=None, help="property being auctioned, to also suggest a bid")
+    args = parser.parse_args()
+    if not has_saved_session():
+        raise NotFound("There is no saved session to evaluate")
+    defaults = get_defaults()
+    session = GameSession(process_card_set(get_card_set()), defaults.getint("money"), defaults.getint("go_money"))
+    restore_session(session)
+    results = evaluate(session.players, session.card_set, args.player, max_depth=args.depth, time_budget=args.time,
+                       workers=args.workers, auction=args.auction)
+    print(format_evaluation(results, CardTable(session.card_set), list(session.players)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+from random import Random
+from typing import Dict, Union
+
+from models import Player
+from models.events import HOUSES, MORTGAGE
+from models.exceptions import *
+from models.properties import Utility
+from .rent_simulator import Board, MAX_JAIL_TURNS
+from .session import GameSession
+from .state import apply_event
+from .strategies import Strategy
+
+JAIL_FINE = 50
+
+
+class Game:
+    """A full simulated game, played on a GameSession by a strategy for every player"""
+
+    def __init__(self, session: GameSession, board_layout: dict, strategies: Dict[str, Strategy], rng: Random):
+        self.session = session
+        self.board = Board(board_layout, session.card_set)
+        self.layout = board_layout
+        self.rng = rng
+        self.strategies = {session.get_player(name): strategy for name, strategy in strategies.items()}
+        self.positions = {player: 0 for player in self.strategies}
+        self.jail_turns = {player: 0 for player in self.strategies}
+        self.active = list(self.strategies)
+        self.eliminated = []
+        self.rounds = 0
+
+    def play(self, max_rounds: int):
+        """Play rounds until one player is left or max_rounds rounds were played"""
+        while len(self.active) > 1 and self.rounds < max_rounds:
+            for player in list(self.active):
+                if player in self.active:
+                    self.take_turn(player)
+            self.rounds += 1
+
+    def roll(self):
+        """Roll two dice, returns the total and whether it's doubles"""
+        first, second = self.rng.randint(1, 6), self.rng.randint(1, 6)
+        return first + second, first == second
+
+    def take_turn(self, player: Player):
+        """Roll (again on doubles) and resolve the squares the player lands on"""
+        strategy = self.strategies[player]
+        for throw in range(3):
+            roll, doubles = self.roll()
+            if player.in_jail:
+                self.jail_turns[player] += 1
+                if not doubles and self.jail_turns[player] < MAX_JAIL_TURNS:
+                    break
+                player.unjail()
+                if not doubles:
+                    self.pay(player, JAIL_FINE)
+                    if player not in self.active:
+                        break
+                doubles = False
+            elif doubles and throw == 2:
+                self.send_to_jail(player)
+                break
+            self.move(player, roll)
+            if player not in self.active or player.in_jail or not doubles:
+                break
+        if player in self.active:
+            strategy.unmortgage(player)
+            strategy.build(player)
+
+    def move(self, player: Player, roll: int):
+        """Move a player forward and resolve the square it ends on"""
+        position = (self.positions[player] + roll) % self.board.size
+        if position < self.positions[player]:
+            player.add_go_money()
+        self.positions[player] = position
+        square = self.layout["squares"][position]
+        if square["type"] in ("chance", "community_chest") and self.layout.get(square["type"]):
+            card = self.rng.choice(self.layout[square["type"]])
+            destination, jailed = self.board.card_destination(position, card)
+            if jailed:
+                self.send_to_jail(player)
+                return
+            if card is not None and ("goto" in card or "nearest" in card) and destination < position:
+                player.add_go_money()
+            self.positions[player] = position = destination
+            square = self.layout["squares"][position]
+        if square["type"] == "go_to_jail":
+            self.send_to_jail(player)
+        elif square["type"] == "tax":
+            self.pay(player, square.get("amount", 0))
+        elif square["type"] == "property":
+            self.land_on_property(player, self.board.square_properties[position], roll)
+
+    def land_on_property(self, player: Player, prop, roll: int):
+        """Buy the property if it's unowned and the strategy wants it, otherwise pay the rent"""
+        if prop.owner is None:
+            if self.strategies[player].should_buy(player, prop):
+                prop.buy(player)
+            return
+        if prop.owner is player:
+            return
+        owner = prop.owner
+        try:
+            if type(prop) is Utility:
+                prop.step_property(player, dice_roll=roll)
+            else:
+                prop.step_property(player)
+        except NoPaymentNeeded:
+            return
+        self.settle(player, owner)
+
+    def send_to_jail(self, player: Player):
+        """Send a player to jail"""
+        self.positions[player] = self.board.jail
+        self.jail_turns[player] = 0
+        if not player.in_jail:
+            player.jail()
+
+    def pay(self, player: Player, amount: int):
+        """Pay the bank"""
+        player.subtract_money(amount)
+        self.settle(player, None)
+
+    def settle(self, player: Player, creditor: Union[Player, None]):
+        """Let a player in debt raise money, eliminating it if it can't"""
+        if player.get_money() >= 0:
+            return
+        self.strategies[player].raise_money(player)
+        if player.get_money() >= 0:
+            return
+        if creditor is not None:
+            player.transfer_all_properties(creditor)
+        else:
+            for prop in list(player.properties):
+                # Reset while the player still owns it, so its owner sends the events of the reset
+                if prop.mortgaged:
+                    apply_event(MORTGAGE, player, {"prop": prop, "old": True, "new": False})
+                if getattr(prop, "houses", 0) > 0:
+                    apply_event(HOUSES, player, {"prop": prop, "old": prop.houses, "new": 0})
+                player.remove_property(prop)
+        self.active.remove(player)
+        self.eliminated.append(player)
@@ -0,0 +1,85 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+from models import Player
+from models.exceptions import *
+from .session import GameSession
+from .state import apply_event, revert_event
+
+
+class History:
+    """Unlimited undo and redo of the changes made to a session.
+
+    Changes are kept as the events they sent (which hold the values before and after the change), grouped into one
+    step per change or batch, so memory grows with the number of changes and undoing or redoing a step only costs as
+    much as the step itself. Undo and redo are made as a session batch, so subscribers (the journal, the GUI) follow
+    along and a step that fails halfway is rolled back. Any new change clears the steps that can be redone.
+    """
+
+    def __init__(self, session: GameSession):
+        self.session = session
+        self._undo = []
+        self._redo = []
+        self._current = []
+        self._replaying = False
+        session.subscribe(self.record)
+        session.subscribe_changes(self.commit)
+
+    def record(self, event: str, player: Player, **data):
+        """Session subscriber that collects the events of the current step"""
+        if not self._replaying:
+            self._current.append((event, player, data))
+
+    def commit(self, players: set):
+        """Session change listener that ends the current step"""
+        if self._replaying or len(self._current) == 0:
+            return
+        self._undo.append(tuple(self._current))
+        self._current = []
+        self._redo.clear()
+
+    @property
+    def can_undo(self) -> bool:
+        return len(self._undo) > 0
+
+    @property
+    def can_redo(self) -> bool:
+        return len(self._redo) > 0
+
+    def undo(self):
+        """Undo the last step"""
+        if not self.can_undo:
+            raise LimitReached("There is nothing to undo")
+        self._replay(self._undo[-1], True)
+        self._redo.append(self._undo.pop())
+
+    def redo(self):
+        """Redo the last undone step"""
+        if not self.can_redo:
+            raise LimitReached("There is nothing to redo")
+        self._replay(self._redo[-1], False)
+        self._undo.append(self._redo.pop())
+
+    def _replay(self, step: tuple, undo: bool):
+        # Inside an outer batch the events of the replay would only reach record once _replaying is reset
+        if self.session.in_batch:
+            raise NotAuthorized("Undo and redo can't be part of a batch")
+        self._replaying = True
+        try:
+            with self.session.batch():
+                if undo:
+                    for event, player, data in reversed(step):
+                        revert_event(event, player, data)
+                else:
+                    for event, player, data in step:
+                        apply_event(event, player, data)
+        finally:
+            self._replaying = False
+
+    def close(self):
+        """Stop recording changes"""
+        self.session.unsubscribe(self.record)
+        self.session.unsubscribe_changes(self.commit)
@@ -0,0 +1,185 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import json
+import os
+from os.path import isfile
+
+from models import Player
+from models.events import *
+from models.exceptions import *
+from .session import GameSession
+from .state import set_money, set_property_state
+
+JOURNAL_PATH = "data/journal.jsonl"
+SNAPSHOT_PATH = "data/snapshot.json"
+
+
+class Journal:
+    """Session subscriber that appends every event to a JSON lines journal and takes a snapshot every few events.
+
+    Records hold the values after the change (not deltas) and a sequence number, so replaying the journal on top of
+    the snapshot is safe even if the program died between writing a snapshot and emptying the journal.
+    """
+
+    def __init__(self, session: GameSession, journal_path: str = JOURNAL_PATH, snapshot_path: str = SNAPSHOT_PATH,
+                 snapshot_every: int = 1000):
+        self.session = session
+        self.journal_path = journal_path
+        self.snapshot_path = snapshot_path
+        self.snapshot_every = snapshot_every
+        self.seq = read_snapshot(snapshot_path).get("seq", 0) if isfile(snapshot_path) else 0
+        for entry in read_journal(journal_path, self.seq):
+            self.seq = entry["seq"]
+        self._since_snapshot = 0
+        self._file = open(journal_path, "a", encoding="utf-8")
+        session.subscribe(self.record)
+
+    def record(self, event: str, player: Player, **data):
+        """Append an event to the journal"""
+        self.seq += 1
+        entry = {"seq": self.seq}
+        entry.update(encode_event(event, player, data))
+        self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self._since_snapshot += 1
+        if self._since_snapshot >= self.snapshot_every:
+            self.snapshot()
+
+    def snapshot(self):
+        """Write the full session state to the snapshot file and empty the journal"""
+        state = session_state(self.session)
+        state["seq"] = self.seq
+        with open(self.snapshot_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(self.snapshot_path + ".tmp", self.snapshot_path)
+        self._file.seek(0)
+        self._file.truncate()
+        self._since_snapshot = 0
+
+    def close(self):
+        """Stop recording and close the journal file"""
+        self.session.unsubscribe(self.record)
+        self._file.close()
+
+
+def encode_event(event: str, player: Player, data: dict) -> dict:
+    """Get an event as JSON serializable data holding the values after the change, which apply_record can apply"""
+    entry = {"event": event, "player": player.name}
+    for key, value in data.items():
+        entry[key] = value.name if key == "prop" else value
+    if event == STEP:
+        entry["times_stepped"] = data["prop"].times_stepped
+        entry["stepped_price"] = data["prop"].stepped_price
+    return entry
+
+
+def session_state(session: GameSession) -> dict:
+    """Get the state of the players and properties of a session as JSON serializable data"""
+    players = []
+    for player in session.players.values():
+        players.append({"name": player.name, "money": player.get_money(), "in_jail": player.in_jail,
+                        "bankrupt_ignored": player.bankrupt_ignored,
+                        "properties": [prop.name for prop in player.properties]})
+    properties = {}
+    for prop in session.card_set:
+        properties[prop.name] = {"mortgaged": prop.mortgaged, "houses": getattr(prop, "houses", 0),
+                                 "times_stepped": prop.times_stepped, "stepped_price": prop.stepped_price}
+    return {"players": players, "properties": properties}
+
+
+def read_snapshot(snapshot_path: str = SNAPSHOT_PATH) -> dict:
+    """Read a snapshot file"""
+    with open(snapshot_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_journal(journal_path: str = JOURNAL_PATH, after_seq: int = 0):
+    """Yield the journal records after a sequence number, a torn last line from a crash is ignored"""
+    if not isfile(journal_path):
+        return
+    with open(journal_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                return
+            if entry["seq"] > after_seq:
+                yield entry
+
+
+def has_saved_session(journal_path: str = JOURNAL_PATH, snapshot_path: str = SNAPSHOT_PATH) -> bool:
+    """Check whether there is a snapshot with players to restore"""
+    return isfile(snapshot_path) and len(read_snapshot(snapshot_path).get("players", [])) > 0
+
+
+def restore_session(session: GameSession, journal_path: str = JOURNAL_PATH, snapshot_path: str = SNAPSHOT_PATH):
+    """Load the latest snapshot into an empty session and replay the journal tail on top of it"""
+    snapshot = read_snapshot(snapshot_path)
+    load_state(session, snapshot)
+    for entry in read_journal(journal_path, snapshot.get("seq", 0)):
+        apply_record(session, entry)
+
+
+def load_state(session: GameSession, state: dict):
+    """Load a state (see session_state) into an empty session"""
+    for data in state["players"]:
+        player = session.add_player(data["name"])
+        set_money(player, data["money"])
+        player.in_jail = data["in_jail"]
+        player.bankrupt_ignored = data["bankrupt_ignored"]
+        for prop_name in data["properties"]:
+            player.add_property(session.get_card(prop_name))
+    for prop in session.card_set:
+        data = state["properties"].get(prop.name)
+        if data is not None:
+            set_property_state(prop, data["mortgaged"], data["houses"])
+            prop.times_stepped = data["times_stepped"]
+            prop.stepped_price = data["stepped_price"]
+
+
+def apply_record(session: GameSession, entry: dict):
+    """Apply a journal record to a session"""
+    event = entry["event"]
+    if event == NAME:
+        if entry["old"] in session.players:
+            session.get_player(entry["old"]).change_name(entry["new"])
+        return
+    if event == PLAYER_ADDED:
+        if entry["player"] not in session.players:
+            set_money(session.add_player(entry["player"]), entry["money"])
+        return
+    if event == PLAYER_REMOVED:
+        if entry["player"] in session.players:
+            session.remove_player(entry["player"])
+        return
+    player = session.get_player(entry["player"])
+    prop = session.get_card(entry["prop"]) if "prop" in entry else None
+    if event == MONEY:
+        set_money(player, entry["new"])
+    elif event == JAIL:
+        player.in_jail = entry["new"]
+    elif event == BANKRUPT_IGNORED:
+        player.bankrupt_ignored = entry["new"]
+    elif event == PROPERTY_ADDED:
+        if prop.owner is not player:
+            if prop.owner is not None:
+                prop.owner.remove_property(prop)
+            player.add_property(prop, entry.get("index"))
+    elif event == PROPERTY_REMOVED:
+        if prop.owner is player:
+            player.remove_property(prop)
+    elif event == MORTGAGE:
+        set_property_state(prop, mortgaged=entry["new"])
+    elif event == HOUSES:
+        set_property_state(prop, houses=entry["new"])
+    elif event == STEP:
+        prop.times_stepped = entry["times_stepped"]
+        prop.stepped_price = entry["stepped_price"]
+    else:
+        raise UnexpectedValue("Unknown event {} in journal".format(event))
@@ -0,0 +1,148 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+from random import Random
+from typing import List
+
+from helpers.file import get_card_set
+from .server import GameServer, encode_message
+from .tournament import percentile
+
+PLAYERS = ["Player 1", "Player 2", "Player 3", "Player 4"]
+
+
+class LoadClient:
+    """A connection to a game server sending one request at a time and counting the deltas it gets in between"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.deltas = 0
+        self._next_id = 0
+
+    async def request(self, op: str, **kwargs) -> dict:
+        self._next_id += 1
+        kwargs.update(op=op, id=self._next_id)
+        self.writer.write(encode_message(kwargs))
+        await self.writer.drain()
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                raise ConnectionError("The server closed the connection")
+            message = json.loads(line)
+            if "events" in message:
+                self.deltas += 1
+            elif message.get("id") == self._next_id:
+                return message
+
+
+def random_command(rng: Random, table: str, properties: List[dict]) -> dict:
+    """Pick a random game command, some of them break the rules (like stepping on an unowned property) on purpose"""
+    prop = rng.choice(properties)
+    player = rng.choice(PLAYERS)
+    op = rng.choices(["step", "buy", "transfer_money", "mortgage", "unmortgage", "build"], [40, 20, 15, 10, 10, 5])[0]
+    command = {"op": op, "table": table, "prop": prop["name"], "player": player}
+    if op == "step" and prop["type"] == "utility":
+        command["dice_roll"] = rng.randint(2, 12)
+    elif op == "transfer_money":
+        command.update({"from": player, "to": rng.choice(PLAYERS), "amount": rng.randint(1, 200)})
+    elif op == "build":
+        command["houses"] = 1
+    return command
+
+
+async def run_client(client_num: int, connect, tables: int, commands: int, watch: bool, seed: int,
+                     properties: List[dict]) -> dict:
+    """Create tables over one connection and send random commands to them, returns the latencies and outcomes"""
+    rng = Random("{}:{}".format(seed, client_num))
+    client = LoadClient(*await connect())
+    table_ids = []
+    for table_num in range(tables):
+        response = await client.request("create_table", players=PLAYERS)
+        table_ids.append(response["result"])
+        if watch:
+            await client.request("subscribe", table=response["result"])
+    latencies = []
+    outcomes = Counter()
+    for _ in range(commands):
+        command = random_command(rng, rng.choice(table_ids), properties)
+        start = time.perf_counter()
+        response = await client.request(**command)
+        latencies.append(time.perf_counter() - start)
+        outcomes["ok" if response["ok"] else response["error"]] += 1
+    for table_id in table_ids:
+        await client.request("close_table", table=table_id)
+    client.writer.close()
+    return {"latencies": latencies, "outcomes": outcomes, "deltas": client.deltas}
+
+
+async def run_load_test(connections: int, tables: int, commands: int, watch: bool = True, seed: int = 0,
+                        host: str = "127.0.0.1", port: int = 8765, path: str = None, local: bool = False) -> dict:
+    """Run connections concurrent clients against a server (or a server started in this process if local is set)"""
+    listener = None
+    if local:
+        listener = await GameServer(history_limit=1000).serve(host, 0 if path is None else port, path)
+        if path is None:
+            port = listener.sockets[0].getsockname()[1]
+
+    async def connect():
+        if path is not None:
+            return await asyncio.open_unix_connection(path)
+        return await asyncio.open_connection(host, port)
+
+    properties = get_card_set()
+    start = time.perf_counter()
+    results = await asyncio.gather(*[run_client(client_num, connect, tables, commands, watch, seed, properties)
+                                     for client_num in range(connections)])
+    elapsed = time.perf_counter() - start
+    if listener is not None:
+        listener.close()
+        await listener.wait_closed()
+
+    latencies = [latency for result in results for latency in result["latencies"]]
+    outcomes = Counter()
+    for result in results:
+        outcomes.update(result["outcomes"])
+    return {"elapsed": elapsed, "latencies": latencies, "outcomes": outcomes,
+            "deltas": sum(result["deltas"] for result in results), "tables": connections * tables}
+
+
+def format_load_test(results: dict) -> str:
+    """Format load test results as text"""
+    latencies = results["latencies"]
+    lines = ["{:,} tables, {:,} commands in {:.2f}s ({:,.0f} commands/s), {:,} deltas received".format(
+        results["tables"], len(latencies), results["elapsed"], len(latencies) / results["elapsed"], results["deltas"]),
+        "Latency (ms): P50 {:.2f}, P95 {:.2f}, P99 {:.2f}, max {:.2f}".format(
+            percentile(latencies, 0.5) * 1000, percentile(latencies, 0.95) * 1000,
+            percentile(latencies, 0.99) * 1000, max(latencies) * 1000)]
+    for outcome, count in results["outcomes"].most_common():
+        lines.append("{:<20} {:>10,}".format(outcome, count))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send random commands to a game server from many connections")
+    parser.add_argument("--host", default="127.0.0.1", help="address of the server")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port of the server")
+    parser.add_argument("--unix", default=None, help="connect to this Unix socket path instead of a TCP port")
+    parser.add_argument("--connections", type=int, default=100, help="number of concurrent connections")
+    parser.add_argument("--tables", type=int, default=10, help="tables created by every connection")
+    parser.add_argument("--commands", type=int, default=1000, help="commands sent by every connection")
+    parser.add_argument("--no-watch", action="store_true", help="don't subscribe to the deltas of the tables")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random commands")
+    parser.add_argument("--local", action="store_true", help="start a server in this process instead of connecting")
+    args = parser.parse_args()
+    print(format_load_test(asyncio.run(run_load_test(args.connections, args.tables, args.commands, not args.no_watch,
+                                                     args.seed, args.host, args.port, args.unix, args.local))))
+
+
+if __name__ == "__main__":
+    main()
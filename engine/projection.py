@@ -0,0 +1,175 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import argparse
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, wait
+from random import Random
+from typing import Dict, List, Tuple
+
+from helpers.data import process_card_set
+from helpers.file import get_board, get_card_set, get_defaults
+from models.exceptions import *
+from .game import Game
+from .journal import load_state, session_state
+from .session import GameSession
+from .strategies import STRATEGIES
+
+Z_95 = 1.959964  # Standard normal quantile of a 95% confidence interval
+
+# Card set, board layout and go money of the worker process, set once by _init_worker
+_worker_setup = None
+
+
+def _init_worker(card_data: List[dict], board_layout: dict, go_money: int):
+    global _worker_setup
+    _worker_setup = (card_data, board_layout, go_money)
+
+
+def wilson_interval(wins: float, games: int, z: float = Z_95) -> Tuple[float, float]:
+    """Get the Wilson score confidence interval of a win probability, which stays within 0 to 1 and works for
+    probabilities close to either end unlike the normal approximation"""
+    if games == 0:
+        return 0.0, 1.0
+    p = wins / games
+    denominator = 1 + z * z / games
+    centre = (p + z * z / (2 * games)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def play_continuation(state: dict, strategy_name: str, seed: int, game_num: int, rounds: int) -> List[str]:
+    """Play a simulated game from a session state for a number of rounds and return the names of the players with the
+    highest net worth at the end"""
+    card_data, board_layout, go_money = _worker_setup
+    rng = Random("{}:{}".format(seed, game_num))
+    session = GameSession(process_card_set(card_data), 0, go_money)
+    load_state(session, state)
+    game = Game(session, board_layout, {name: STRATEGIES[strategy_name]() for name in session.players}, rng)
+    # Board positions aren't tracked, so every player starts from a random square
+    for player in game.positions:
+        game.positions[player] = rng.randrange(game.board.size)
+    for player in list(game.active):
+        game.settle(player, None)
+    game.play(rounds)
+    winner, _, tied = session.get_winner()
+    return winner if tied else [winner]
+
+
+def _play_batch(state: dict, strategy_name: str, seed: int, start: int, stop: int, rounds: int) -> Dict[str, float]:
+    """Play continuations start to stop in a worker process and return the wins of every player, tied wins are
+    split between the tied players"""
+    wins = {player["name"]: 0.0 for player in state["players"]}
+    for game_num in range(start, stop):
+        winners = play_continuation(state, strategy_name, seed, game_num, rounds)
+        for name in winners:
+            wins[name] += 1 / len(winners)
+    return wins
+
+
+class Projection:
+    """Win probability of every player of a session, estimated by playing simulated continuations of the current
+    board in a process pool.
+
+    The state of the session is copied when the projection starts, so later changes don't affect it. Continuations are
+    played in batches and nothing blocks: poll collects the batches that finished since the last call, so results can
+    be shown while the rest are still being played. cancel stops the batches that haven't started yet.
+    """
+
+    def __init__(self, session: GameSession, games: int = 2000, rounds: int = 30, strategy: str = "cautious",
+                 batch_size: int = 50, workers: int = None, seed: int = None, card_data: List[dict] = None,
+                 board_layout: dict = None):
+        if strategy not in STRATEGIES:
+            raise NotFound("Unknown strategy {} (available: {})".format(strategy, ", ".join(STRATEGIES)))
+        if len(session.players) < 2:
+            raise LimitReached("A projection needs at least two players")
+        state = session_state(session)
+        seed = random.randrange(2 ** 32) if seed is None else seed
+        self.total = games
+        self.games = 0
+        self.wins = {name: 0.0 for name in session.players}
+        self.canceled = False
+        setup = (get_card_set() if card_data is None else card_data, board_layout or get_board(), session.go_money)
+        self._executor = ProcessPoolExecutor(workers or os.cpu_count() or 1, initializer=_init_worker,
+                                             initargs=setup)
+        self._pending = [(self._executor.submit(_play_batch, state, strategy, seed, start,
+                                                min(start + batch_size, games), rounds), min(batch_size, games - start))
+                         for start in range(0, games, batch_size)]
+
+    @property
+    def finished(self) -> bool:
+        return len(self._pending) == 0
+
+    def poll(self) -> bool:
+        """Add the results of every batch that finished since the last poll, returns whether new results came in"""
+        updated = False
+        pending = []
+        for future, batch_games in self._pending:
+            if not future.done():
+                pending.append((future, batch_games))
+                continue
+            for name, wins in future.result().items():
+                self.wins[name] += wins
+            self.games += batch_games
+            updated = True
+        self._pending = pending
+        if self.finished:
+            self._executor.shutdown(wait=False)
+        return updated
+
+    def wait(self):
+        """Block until every batch finished and add their results, for headless use"""
+        wait([future for future, _ in self._pending])
+        self.poll()
+
+    def cancel(self):
+        """Stop playing continuations, the results so far are kept"""
+        self.canceled = True
+        self._pending = []
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def results(self) -> List[Tuple[str, float, float, float]]:
+        """Get (player, win probability, interval low, interval high) for every player, most likely winner first"""
+        rows = []
+        for name, wins in self.wins.items():
+            low, high = wilson_interval(wins, self.games)
+            rows.append((name, wins / self.games if self.games > 0 else 0.0, low, high))
+        return sorted(rows, key=lambda row: row[1], reverse=True)
+
+
+def format_projection(projection: Projection) -> str:
+    """Format the results of a projection as text"""
+    lines = ["{:,} of {:,} games played".format(projection.games, projection.total),
+             "{:<24} {:>8} {:>16}".format("Player", "Win %", "95% Interval")]
+    for name, probability, low, high in projection.results():
+        lines.append("{:<24} {:>8.1f} {:>7.1f} - {:>5.1f}".format(name, 100 * probability, 100 * low, 100 * high))
+    return "\n".join(lines)
+
+
+def main():
+    from .journal import has_saved_session, restore_session
+
+    parser = argparse.ArgumentParser(description="Project the winner of the saved session")
+    parser.add_argument("--games", type=int, default=2000, help="number of continuations to play")
+    parser.add_argument("--rounds", type=int, default=30, help="rounds played in every continuation")
+    parser.add_argument("--strategy", default="cautious", choices=list(STRATEGIES), help="strategy of every player")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes (default: number of cores)")
+    parser.add_argument("--seed", type=int, default=None, help="seed, the same seed gives the same results")
+    args = parser.parse_args()
+    if not has_saved_session():
+        raise NotFound("There is no saved session to project")
+    defaults = get_defaults()
+    session = GameSession(process_card_set(get_card_set()), defaults.getint("money"), defaults.getint("go_money"))
+    restore_session(session)
+    projection = Projection(session, args.games, args.rounds, args.strategy, workers=args.workers, seed=args.seed)
+    projection.wait()
+    print(format_projection(projection))
+
+
+if __name__ == "__main__":
+    main()
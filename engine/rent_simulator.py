@@ -0,0 +1,234 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import argparse
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from helpers.data import process_card_set
+from helpers.file import get_board, get_card_set
+from models.exceptions import *
+from models.properties import NormalProperty, Railroad, Utility
+
+NORMAL_LEVELS = (0, 0.5, 1, 2, 3, 4, 5)
+NORMAL_LEVEL_NAMES = ("Rent", "Set Rent", "1 House", "2 Houses", "3 Houses", "4 Houses", "Hotel")
+RAILROAD_LEVEL_NAMES = ("1 Railroad", "2 Railroads", "3 Railroads", "4 Railroads")
+UTILITY_LEVEL_NAMES = ("1 Utility", "2 Utilities")
+MAX_JAIL_TURNS = 3
+
+
+class Board:
+    """Array form of a board layout and the card set on it, used by the simulators"""
+
+    def __init__(self, board: dict, card_set: List[Union[NormalProperty, Railroad, Utility]]):
+        squares = board["squares"]
+        self.size = len(squares)
+        self.names = [square["name"] for square in squares]
+        self.types = [square["type"] for square in squares]
+        try:
+            self.jail = self.types.index("jail")
+        except ValueError as e:
+            raise UnexpectedValue("The board layout has no jail square") from e
+        self.go_to_jail = np.array([square_type == "go_to_jail" for square_type in self.types])
+
+        # Board position of every property in the card set, in board order
+        cards = {prop.name: prop for prop in card_set}
+        self.square_properties = {}
+        for position, square in enumerate(squares):
+            if square["type"] != "property":
+                continue
+            try:
+                self.square_properties[position] = cards[square["name"]]
+            except KeyError as e:
+                raise NotFound("Board square {} is not in the card set".format(square["name"])) from e
+        self.properties = list(self.square_properties.values())
+        self.positions = np.array(list(self.square_properties.keys()))
+
+        # Every movement card deck becomes a (square, card) -> (destination, jailed) table
+        self.decks = []
+        for deck in ("chance", "community_chest"):
+            deck_cards = board.get(deck) or []
+            deck_squares = [position for position, square_type in enumerate(self.types) if square_type == deck]
+            if len(deck_cards) == 0 or len(deck_squares) == 0:
+                continue
+            destinations = np.tile(np.arange(self.size)[:, None], (1, len(deck_cards)))
+            jailed = np.zeros((self.size, len(deck_cards)), dtype=bool)
+            for position in deck_squares:
+                for card_num, card in enumerate(deck_cards):
+                    destinations[position, card_num], jailed[position, card_num] = self.card_destination(position,
+                                                                                                         card)
+            self.decks.append((np.isin(np.arange(self.size), deck_squares), destinations, jailed))
+
+    def card_destination(self, position: int, card: Union[dict, None]) -> Tuple[int, bool]:
+        """Get where a movement card sends a player drawing it on a square and whether it jails them"""
+        if card is None:
+            return position, False
+        if card.get("jail"):
+            return self.jail, True
+        if "move" in card:
+            return (position + card["move"]) % self.size, False
+        if "goto" in card:
+            try:
+                return self.names.index(card["goto"]), False
+            except ValueError as e:
+                raise NotFound("Card destination {} is not on the board".format(card["goto"])) from e
+        if "nearest" in card:
+            prop_type = {"railroad": Railroad, "utility": Utility}[card["nearest"]]
+            for offset in range(1, self.size + 1):
+                destination = (position + offset) % self.size
+                if type(self.square_properties.get(destination)) is prop_type:
+                    return destination, False
+        raise UnexpectedValue("Unknown movement card {} in board layout".format(card))
+
+
+def simulate_landings(board: Board, walkers: int, turns: int, seed: int = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Play out dice driven traversals of the board for every walker at once.
+
+    Returns the number of moves that ended on each square and the sum of the dice rolls of those moves (used for
+    utility rent). Doubles roll again, three doubles or the go to jail square/cards send a walker to jail, which it
+    leaves on doubles or after MAX_JAIL_TURNS turns.
+    """
+    rng = np.random.default_rng(seed)
+    position = np.zeros(walkers, dtype=np.int64)
+    in_jail = np.zeros(walkers, dtype=bool)
+    jail_turns = np.zeros(walkers, dtype=np.int8)
+    landings = np.zeros(board.size, dtype=np.int64)
+    roll_sums = np.zeros(board.size, dtype=np.float64)
+    for _ in range(turns):
+        rolling = np.ones(walkers, dtype=bool)
+        for throw in range(3):
+            dice = rng.integers(1, 7, size=(2, walkers))
+            roll = dice[0] + dice[1]
+            doubles = dice[0] == dice[1]
+            if throw == 0:
+                # Jailed walkers only get one throw, they leave on doubles or by paying on their last jail turn
+                jail_turns[in_jail] += 1
+                leaving = in_jail & (doubles | (jail_turns >= MAX_JAIL_TURNS))
+                moving = ~in_jail | leaving
+                again = doubles & ~in_jail
+                in_jail &= ~leaving
+            else:
+                moving = rolling.copy()
+                again = doubles
+            if throw == 2:
+                speeding = moving & doubles
+                position[speeding] = board.jail
+                moving &= ~speeding
+                jailed = speeding
+            else:
+                jailed = np.zeros(walkers, dtype=bool)
+
+            position[moving] = (position[moving] + roll[moving]) % board.size
+            sent = moving & board.go_to_jail[position]
+            for deck_squares, destinations, deck_jailed in board.decks:
+                drawing = np.flatnonzero(moving & deck_squares[position])
+                card = rng.integers(0, destinations.shape[1], size=drawing.size)
+                sent[drawing] |= deck_jailed[position[drawing], card]
+                position[drawing] = destinations[position[drawing], card]
+            position[sent] = board.jail
+            jailed |= sent
+            in_jail |= jailed
+            jail_turns[jailed] = 0
+
+            landed = moving | jailed
+            landings += np.bincount(position[landed], minlength=board.size)
+            roll_sums += np.bincount(position[landed], weights=roll[landed], minlength=board.size)
+            rolling = moving & again & ~jailed
+            if not rolling.any():
+                break
+    return landings, roll_sums
+
+
+def rent_tables(board: Board, landings: np.ndarray, roll_sums: np.ndarray, total_turns: int,
+                opponents: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Get the rent matrix, expected rent per round and investment cost of every board property at every level.
+
+    Rows follow board.properties, columns are NORMAL_LEVELS for normal properties and the number of railroads or
+    utilities owned for the others (unused columns are NaN). The expected rent is per round of the owner, with the
+    given number of opponents each taking one turn.
+    """
+    rent = np.full((len(board.properties), len(NORMAL_LEVELS)), np.nan)
+    cost = np.full(rent.shape, np.nan)
+    mean_roll = roll_sums / np.maximum(landings, 1)
+    for row, (position, prop) in enumerate(zip(board.positions, board.properties)):
+        if type(prop) is NormalProperty:
+            rent[row] = [prop.get_rent(level) for level in NORMAL_LEVELS]
+            cost[row] = [prop.price + int(level) * prop.house_price for level in NORMAL_LEVELS]
+        elif type(prop) is Railroad:
+            rent[row, :4] = [prop.get_rent(railroads) for railroads in range(1, 5)]
+            cost[row, :4] = prop.price
+        elif type(prop) is Utility:
+            rent[row, :2] = [prop.get_multiplier(utilities) * mean_roll[position] for utilities in range(1, 3)]
+            cost[row, :2] = prop.price
+    frequency = landings[board.positions] / total_turns
+    return rent, frequency[:, None] * rent * opponents, cost
+
+
+def group_tables(board: Board, expected: np.ndarray, cost: np.ndarray) -> List[Tuple[str, str, float, float]]:
+    """Get the expected rent per round and cost of every complete group at every level"""
+    groups = {}
+    for row, prop in enumerate(board.properties):
+        if type(prop) is NormalProperty:
+            groups.setdefault(prop.group["colour"].title(), []).append(row)
+        else:
+            groups.setdefault("Railroads" if type(prop) is Railroad else "Utilities", []).append(row)
+    table = []
+    for group, rows in groups.items():
+        prop = board.properties[rows[0]]
+        if type(prop) is NormalProperty:
+            levels = list(enumerate(NORMAL_LEVEL_NAMES))[1:]
+        else:
+            levels = [(len(rows) - 1, "All Owned")]
+        for column, level_name in levels:
+            table.append((group, level_name, float(expected[rows, column].sum()), float(cost[rows, column].sum())))
+    return table
+
+
+def format_tables(board: Board, landings: np.ndarray, total_turns: int, expected: np.ndarray, cost: np.ndarray,
+                  groups: List[Tuple[str, str, float, float]]) -> str:
+    """Format the landing frequency, property yield and group yield tables as text"""
+    lines = ["Landing Frequency (% of turns)"]
+    for name, landed in zip(board.names, landings):
+        lines.append("  {:<24} {:6.3f}".format(name, landed / total_turns * 100))
+    lines.append("")
+    lines.append("Property Rent Yield (expected rent per round / rounds to pay back)")
+    for row, prop in enumerate(board.properties):
+        if type(prop) is NormalProperty:
+            level_names = NORMAL_LEVEL_NAMES
+        elif type(prop) is Railroad:
+            level_names = RAILROAD_LEVEL_NAMES
+        else:
+            level_names = UTILITY_LEVEL_NAMES
+        lines.append("  " + prop.name)
+        for column, level_name in enumerate(level_names):
+            lines.append("    {:<12} ${:>9,.2f} {:>9,.1f}".format(
+                level_name, expected[row, column], cost[row, column] / expected[row, column]))
+    lines.append("")
+    lines.append("Group Rent Yield (expected rent per round / rounds to pay back)")
+    for group, level_name, group_expected, group_cost in groups:
+        lines.append("  {:<12} {:<12} ${:>9,.2f} {:>9,.1f}".format(
+            group, level_name, group_expected, group_cost / group_expected))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo landing frequency and rent yield of the card set")
+    parser.add_argument("--walkers", type=int, default=1000000, help="number of players simulated at once")
+    parser.add_argument("--turns", type=int, default=50, help="number of turns every walker takes")
+    parser.add_argument("--opponents", type=int, default=3, help="number of opponents paying rent each round")
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    args = parser.parse_args()
+
+    board = Board(get_board(), process_card_set(get_card_set()))
+    landings, roll_sums = simulate_landings(board, args.walkers, args.turns, args.seed)
+    total_turns = args.walkers * args.turns
+    _, expected, cost = rent_tables(board, landings, roll_sums, total_turns, args.opponents)
+    print(format_tables(board, landings, total_turns, expected, cost, group_tables(board, expected, cost)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import argparse
+import asyncio
+import json
+import sys
+import traceback
+from typing import List
+
+from helpers.data import process_card_set
+from helpers.file import get_card_set, get_defaults
+from models import Player
+from models import exceptions
+from models.exceptions import *
+from models.properties import NormalProperty, Utility
+from .journal import encode_event, session_state
+from .session import GameSession
+
+# Errors caused by a command breaking the game rules, referring to something that doesn't exist or missing arguments,
+# these are sent back to the client
+COMMAND_ERRORS = tuple(value for value in vars(exceptions).values()
+                       if isinstance(value, type) and issubclass(value, Exception))
+MISSING = object()  # Default of get_argument for arguments that are required
+
+
+def get_argument(message: dict, name: str, arg_type: type = str, default=MISSING):
+    """Get an argument of a request, raising UnexpectedValue if it's missing (and required) or of the wrong type"""
+    if name not in message:
+        if default is MISSING:
+            raise UnexpectedValue("Missing argument {!r}".format(name))
+        return default
+    value = message[name]
+    # JSON true and false are bools, which Python also counts as ints
+    if type(value) is not arg_type:
+        raise UnexpectedValue("Argument {!r} should be {} but is {!r}".format(name, arg_type.__name__, value))
+    return value
+
+
+def encode_message(message: dict) -> bytes:
+    """Encode a message as a line of JSON"""
+    return json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class Table:
+    """A game session hosted by the server and the connections watching it.
+
+    The events of every command are collected by a session subscriber and sent to the watchers as one delta message
+    when the change listener is called at the end of the command's batch. Every event has a version number, so a client
+    applies the deltas with a version after the one of the state it got when subscribing (with journal.apply_record).
+    """
+
+    def __init__(self, table_id: str, session: GameSession):
+        self.table_id = table_id
+        self.session = session
+        self.version = 0
+        self.watchers = set()
+        self._pending = []
+        session.subscribe(self.on_event)
+        session.subscribe_changes(self.on_change)
+
+    def on_event(self, event: str, player: Player, **data):
+        self.version += 1
+        if len(self.watchers) > 0:
+            self._pending.append(encode_event(event, player, data))
+
+    def on_change(self, players: set):
+        if len(self._pending) == 0:
+            return
+        line = encode_message({"table": self.table_id, "version": self.version, "events": self._pending})
+        self._pending = []
+        for watcher in list(self.watchers):
+            watcher.push(line)
+
+    def state(self) -> dict:
+        """Get the full state of the table and the version it's at"""
+        state = session_state(self.session)
+        state["version"] = self.version
+        return state
+
+
+class Connection:
+    """A client connected to the server"""
+
+    def __init__(self, server: 'GameServer', reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.watching = set()
+        self.closed = False
+
+    def push(self, line: bytes):
+        """Send a delta without waiting, a client that doesn't read them fast enough is disconnected"""
+        if self.closed:
+            return
+        self.writer.write(line)
+        if self.writer.transport.get_write_buffer_size() > self.server.max_buffer:
+            self.close()
+
+    def close(self):
+        """Stop watching every table and close the connection"""
+        if self.closed:
+            return
+        self.closed = True
+        for table in self.watching:
+            table.watchers.discard(self)
+        self.watching.clear()
+        self.writer.close()
+
+
+class GameServer:
+    """Hosts many independent game sessions (tables) in one process and takes commands for them as JSON lines.
+
+    Every request is a JSON object on its own line with an "op", an optional "id" which is copied into the response and
+    the arguments of the op (see the cmd_ and game_ methods). Responses are {"id", "ok": true, "result"} or
+    {"id", "ok": false, "error", "message"}, and a command that fails changes nothing. Connections subscribed to a table
+    also get {"table", "version", "events"} delta lines for every command that changes it.
+    """
+
+    def __init__(self, card_data: List[dict] = None, money: int = None, go_money: int = None,
+                 history_limit: int = None, max_tables: int = None, max_buffer: int = 1 << 20):
+        if card_data is None or money is None or go_money is None:
+            defaults = get_defaults()
+            card_data = get_card_set() if card_data is None else card_data
+            money = defaults.getint("money") if money is None else money
+            go_money = defaults.getint("go_money") if go_money is None else go_money
+        self.card_data = card_data
+        self.money = money
+        self.go_money = go_money
+        self.history_limit = history_limit
+        self.max_tables = max_tables
+        self.max_buffer = max_buffer
+        self.tables = {}
+        self.connections = set()
+        self._next_table = 0
+
+    def get_table(self, table_id: str) -> Table:
+        """Get a table by its id"""
+        try:
+            return self.tables[table_id]
+        except KeyError as e:
+            raise NotFound("Could not find table " + str(table_id)) from e
+
+    def handle_message(self, connection: Connection, message: dict) -> dict:
+        """Run a request and get its response"""
+        response = {"id": message.get("id")}
+        try:
+            op = get_argument(message, "op")
+            handler = getattr(self, "cmd_" + op, None)
+            if handler is not None:
+                response["result"] = handler(connection, message)
+            else:
+                handler = getattr(self, "game_" + op, None)
+                if handler is None:
+                    raise NotFound("Unknown op {}".format(op))
+                session = self.get_table(get_argument(message, "table")).session
+                with session.batch():
+                    response["result"] = handler(session, message)
+            response["ok"] = True
+        except COMMAND_ERRORS as e:
+            response.update(ok=False, error=type(e).__name__, message=str(e))
+        return response
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        connection = Connection(self, reader, writer)
+        self.connections.add(connection)
+        try:
+            while not connection.closed:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    if not isinstance(message, dict):
+                        raise UnexpectedValue("Requests must be JSON objects")
+                except (ValueError, UnexpectedValue) as e:
+                    response = {"id": None, "ok": False, "error": type(e).__name__, "message": str(e)}
+                else:
+                    try:
+                        response = self.handle_message(connection, message)
+                    except Exception as e:
+                        traceback.print_exc()
+                        response = {"id": message.get("id"), "ok": False, "error": "InternalError", "message": str(e)}
+                if connection.closed:
+                    break
+                writer.write(encode_message(response))
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            self.connections.discard(connection)
+            connection.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765, path: str = None) -> asyncio.AbstractServer:
+        """Start listening on a TCP port, or on a Unix socket if a path is given"""
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle_connection, path)
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    # Table commands
+
+    def cmd_create_table(self, connection: Connection, message: dict) -> str:
+        """Create a table with the given players: {table (optional), players, money (optional), go_money (optional)}"""
+        if self.max_tables is not None and len(self.tables) >= self.max_tables:
+            raise LimitReached("The server already has {:,} tables".format(self.max_tables))
+        table_id = get_argument(message, "table", default=None)
+        if table_id is None:
+            self._next_table += 1
+            table_id = "table-{}".format(self._next_table)
+        if table_id in self.tables:
+            raise AlreadyChosenValue("There is already a table named {}".format(table_id))
+        players = get_argument(message, "players", list, [])
+        if any(type(name) is not str for name in players):
+            raise UnexpectedValue("Player names should be strings")
+        session = GameSession(process_card_set(self.card_data), get_argument(message, "money", int, self.money),
+                              get_argument(message, "go_money", int, self.go_money), history_limit=self.history_limit)
+        for name in players:
+            session.add_player(name)
+        self.tables[table_id] = Table(table_id, session)
+        return table_id
+
+    def cmd_close_table(self, connection: Connection, message: dict) -> None:
+        """Remove a table: {table}"""
+        table = self.get_table(get_argument(message, "table"))
+        for watcher in table.watchers:
+            watcher.watching.discard(table)
+        del self.tables[table.table_id]
+
+    def cmd_list_tables(self, connection: Connection, message: dict) -> List[str]:
+        """Get the ids of every table: {}"""
+        return list(self.tables)
+
+    def cmd_state(self, connection: Connection, message: dict) -> dict:
+        """Get the full state of a table: {table}"""
+        return self.get_table(get_argument(message, "table")).state()
+
+    def cmd_subscribe(self, connection: Connection, message: dict) -> dict:
+        """Get the state of a table and the deltas of every later change to it: {table}"""
+        table = self.get_table(get_argument(message, "table"))
+        table.watchers.add(connection)
+        connection.watching.add(table)
+        return table.state()
+
+    def cmd_unsubscribe(self, connection: Connection, message: dict) -> None:
+        """Stop getting the deltas of a table: {table}"""
+        table = self.get_table(get_argument(message, "table"))
+        table.watchers.discard(connection)
+        connection.watching.discard(table)
+
+    # Game commands, run inside a batch of the table's session so a failing command changes nothing
+
+    def game_add_player(self, session: GameSession, message: dict) -> None:
+        """Add a player to a table: {table, player}"""
+        session.add_player(get_argument(message, "player"))
+
+    def game_buy(self, session: GameSession, message: dict) -> None:
+        """Buy a property, for its price or an auction amount: {table, player, prop, amount (optional)}"""
+        player = session.get_player(get_argument(message, "player"))
+        prop = session.get_card(get_argument(message, "prop"))
+        if "amount" in message:
+            prop.auction_buy(player, get_argument(message, "amount", int))
+        else:
+            prop.buy(player)
+
+    def game_step(self, session: GameSession, message: dict) -> int:
+        """Have a player step on a property and pay its owner, returns the rent: {table, player, prop, dice_roll (for
+        utilities)}"""
+        player = session.get_player(get_argument(message, "player"))
+        prop = session.get_card(get_argument(message, "prop"))
+        stepped_price = prop.stepped_price
+        if isinstance(prop, Utility):
+            prop.step_property(player, dice_roll=get_argument(message, "dice_roll", int))
+        else:
+            prop.step_property(player)
+        return prop.stepped_price - stepped_price
+
+    def game_transfer_money(self, session: GameSession, message: dict) -> None:
+        """Transfer money between players: {table, from, to, amount}"""
+        session.transfer_money(session.get_player(get_argument(message, "from")),
+                               session.get_player(get_argument(message, "to")), get_argument(message, "amount", int))
+
+    def game_transfer_property(self, session: GameSession, message: dict) -> None:
+        """Transfer a property between players: {table, from, to, prop}"""
+        session.transfer_property(session.get_player(get_argument(message, "from")),
+                                  session.get_player(get_argument(message, "to")),
+                                  session.get_card(get_argument(message, "prop")))
+
+    def game_mortgage(self, session: GameSession, message: dict) -> None:
+        """Mortgage a property: {table, prop}"""
+        session.get_card(get_argument(message, "prop")).mortgage()
+
+    def game_unmortgage(self, session: GameSession, message: dict) -> None:
+        """Unmortgage a property: {table, prop}"""
+        session.get_card(get_argument(message, "prop")).unmortgage()
+
+    def game_build(self, session: GameSession, message: dict) -> None:
+        """Add houses to a property: {table, prop, houses}"""
+        self._get_normal_property(session, get_argument(message, "prop")).add_house(
+            get_argument(message, "houses", int))
+
+    def game_sell_houses(self, session: GameSession, message: dict) -> None:
+        """Sell houses of a property: {table, prop, houses}"""
+        self._get_normal_property(session, get_argument(message, "prop")).sell_house(
+            get_argument(message, "houses", int))
+
+    def game_go(self, session: GameSession, message: dict) -> None:
+        """Give a player the Go money: {table, player}"""
+        session.get_player(get_argument(message, "player")).add_go_money()
+
+    def game_jail(self, session: GameSession, message: dict) -> None:
+        """Jail a player: {table, player}"""
+        session.get_player(get_argument(message, "player")).jail()
+
+    def game_unjail(self, session: GameSession, message: dict) -> None:
+        """Unjail a player: {table, player}"""
+        session.get_player(get_argument(message, "player")).unjail()
+
+    @staticmethod
+    def _get_normal_property(session: GameSession, name: str) -> NormalProperty:
+        prop = session.get_card(name)
+        if not isinstance(prop, NormalProperty):
+            raise UnexpectedValue("{} can't have houses".format(prop.name))
+        return prop
+
+
+async def run_server(host: str, port: int, path: str = None, **kwargs):
+    """Run a game server until it's cancelled"""
+    server = GameServer(**kwargs)
+    listener = await server.serve(host, port, path)
+    address = path if path is not None else "{}:{}".format(host, port)
+    print("Serving game tables on {}".format(address), file=sys.stderr)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host many game tables and take commands for them over a socket")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on")
+    parser.add_argument("--unix", default=None, help="listen on this Unix socket path instead of a TCP port")
+    parser.add_argument("--max-tables", type=int, default=None, help="maximum number of tables (default: no limit)")
+    parser.add_argument("--history-limit", type=int, default=1000,
+                        help="money history values kept per player (0: keep everything)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(run_server(args.host, args.port, args.unix, max_tables=args.max_tables,
+                               history_limit=args.history_limit or None))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
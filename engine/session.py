@@ -0,0 +1,203 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+from contextlib import contextmanager
+from typing import List, Union, Tuple
+
+from helpers.data import get_winner, process_card_set
+from helpers.file import get_card_set
+from helpers.gvars import CONFIG
+from helpers.lookup import PropertyIndex
+from helpers.model import transfer_money, transfer_property
+from models import Player
+from models.events import MONEY, NAME, PLAYER_ADDED, PLAYER_REMOVED
+from models.exceptions import *
+from models.properties import Property, NormalProperty, Railroad, Utility
+from .state import revert_event
+
+
+class GameSession:
+    """Headless game state, owns the players, the card set and the transactions between them.
+
+    Anything that wants to react to changes (the Tk GUI, a journal, a server) subscribes with a callable that is called
+    as subscriber(event, player, **data) for every event listed in models.events. Change listeners are called once as
+    listener(players) with the set of affected players after every change, or after every batch of changes.
+    """
+
+    def __init__(self, card_set: List[Property], money: int, go_money: int, min_similarity: int = None,
+                 history_limit: int = None):
+        self.card_set = card_set
+        self.history_limit = history_limit
+        self.min_similarity = min_similarity
+        self._property_index = None
+        self._cards = {prop.name: prop for prop in card_set}
+        self.money = money
+        self.go_money = go_money
+        self.players = {}
+        self._subscribers = []
+        self._change_listeners = []
+        self._batch = None
+        self._muted = 0
+
+    @property
+    def property_index(self) -> PropertyIndex:
+        """Fuzzy name index of the card set, built the first time it's needed since most sessions (tables on a server,
+        simulated games) only ever look properties up by their exact name"""
+        if self._property_index is None:
+            min_similarity = self.min_similarity
+            if min_similarity is None:
+                min_similarity = CONFIG.getint("DEFAULTS", "min_prop_similarity")
+            self._property_index = PropertyIndex(self.card_set, min_similarity)
+        return self._property_index
+
+    @classmethod
+    def from_card_set_file(cls, money: int, go_money: int, **kwargs) -> 'GameSession':
+        """Create a session using the card set in the data folder"""
+        return cls(process_card_set(get_card_set()), money, go_money, **kwargs)
+
+    def subscribe(self, subscriber):
+        """Add a subscriber that gets called for every event"""
+        self._subscribers.append(subscriber)
+
+    def unsubscribe(self, subscriber):
+        """Remove a subscriber"""
+        try:
+            self._subscribers.remove(subscriber)
+        except ValueError as e:
+            raise NotFound("Subscriber is not subscribed to this session") from e
+
+    def subscribe_changes(self, listener):
+        """Add a change listener that gets called with the set of affected players after every change or batch"""
+        self._change_listeners.append(listener)
+
+    def unsubscribe_changes(self, listener):
+        """Remove a change listener"""
+        try:
+            self._change_listeners.remove(listener)
+        except ValueError as e:
+            raise NotFound("Change listener is not subscribed to this session") from e
+
+    def emit(self, event: str, player: Player, **data):
+        """Send an event to all the subscribers, players created by the session call this as their listener"""
+        if event == NAME:
+            self._rename(data["old"], data["new"])
+        elif event == PLAYER_ADDED:
+            self.players[player.name] = player
+        elif event == PLAYER_REMOVED:
+            del self.players[player.name]
+        if self._muted:
+            return
+        if self._batch is not None:
+            self._batch.append((event, player, data))
+            return
+        for subscriber in self._subscribers:
+            subscriber(event, player, **data)
+        for listener in self._change_listeners:
+            listener({player})
+
+    @property
+    def in_batch(self) -> bool:
+        """Whether changes are being made inside a batch, so subscribers only get them once it's done"""
+        return self._batch is not None
+
+    @contextmanager
+    def batch(self):
+        """Apply the changes made inside the with block as one.
+
+        Subscribers get the events of the batch once it's done, followed by a single call of the change listeners. If
+        anything inside the batch raises, every change made inside it is undone (without notifying anyone or adding to
+        the money histories) and the exception is raised again. Nested batches are part of the outer batch but undo only
+        their own changes.
+        """
+        outer = self._batch is not None
+        if not outer:
+            self._batch = []
+        start = len(self._batch)
+        try:
+            yield
+        except BaseException:
+            self._muted += 1
+            try:
+                for event, player, data in reversed(self._batch[start:]):
+                    if event == MONEY:
+                        player.rollback_money(data["old"])
+                    else:
+                        revert_event(event, player, data)
+            finally:
+                self._muted -= 1
+                del self._batch[start:]
+                if not outer:
+                    self._batch = None
+            raise
+        if outer:
+            return
+        events, self._batch = self._batch, None
+        for event, player, data in events:
+            for subscriber in self._subscribers:
+                subscriber(event, player, **data)
+        affected = {player for _, player, _ in events}
+        if len(affected) > 0:
+            for listener in self._change_listeners:
+                listener(affected)
+
+    def _rename(self, old_name: str, new_name: str):
+        """Re-key the player dict after a name change while keeping the player order"""
+        self.players = {(new_name if name == old_name else name): player for name, player in self.players.items()}
+
+    def add_player(self, name: str) -> Player:
+        """Create a player with the session defaults and add it to the session"""
+        if name in self.players:
+            raise AlreadyChosenValue("There is already a player named {}".format(name))
+        player = Player(name, self.money, self.go_money, self.emit, self.history_limit)
+        # emit puts it in the player dict, the same way undo and redo add it back
+        player.notify(PLAYER_ADDED, money=player.get_money())
+        return player
+
+    def remove_player(self, name: str):
+        """Remove a player that has no properties from the session"""
+        player = self.get_player(name)
+        if len(player.properties) > 0:
+            raise NotAuthorized("{} still has properties".format(name))
+        player.notify(PLAYER_REMOVED, money=player.get_money())
+
+    def get_player(self, name: str) -> Player:
+        """Get a player of the session by name"""
+        try:
+            return self.players[name]
+        except KeyError as e:
+            raise NotFound("Could not find player with name " + name) from e
+
+    def get_card(self, name: str) -> Union[NormalProperty, Railroad, Utility]:
+        """Get a property of the card set by its exact name"""
+        try:
+            return self._cards[name]
+        except KeyError as e:
+            raise NotFound("Couldn't find property {} in property list.".format(name)) from e
+
+    def get_property(self, name: str) -> Tuple[Union[NormalProperty, Railroad, Utility], bool]:
+        """Get a property of the card set by name, returns the property and whether the match is non exact"""
+        return self.property_index.get(name)
+
+    # Transfers send several events, each one is a batch so it's a single change (and a single undo step)
+
+    def transfer_money(self, t_from: Player, t_to: Player, amount: int):
+        """Transfer money between two players"""
+        with self.batch():
+            transfer_money(t_from, t_to, amount)
+
+    def transfer_property(self, t_from: Player, t_to: Player, prop: Property):
+        """Transfer a property between two players"""
+        with self.batch():
+            transfer_property(t_from, t_to, prop)
+
+    def transfer_all_properties(self, t_from: Player, t_to: Player):
+        """Transfer every property of a player to another player"""
+        with self.batch():
+            t_from.transfer_all_properties(t_to)
+
+    def get_winner(self) -> Tuple[Union[str, List[str]], int, bool]:
+        """Get the winner based on net worth of all players"""
+        return get_winner(self.players)
@@ -0,0 +1,84 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+from typing import Tuple
+
+from models import Player
+from models.events import *
+from models.exceptions import *
+from models.properties import NormalProperty
+
+
+def set_money(player: Player, amount: int):
+    """Set the money of a player"""
+    if amount != player.get_money():
+        player.add_money(amount - player.get_money())
+
+
+def set_property_state(prop, mortgaged: bool = None, houses: int = None):
+    """Set the mortgage state and houses of a property without paying for them, keeping its owner's net worth right"""
+    old_value = prop.get_value()
+    if mortgaged is not None:
+        prop.mortgaged = mortgaged
+    if houses is not None and type(prop) is NormalProperty:
+        prop.houses = houses
+    prop.invalidate_rent()
+    if prop.owner is not None:
+        prop.owner.revalue_property(old_value, prop.get_value())
+
+
+def apply_event(event: str, player: Player, data: dict):
+    """Make the change an event describes, sending the event again"""
+    prop = data.get("prop")
+    if event == MONEY:
+        set_money(player, data["new"])
+    elif event == JAIL:
+        player.in_jail = data["new"]
+        player.notify(JAIL, old=data["old"], new=data["new"])
+    elif event == BANKRUPT_IGNORED:
+        player.bankrupt_ignored = data["new"]
+        player.notify(BANKRUPT_IGNORED, old=data["old"], new=data["new"])
+    elif event == NAME:
+        player.change_name(data["new"])
+    elif event in (PLAYER_ADDED, PLAYER_REMOVED):
+        # The session adds the player to (or removes it from) its player dict when it gets the event
+        player.notify(event, money=data["money"])
+    elif event == PROPERTY_ADDED:
+        player.add_property(prop, data.get("index"))
+    elif event == PROPERTY_REMOVED:
+        player.remove_property(prop)
+    elif event == MORTGAGE:
+        set_property_state(prop, mortgaged=data["new"])
+        player.notify(MORTGAGE, prop=prop, old=data["old"], new=data["new"])
+    elif event == HOUSES:
+        set_property_state(prop, houses=data["new"])
+        player.notify(HOUSES, prop=prop, old=data["old"], new=data["new"])
+    elif event == STEP:
+        steps = data.get("steps", 1)
+        prop.times_stepped += steps
+        prop.stepped_price += data["rent"]
+        player.notify(STEP, prop=prop, rent=data["rent"], steps=steps)
+    else:
+        raise UnexpectedValue("Unknown event {}".format(event))
+
+
+def invert_event(event: str, data: dict) -> Tuple[str, dict]:
+    """Get the event (and its data) that undoes an event"""
+    if event in (PROPERTY_ADDED, PROPERTY_REMOVED):
+        return PROPERTY_REMOVED if event == PROPERTY_ADDED else PROPERTY_ADDED, data
+    if event in (PLAYER_ADDED, PLAYER_REMOVED):
+        return PLAYER_REMOVED if event == PLAYER_ADDED else PLAYER_ADDED, data
+    if event == STEP:
+        return event, {"prop": data["prop"], "rent": -data["rent"], "steps": -data.get("steps", 1)}
+    inverse = dict(data)
+    inverse["old"], inverse["new"] = data["new"], data["old"]
+    return event, inverse
+
+
+def revert_event(event: str, player: Player, data: dict):
+    """Undo the change an event describes, sending the event of the undo"""
+    inverse, inverse_data = invert_event(event, data)
+    apply_event(inverse, player, inverse_data)
@@ -0,0 +1,90 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+from models import Player
+from models.properties import Property, NormalProperty
+
+
+class Strategy:
+    """Buy, build and mortgage policies of a simulated player, subclasses change the reserves or override policies"""
+    name = "base"
+    buy_reserve = 0  # Money kept after buying a property
+    build_reserve = 0  # Money kept after building a house
+    unmortgage_reserve = 0  # Money kept after unmortgaging a property, None to never unmortgage
+
+    def should_buy(self, player: Player, prop: Property) -> bool:
+        """Whether the player buys an unowned property it landed on"""
+        return player.get_money() - prop.price >= self.buy_reserve
+
+    def build(self, player: Player):
+        """Build houses evenly on every colour set the player can build on while staying above the build reserve"""
+        if self.build_reserve is None:
+            return
+        buildable = [prop for prop in player.properties if type(prop) is NormalProperty and prop.check_colour_set()]
+        mortgaged_colours = {prop.group["colour"] for prop in buildable if prop.mortgaged}
+        buildable = [prop for prop in buildable if prop.group["colour"] not in mortgaged_colours]
+        while True:
+            buildable = [prop for prop in buildable if prop.houses < 5 and
+                         player.get_money() - prop.house_price >= self.build_reserve]
+            if len(buildable) == 0:
+                return
+            min(buildable, key=lambda prop: prop.houses).add_house(1)
+
+    def unmortgage(self, player: Player):
+        """Unmortgage properties while staying above the unmortgage reserve"""
+        if self.unmortgage_reserve is None:
+            return
+        for prop in player.properties:
+            if prop.mortgaged and player.get_money() - prop.unmortgage_price >= self.unmortgage_reserve:
+                prop.unmortgage()
+
+    def raise_money(self, player: Player):
+        """Sell houses, then mortgage properties, until the player is out of debt or has nothing left"""
+        for prop in sorted(player.properties, key=lambda prop: getattr(prop, "houses", 0), reverse=True):
+            if player.get_money() >= 0:
+                return
+            while type(prop) is NormalProperty and prop.houses > 0 and player.get_money() < 0:
+                prop.sell_house(1)
+        for prop in sorted(player.properties, key=lambda prop: prop.mortgage_price):
+            if player.get_money() >= 0:
+                return
+            if not prop.mortgaged and getattr(prop, "houses", 0) == 0:
+                prop.mortgage()
+
+
+class Aggressive(Strategy):
+    """Buys everything it can and builds as soon as it has a colour set"""
+    name = "aggressive"
+
+
+class Cautious(Strategy):
+    """Keeps a cash cushion before buying or building"""
+    name = "cautious"
+    buy_reserve = 300
+    build_reserve = 500
+    unmortgage_reserve = 600
+
+
+class Hoarder(Strategy):
+    """Buys properties but never builds, only collects base rent"""
+    name = "hoarder"
+    buy_reserve = 100
+    build_reserve = None
+    unmortgage_reserve = 300
+
+
+class Builder(Strategy):
+    """Only buys properties that can make a colour set, and spends everything on houses"""
+    name = "builder"
+    buy_reserve = 50
+
+    def should_buy(self, player: Player, prop: Property) -> bool:
+        if type(prop) is not NormalProperty:
+            return False
+        return super().should_buy(player, prop)
+
+
+STRATEGIES = {strategy.name: strategy for strategy in (Aggressive, Cautious, Hoarder, Builder)}
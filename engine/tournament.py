@@ -0,0 +1,210 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+from typing import List, Tuple
+
+from helpers.data import process_card_set
+from helpers.file import get_board, get_card_set, get_defaults
+from models.exceptions import *
+from .archive import Archive, game_columns
+from .game import Game
+from .journal import Journal
+from .session import GameSession
+from .strategies import STRATEGIES
+
+# Card set, board layout and starting money of the worker process, set once by _init_worker
+_worker_setup = None
+
+
+def _init_worker(card_data: List[dict], board_layout: dict, money: int, go_money: int):
+    global _worker_setup
+    _worker_setup = (card_data, board_layout, money, go_money)
+
+
+def game_seed(seed: int, game_num: int) -> str:
+    """Seed of a single game, only depends on the tournament seed and the game number so results don't depend on
+    which process played which game"""
+    return "{}:{}".format(seed, game_num)
+
+
+def play_game(card_data: List[dict], board_layout: dict, money: int, go_money: int, strategy_names: List[str],
+              seed: int, game_num: int, max_rounds: int, record_dir: str = None, archive: bool = False) -> dict:
+    """Play a single simulated game and return its outcome, recording its journal in record_dir if given and adding
+    its columns to archive (see engine.archive) to the outcome if archive is set"""
+    rng = Random(game_seed(seed, game_num))
+    session = GameSession(process_card_set(card_data), money, go_money)
+    # Rotate the seats every game so no strategy always goes first
+    shift = game_num % len(strategy_names)
+    seats = strategy_names[shift:] + strategy_names[:shift]
+    strategies = {}
+    for seat, strategy_name in enumerate(seats):
+        name = "{} {}".format(strategy_name, seat + 1)
+        session.add_player(name)
+        strategies[name] = STRATEGIES[strategy_name]()
+    journal = None
+    if record_dir is not None:
+        journal_path = os.path.join(record_dir, "game-{}.jsonl".format(game_num))
+        if os.path.isfile(journal_path):
+            os.remove(journal_path)
+        # Never snapshotted, so the journal holds every event of the game
+        journal = Journal(session, journal_path, journal_path + ".snapshot", snapshot_every=sys.maxsize)
+    game = Game(session, board_layout, strategies, rng)
+    game.play(max_rounds)
+    if journal is not None:
+        journal.close()
+
+    winner, win_worth, tied = session.get_winner()
+    winners = winner if tied else [winner]
+    outcome = {
+        "winners": [strategies[name].name for name in winners],
+        "networths": [(strategies[name].name, player.get_networth()) for name, player in session.players.items()],
+        "bankrupt": [strategies[player.name].name for player in game.eliminated],
+        "rounds": game.rounds,
+    }
+    if archive:
+        outcome["columns"] = game_columns(session.players, session.card_set)
+    return outcome
+
+
+def _play_chunk(strategy_names: List[str], seed: int, start: int, stop: int, max_rounds: int,
+                record_dir: str = None, archive: bool = False) -> Tuple[dict, List[dict]]:
+    """Play games start to stop in a worker process and aggregate them, returns the aggregate and the columns of
+    every game if archive is set"""
+    results = new_results(strategy_names)
+    columns = []
+    for game_num in range(start, stop):
+        game = play_game(*_worker_setup, strategy_names, seed, game_num, max_rounds, record_dir, archive)
+        add_game(results, game)
+        if archive:
+            columns.append(game["columns"])
+    return results, columns
+
+
+def new_results(strategy_names: List[str]) -> dict:
+    """Empty aggregated tournament results"""
+    return {
+        "games": 0,
+        "ties": 0,
+        "rounds": 0,
+        "wins": {name: 0.0 for name in strategy_names},
+        "bankrupt": {name: 0 for name in strategy_names},
+        "networths": {name: [] for name in strategy_names},
+    }
+
+
+def add_game(results: dict, game: dict):
+    """Add the outcome of one game to aggregated results, tied wins are split between the tied strategies"""
+    results["games"] += 1
+    results["rounds"] += game["rounds"]
+    if len(game["winners"]) > 1:
+        results["ties"] += 1
+    for name in game["winners"]:
+        results["wins"][name] += 1 / len(game["winners"])
+    for name in game["bankrupt"]:
+        results["bankrupt"][name] += 1
+    for name, networth in game["networths"]:
+        results["networths"][name].append(networth)
+
+
+def merge_results(results: dict, other: dict):
+    """Merge aggregated results of another chunk of games into results"""
+    for key in ("games", "ties", "rounds"):
+        results[key] += other[key]
+    for key in ("wins", "bankrupt", "networths"):
+        for name, value in other[key].items():
+            results[key][name] += value
+
+
+def run_tournament(strategy_names: List[str], games: int, seed: int = 0, max_rounds: int = 200,
+                   workers: int = None, record_dir: str = None, archive_path: str = None) -> dict:
+    """Play games simulated games between the strategies across a process pool and return the merged results.
+
+    Games are split into contiguous chunks, every chunk is played and aggregated in a worker so only the aggregates
+    are sent back. Every game has its own seed, so the results are the same for any number of workers. If record_dir
+    is given, the journal of every game is written to it (see engine.analytics). If archive_path is given, the
+    money histories and property stats of every game are appended to the archive there in game order.
+    """
+    for name in strategy_names:
+        if name not in STRATEGIES:
+            raise NotFound("Unknown strategy {} (available: {})".format(name, ", ".join(STRATEGIES)))
+    # Results are kept per strategy, so a strategy playing twice would count its wins twice
+    if len(set(strategy_names)) != len(strategy_names):
+        raise AlreadyChosenValue("Every strategy can only play once")
+    if games < 1:
+        raise LimitReached("A tournament needs at least one game")
+    defaults = get_defaults()
+    setup = (get_card_set(), get_board(), defaults.getint("money"), defaults.getint("go_money"))
+    workers = workers or os.cpu_count() or 1
+    chunk_size = max(1, -(-games // (workers * 4)))
+    chunks = [(start, min(start + chunk_size, games)) for start in range(0, games, chunk_size)]
+
+    results = new_results(strategy_names)
+    archive = Archive(archive_path) if archive_path is not None else None
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=setup) as executor:
+        futures = [executor.submit(_play_chunk, strategy_names, seed, start, stop, max_rounds, record_dir,
+                                   archive is not None) for start, stop in chunks]
+        for future in futures:
+            chunk_results, columns = future.result()
+            merge_results(results, chunk_results)
+            for game in columns:
+                archive.append(game)
+    return results
+
+
+def percentile(values: List[int], fraction: float) -> int:
+    """Get a percentile of the values by nearest rank"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def format_results(results: dict) -> str:
+    """Format aggregated tournament results as text"""
+    games = results["games"]
+    rounds = results["rounds"] / games
+    lines = ["{:,} games, {:,} tied, {:.1f} rounds on average".format(games, results["ties"], rounds),
+             "{:<12} {:>8} {:>10} {:>10} {:>10} {:>10}".format("Strategy", "Win %", "Bankrupt %", "P10 Worth",
+                                                               "P50 Worth", "P90 Worth")]
+    for name, wins in results["wins"].items():
+        networths = results["networths"][name]
+        lines.append("{:<12} {:>8.2f} {:>10.2f} {:>10,} {:>10,} {:>10,}".format(
+            name, wins / games * 100, results["bankrupt"][name] / games * 100, percentile(networths, 0.1),
+            percentile(networths, 0.5), percentile(networths, 0.9)))
+    return "\n".join(lines)
+
+
+def positive_int(value: str) -> int:
+    """Argument type of a count that must be at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return number
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play simulated games between player strategies")
+    parser.add_argument("strategies", nargs="+", choices=list(STRATEGIES), help="strategy of every player")
+    parser.add_argument("--games", type=positive_int, default=1000, help="number of games to play")
+    parser.add_argument("--seed", type=int, default=0, help="tournament seed, the same seed gives the same results")
+    parser.add_argument("--max-rounds", type=int, default=200, help="rounds after which a game is decided by net worth")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes (default: number of cores)")
+    parser.add_argument("--record", default=None, help="directory to write the journal of every game to")
+    parser.add_argument("--archive", default=None, help="archive to append every game to (see engine.archive)")
+    args = parser.parse_args()
+    if len(set(args.strategies)) != len(args.strategies):
+        parser.error("every strategy can only play once")
+    if args.record is not None:
+        os.makedirs(args.record, exist_ok=True)
+    print(format_results(run_tournament(args.strategies, args.games, args.seed, args.max_rounds, args.workers,
+                                        args.record, args.archive)))
+
+
+if __name__ == "__main__":
+    main()
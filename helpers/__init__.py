@@ -4,8 +4,25 @@
 #  file, You can obtain one at http://mozilla.org/MPL/2.0/.
 # ------------------------------------------------------------------------------
 
-from .data import get_winner, process_card_set, write_last_data, write_error
-from .file import assert_data, get_card_set
-from .model import transfer_money, transfer_property, transfer_all_properties, \
-    get_formatted_property_list, get_property
-from .scrolled_frame import ScrolledFrame
+from .data import get_winner, process_card_set, write_last_data
+from .error_log import ErrorLog, EXPECTED_ERRORS
+from .file import assert_data, get_card_set, get_board
+from .instrument import Instrumentation
+from .lookup import PropertyIndex
+from .model import transfer_money, transfer_property, get_property, get_property_table, get_property_info_table, \
+    PROPERTY_TABLE_HEADINGS
+from .redraw import RedrawScheduler
+
+
+def __getattr__(name):
+    # Tk widgets are only imported when the GUI asks for them so that headless users of the package never import tkinter
+    if name == "ScrolledFrame":
+        from .scrolled_frame import ScrolledFrame
+        return ScrolledFrame
+    if name == "TableView":
+        from .table_view import TableView
+        return TableView
+    if name == "ProjectionWindow":
+        from .projection_window import ProjectionWindow
+        return ProjectionWindow
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -0,0 +1,155 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import glob
+import hashlib
+import json
+import os
+import pickle
+from os.path import basename, isfile
+from typing import Dict, List
+
+from models.exceptions import *
+
+TEMPLATE_PATH = "defaults/template.json"
+CACHE_DIR = "data/card_set_cache"
+CACHE_VERSION = 1  # Bumped whenever validation or the cache contents change, so old caches aren't used
+# Compiled card sets of this process, path: (size, modification time, pickled card data)
+_compiled = {}
+
+
+def edition_path(edition: str) -> str:
+    """Get the path of the default card set of a monopoly set edition"""
+    return "defaults/card_set_{}.json".format(edition.lower())
+
+
+def get_editions() -> List[str]:
+    """Get the names of every monopoly set edition with a default card set"""
+    return sorted(basename(path)[len("card_set_"):-len(".json")].upper()
+                  for path in glob.glob(edition_path("*")))
+
+
+def load_json(path: str):
+    """Load a JSON file, with an UnexpectedValue pointing at the line if it isn't valid JSON"""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except json.JSONDecodeError as e:
+        raise UnexpectedValue("{} is not valid JSON (line {}, column {}): {}".format(
+            path, e.lineno, e.colno, e.msg)) from e
+
+
+def load_template(path: str = TEMPLATE_PATH) -> Dict[str, dict]:
+    """Get the template card of every property type"""
+    return {card["type"]: card for card in load_json(path)}
+
+
+def check_fields(card: dict, template: dict, where: str) -> List[str]:
+    """Get the problems of a card (or a dict inside it) compared to its template: missing and unknown keys and values
+    of the wrong type"""
+    problems = []
+    for key, template_value in template.items():
+        if key not in card:
+            problems.append("{} is missing {!r}".format(where, key))
+        elif isinstance(template_value, dict):
+            if isinstance(card[key], dict):
+                problems += check_fields(card[key], template_value, "{} {}".format(where, key))
+            else:
+                problems.append("{} {!r} should be an object".format(where, key))
+        elif type(card[key]) is not type(template_value):
+            problems.append("{} {!r} should be {} but is {!r}".format(where, key, type(template_value).__name__,
+                                                                      card[key]))
+        elif type(template_value) is int and card[key] < 0:
+            problems.append("{} {!r} can't be negative ({})".format(where, key, card[key]))
+    for key in card:
+        if key not in template:
+            problems.append("{} has unknown key {!r}".format(where, key))
+    return problems
+
+
+def validate_card_set(card_data, template: Dict[str, dict], source: str):
+    """Check card data against the template, raising an UnexpectedValue listing every problem found"""
+    if not isinstance(card_data, list):
+        raise UnexpectedValue("{} should be a list of cards".format(source))
+    problems = []
+    names = set()
+    colours = {}
+    for card_num, card in enumerate(card_data):
+        where = "card {}".format(card_num + 1)
+        if not isinstance(card, dict):
+            problems.append("{} should be an object".format(where))
+            continue
+        if isinstance(card.get("name"), str):
+            where += " ({})".format(card["name"])
+            if card["name"].strip() == "":
+                problems.append("{} has an empty name".format(where))
+            elif card["name"] in names:
+                problems.append("{} has the same name as another card".format(where))
+            names.add(card["name"])
+        if card.get("type") not in template:
+            problems.append("{} has unknown type {!r} (expected one of {})".format(
+                where, card.get("type"), ", ".join(template)))
+            continue
+        card_problems = check_fields(card, template[card["type"]], where)
+        problems += card_problems
+        if card["type"] == "normal" and len(card_problems) == 0:
+            colours.setdefault(card["group"]["colour"], []).append(card["group"]["count"])
+    if len(problems) == 0:
+        # Only checked once every card is valid, a broken card would make its group look the wrong size
+        for colour, counts in colours.items():
+            if any(count != len(counts) for count in counts):
+                problems.append("colour group {!r} has {} card(s) but its cards say it has {}".format(
+                    colour, len(counts), ", ".join(str(count) for count in sorted(set(counts)))))
+    if len(problems) > 0:
+        raise UnexpectedValue("Invalid card set {}:\n{}".format(source, "\n".join(problems)))
+
+
+def compile_card_set(path: str, template_path: str = TEMPLATE_PATH) -> bytes:
+    """Get the validated card data of a card set file, pickled.
+
+    Card sets are validated once per content: the result is cached in CACHE_DIR under the hash of the card set, the
+    template and the cache version, and in memory under the file size and modification time so loading an unchanged
+    card set again doesn't even read the file.
+    """
+    try:
+        info = os.stat(path)
+    except FileNotFoundError as e:
+        raise NotFound("Card set {} doesn't exist".format(path)) from e
+    compiled = _compiled.get(path)
+    if compiled is not None and compiled[:2] == (info.st_size, info.st_mtime_ns):
+        return compiled[2]
+
+    with open(path, "rb") as f:
+        content = f.read()
+    with open(template_path, "rb") as f:
+        content_hash = hashlib.sha256(content + f.read() + str(CACHE_VERSION).encode()).hexdigest()
+    cache_path = os.path.join(CACHE_DIR, content_hash + ".pickle")
+    if isfile(cache_path):
+        with open(cache_path, "rb") as f:
+            data = f.read()
+    else:
+        card_data = load_json(path)
+        validate_card_set(card_data, load_template(template_path), path)
+        data = pickle.dumps(card_data, pickle.HIGHEST_PROTOCOL)
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(cache_path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(cache_path + ".tmp", cache_path)
+    _compiled[path] = (info.st_size, info.st_mtime_ns, data)
+    return data
+
+
+def load_card_set(path: str) -> List[dict]:
+    """Get the validated card data of a card set file, a new copy every call"""
+    return pickle.loads(compile_card_set(path))
+
+
+def load_edition(edition: str) -> List[dict]:
+    """Get the validated card data of the default card set of a monopoly set edition"""
+    if not isfile(edition_path(edition)):
+        raise NotFound("There is no card set for monopoly set {} (available: {})".format(
+            edition, ", ".join(get_editions())))
+    return load_card_set(edition_path(edition))
@@ -4,9 +4,7 @@
 #  file, You can obtain one at http://mozilla.org/MPL/2.0/.
 # ------------------------------------------------------------------------------
 
-import datetime
 from operator import itemgetter
-from traceback import format_exception
 from typing import Tuple, Union, List
 
 from models.exceptions import *
@@ -61,11 +59,3 @@ def write_last_data(player_dict: dict):
                     written_data += prop_data + "\n"
                 written_data += "\n"
         f.write(written_data)
-
-
-def write_error(etype, value, tb):
-    """Appends errors (and their traceback) to a logging file"""
-    with open("data/errors.txt", "a") as f:
-        f.write("---- ({})\n{} - {}\n--\n{}\n".format(
-            datetime.datetime.now().strftime("%B %d, %Y %H:%M:%S.%f %Z").strip(), etype.__name__,
-            value, "".join(format_exception(etype, value, tb))))
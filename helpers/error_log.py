@@ -0,0 +1,111 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import datetime
+import json
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from traceback import format_exception
+
+from models.exceptions import *
+
+ERROR_LOG_PATH = "data/errors.jsonl"
+# Errors caused by what the user asked for (e.g. a property name that doesn't exist), these are shown to the user and
+# only counted, not logged
+EXPECTED_ERRORS = (AlreadyChosenValue, LimitReached, NotFound, PropertyAlreadyOwned, PropertyNotOwned, NotAuthorized,
+                   NoPaymentNeeded)
+
+
+class ErrorLog:
+    """Error log written by a background thread as JSON lines, so logging an error costs the caller next to nothing.
+
+    Tracebacks are formatted on the writer thread. The file is rotated once it reaches max_bytes (keeping backups old
+    files as path.1, path.2, ...), and at most rate_limit errors of the same type are written every rate_period
+    seconds. Expected errors and errors that were rate limited or didn't fit in the queue are counted, and the counts
+    are written as a metrics record when the log is closed.
+    """
+
+    def __init__(self, path: str = ERROR_LOG_PATH, max_bytes: int = 1 << 20, backups: int = 3, rate_limit: int = 10,
+                 rate_period: float = 60.0, queue_size: int = 1000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.rate_limit = rate_limit
+        self.rate_period = rate_period
+        self.expected = Counter()
+        self.suppressed = Counter()
+        self.dropped = 0
+        self._windows = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(queue_size)
+        self._thread = threading.Thread(target=self._run, name="ErrorLog", daemon=True)
+        self._thread.start()
+
+    def log(self, etype: type, value: BaseException, tb):
+        """Log an error (the arguments of sys.excepthook), returns right away"""
+        with self._lock:
+            if issubclass(etype, EXPECTED_ERRORS):
+                self.expected[etype.__name__] += 1
+                return
+            now = time.monotonic()
+            start, count = self._windows.get(etype, (now, 0))
+            if now - start >= self.rate_period:
+                start, count = now, 0
+            self._windows[etype] = (start, count + 1)
+            if count >= self.rate_limit:
+                self.suppressed[etype.__name__] += 1
+                return
+        try:
+            self._queue.put_nowait((datetime.datetime.now(), etype, value, tb))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def metrics(self) -> dict:
+        """Get the counts of expected, rate limited and dropped errors"""
+        with self._lock:
+            return {"expected": dict(self.expected), "suppressed": dict(self.suppressed), "dropped": self.dropped}
+
+    def close(self):
+        """Write the metrics, wait for every queued error to be written and stop the writer thread"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                record = {"time": datetime.datetime.now().isoformat(), "level": "metrics"}
+                record.update(self.metrics())
+                self._write(record)
+                return
+            logged_at, etype, value, tb = item
+            self._write({"time": logged_at.isoformat(), "level": "error", "type": etype.__name__,
+                         "message": str(value), "traceback": "".join(format_exception(etype, value, tb))})
+
+    def _write(self, record: dict):
+        line = json.dumps(record) + "\n"
+        try:
+            if os.path.isfile(self.path) and os.path.getsize(self.path) + len(line) > self.max_bytes:
+                self._rotate()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError:
+            with self._lock:
+                self.dropped += 1
+
+    def _rotate(self):
+        """Shift path.1 to path.2 and so on (dropping the oldest) and move the current file to path.1"""
+        for backup in range(self.backups - 1, 0, -1):
+            if os.path.isfile("{}.{}".format(self.path, backup)):
+                os.replace("{}.{}".format(self.path, backup), "{}.{}".format(self.path, backup + 1))
+        if self.backups > 0:
+            os.replace(self.path, self.path + ".1")
+        else:
+            os.remove(self.path)
@@ -6,10 +6,14 @@
 
 import configparser
 import json
-from os import mkdir
+from os import mkdir, stat
 from os.path import isfile, isdir
 from typing import List
 
+from .card_set import load_card_set, load_edition
+
+CARD_SET_STAMP = "data/card_set.stamp"
+
 
 def get_config() -> configparser.ConfigParser:
     """Get config file as config parser"""
@@ -23,8 +27,16 @@ def get_defaults() -> configparser.SectionProxy:
     return get_config()["DEFAULTS"]
 
 
-def get_card_set() -> List[dict]:
-    with open("data/card_set.json", "r") as f:
+def get_card_set(edition: str = None) -> List[dict]:
+    """Get the validated card set in the data folder, or the default card set of a monopoly set edition if given"""
+    if edition is not None:
+        return load_edition(edition)
+    return load_card_set("data/card_set.json")
+
+
+def get_board() -> dict:
+    """Get the board layout (squares and movement cards) of the configured monopoly set"""
+    with open("defaults/board_{}.json".format(get_defaults()["monopoly_set"].lower()), "r") as f:
         return json.load(f)
 
 
@@ -37,19 +49,46 @@ def assert_data():
             config = configparser.ConfigParser()
             config.read("defaults/config.ini")
             config.write(f)
-    if not isfile("data/card_set.json"):
-        with open("data/card_set.json", "w") as f:
-            with open("defaults/card_set_{}.json".format(get_defaults()["monopoly_set"].lower()), "r") as cards:
-                json.dump(json.load(cards), f, indent=2)
-    else:
-        with open("data/card_set.json", "r+") as dcs:
-            with open("defaults/card_set_{}.json".format(get_defaults()["monopoly_set"].lower()), "r") as dfcs:
-                dfcs_data = json.load(dfcs)
-                dcs_data = json.load(dcs)
-                if dcs_data != dfcs_data:
-                    dcs.seek(0)
-                    json.dump(dfcs_data, dcs, indent=2)
-                    dcs.truncate()
+    default_card_set = "defaults/card_set_{}.json".format(get_defaults()["monopoly_set"].lower())
+    stamp = card_set_stamp(default_card_set)
+    # Only compare the card sets if either file changed since they were last checked
+    if stamp is None or stamp != read_card_set_stamp():
+        if not isfile("data/card_set.json"):
+            with open("data/card_set.json", "w") as f:
+                with open(default_card_set, "r") as cards:
+                    json.dump(json.load(cards), f, indent=2)
+        else:
+            with open("data/card_set.json", "r+") as dcs:
+                with open(default_card_set, "r") as dfcs:
+                    dfcs_data = json.load(dfcs)
+                    dcs_data = json.load(dcs)
+                    if dcs_data != dfcs_data:
+                        dcs.seek(0)
+                        json.dump(dfcs_data, dcs, indent=2)
+                        dcs.truncate()
+        with open(CARD_SET_STAMP, "w") as f:
+            json.dump(card_set_stamp(default_card_set), f)
     if not isfile("data/last_data.txt"):
         with open("data/last_data.txt", "w"):
             pass
+
+
+def card_set_stamp(default_card_set: str) -> List:
+    """Get the path, size and modification time of the default card set and the data card set (None if missing)"""
+    stamp = [default_card_set]
+    for path in (default_card_set, "data/card_set.json"):
+        try:
+            info = stat(path)
+        except FileNotFoundError:
+            return None
+        stamp += [info.st_size, info.st_mtime_ns]
+    return stamp
+
+
+def read_card_set_stamp() -> List:
+    """Read the card set stamp saved the last time the card set was checked"""
+    try:
+        with open(CARD_SET_STAMP, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
@@ -0,0 +1,109 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import functools
+from time import perf_counter_ns
+
+# Latencies go in power of two buckets of nanoseconds, bucket n holding the calls that took 2^(n-1) to 2^n - 1 ns
+BUCKETS = 48
+
+
+class CallStats:
+    """Call count, total and maximum latency and latency histogram of an instrumented function"""
+    __slots__ = ("count", "total", "maximum", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.maximum = 0
+        self.buckets = [0] * BUCKETS
+
+    def add(self, elapsed: int):
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.maximum:
+            self.maximum = elapsed
+        self.buckets[min(elapsed.bit_length(), BUCKETS - 1)] += 1
+
+    def percentile(self, fraction: float) -> int:
+        """Get the upper bound (in ns) of the bucket holding a percentile of the calls"""
+        rank = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count > 0:
+                return (1 << bucket) - 1
+        return self.maximum
+
+
+class Instrumentation:
+    """Opt-in call counts and latency histograms of hot functions.
+
+    Functions are instrumented by replacing them on their class or module (patch) or by wrapping them (wrap), so nothing
+    is measured and there is no overhead at all unless an Instrumentation patched them. restore puts the originals
+    back. If profile is set, everything is also run under cProfile until write_profile is called.
+    """
+
+    def __init__(self, profile: bool = False):
+        self.stats = {}
+        self._patched = []
+        self.profiler = None
+        if profile:
+            import cProfile
+
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def wrap(self, name: str, func):
+        """Get a version of a function that records its calls under a name"""
+        stats = self.stats.setdefault(name, CallStats())
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats.add(perf_counter_ns() - start)
+
+        return wrapper
+
+    def patch(self, owner, attribute: str, name: str = None):
+        """Replace a function of a class or module with an instrumented version of it"""
+        original = owner.__dict__[attribute] if isinstance(owner, type) else getattr(owner, attribute)
+        name = name or "{}.{}".format(getattr(owner, "__name__", owner), attribute)
+        setattr(owner, attribute, self.wrap(name, original))
+        self._patched.append((owner, attribute, original))
+
+    def restore(self):
+        """Put back every function that was patched"""
+        for owner, attribute, original in reversed(self._patched):
+            setattr(owner, attribute, original)
+        self._patched = []
+
+    def report(self) -> str:
+        """Format the stats of every instrumented function, slowest in total first"""
+        lines = ["{:<40} {:>10} {:>12} {:>10} {:>10} {:>10} {:>10}".format(
+            "Function", "Calls", "Total (ms)", "Mean (us)", "P50 (us)", "P99 (us)", "Max (us)")]
+        for name, stats in sorted(self.stats.items(), key=lambda item: item[1].total, reverse=True):
+            if stats.count == 0:
+                continue
+            lines.append("{:<40} {:>10,} {:>12,.2f} {:>10,.1f} {:>10,.1f} {:>10,.1f} {:>10,.1f}".format(
+                name, stats.count, stats.total / 1e6, stats.total / stats.count / 1e3, stats.percentile(0.5) / 1e3,
+                stats.percentile(0.99) / 1e3, stats.maximum / 1e3))
+        return "\n".join(lines)
+
+    def write_report(self, path: str):
+        """Write the report to a file"""
+        with open(path, "w") as f:
+            f.write(self.report() + "\n")
+
+    def write_profile(self, path: str):
+        """Stop profiling and write the profile as a pstats file"""
+        if self.profiler is None:
+            return
+        self.profiler.disable()
+        self.profiler.dump_stats(path)
@@ -0,0 +1,90 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+from collections import Counter, OrderedDict
+from difflib import SequenceMatcher
+from typing import List, Union, Tuple
+
+from models.exceptions import *
+from models.properties import NormalProperty, Railroad, Utility
+
+
+class PropertyIndex:
+    """Prebuilt index over a card set for the fuzzy name matching of helpers.model.get_property.
+
+    Exact (casefolded) names are a dict lookup. Otherwise every card is a candidate, so the result is always the one
+    get_property finds. The upper bound of the similarity of every card (its quick_ratio, from the name lengths and
+    character counts) is computed at once with NumPy, and cards are scored with SequenceMatcher from the highest bound
+    down until the bound can't reach the minimum similarity or the best score found so far. Recent queries are cached.
+    """
+
+    def __init__(self, card_set: List[Union[NormalProperty, Railroad, Utility]], min_similarity: int,
+                 cache_size: int = 256):
+        import numpy as np
+
+        self.card_set = list(card_set)
+        self.min_similarity = min_similarity
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._exact = {}
+        self._names = [card.name.casefold() for card in self.card_set]
+        for name, card in zip(self._names, self.card_set):
+            self._exact.setdefault(name, card)
+        self._alphabet = {char: i for i, char in enumerate(sorted(set("".join(self._names))))}
+        # Number of times every character of the alphabet is in every name, one row per card
+        self._char_counts = np.zeros((len(self._names), len(self._alphabet)), dtype=np.int64)
+        for card_num, name in enumerate(self._names):
+            for char, count in Counter(name).items():
+                self._char_counts[card_num, self._alphabet[char]] = count
+        self._lengths = np.array([len(name) for name in self._names], dtype=np.int64)
+
+    def get(self, property_name: str) -> Tuple[Union[NormalProperty, Railroad, Utility], bool]:
+        """Get the property matching a name, returns the property and whether the match is non exact"""
+        query = property_name.casefold()
+        try:
+            result = self._cache[query]
+            self._cache.move_to_end(query)
+        except KeyError:
+            result = self._lookup(query)
+            self._cache[query] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        if result is None:
+            raise NotFound("Couldn't find property {} in property list.".format(property_name))
+        return result
+
+    def _lookup(self, query: str) -> Union[Tuple[Union[NormalProperty, Railroad, Utility], bool], None]:
+        import numpy as np
+
+        card = self._exact.get(query)
+        if card is not None:
+            return card, False
+
+        query_counts = np.zeros(len(self._alphabet), dtype=np.int64)
+        for char, count in Counter(query).items():
+            if char in self._alphabet:
+                query_counts[self._alphabet[char]] = count
+        # The same float operations as SequenceMatcher.quick_ratio, so ratio() is never above its bound (card names are
+        # never empty, the card set validation rejects them)
+        bounds = 2.0 * np.minimum(self._char_counts, query_counts).sum(axis=1) / (self._lengths + len(query))
+        matcher = SequenceMatcher(None)
+        matcher.set_seq2(query)
+        best_ratio, best_num = -1.0, None
+        # Highest bound first, equal bounds in card set order
+        for card_num in np.lexsort((np.arange(len(self._names)), -bounds)).tolist():
+            bound = float(bounds[card_num])
+            if bound * 100 < self.min_similarity or bound < best_ratio:
+                break
+            # Ties go to the card that comes first in the card set, like max() in get_property
+            if bound == best_ratio and card_num > best_num:
+                continue
+            matcher.set_seq1(self._names[card_num])
+            ratio = matcher.ratio()
+            if ratio > best_ratio or (ratio == best_ratio and card_num < best_num):
+                best_ratio, best_num = ratio, card_num
+        if best_num is None or best_ratio * 100 < self.min_similarity:
+            return None
+        return self.card_set[best_num], True
@@ -31,25 +31,28 @@ def transfer_property(t_from: Player, t_to: Player, prop: Property):
     prop.transfer(t_to)
 
 
-def transfer_all_properties(t_from: Player, t_to: Player):
-    """Transfer all properties from a player object to another player object"""
-    for prop in t_from.properties:
-        prop.transfer(t_to)
-
-
-def get_formatted_property_list(player: Player) -> List[str]:
-    """Get list of formatted properties of the player"""
-    if len(player.properties) == 0:
-        return ["None"]
-    formatted_properties = []
-    for prop in player.properties:
-        formatted = prop.name
-        if prop.mortgaged:
-            formatted += " (Mortgaged)"
-        if type(prop) is NormalProperty:
-            formatted += ": " + str(prop.houses)
-        formatted_properties.append(formatted)
-    return formatted_properties
+PROPERTY_TABLE_HEADINGS = ["Property", "Owner", "Houses", "Mortgaged", "Times Stepped", "Rent Earned"]
+
+
+def get_property_table(properties: List[Union[NormalProperty, Railroad, Utility]]) -> List[tuple]:
+    """Get a row (matching PROPERTY_TABLE_HEADINGS) for each property"""
+    return [(prop.name, prop.owner.name if prop.owner is not None else "None",
+             prop.houses if type(prop) is NormalProperty else "-", "Yes" if prop.mortgaged else "No",
+             prop.times_stepped, prop.stepped_price) for prop in properties]
+
+
+def get_property_info_table(prop: Union[NormalProperty, Railroad, Utility]) -> List[tuple]:
+    """Split the info of a property into (field, value) rows"""
+    rows = []
+    for line in prop.get_property_info().split("\n"):
+        line = line.strip()
+        if line:
+            field, _, value = line.rpartition(": ")
+            try:
+                rows.append((field, int(value.replace(",", ""))))
+            except ValueError:
+                rows.append((field, value))
+    return rows
 
 
 def get_property(property_name: str, card_set: list) -> Tuple[Union[NormalProperty, Railroad, Utility], bool]:
@@ -0,0 +1,80 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+from tkinter import *
+from tkinter import ttk
+from typing import List, Tuple
+
+from .error_log import ErrorLog
+from .table_view import TableView
+
+PROJECTION_HEADINGS = ["Player", "Win %", "95% Low", "95% High"]
+
+
+class ProjectionWindow:
+    """Window showing the win probabilities of a running projection (see engine.projection).
+
+    The projection is polled from the Tk event loop every interval milliseconds, so the results fill in as batches of
+    games finish without ever blocking the rest of the program. The projection is canceled when the window is closed,
+    or when a batch fails (the error is written to error_log if one is given).
+    """
+
+    def __init__(self, master, projection, error_log: ErrorLog = None, interval: int = 100):
+        self.projection = projection
+        self.error_log = error_log
+        self.interval = interval
+        self.window = Toplevel(master)
+        self.window.title("Projected Winner")
+        self.window.iconbitmap("res/icon.ico")
+        self.window.resizable(0, 0)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.window.bind("<Return>", lambda e: self.close())
+        self.status = ttk.Label(self.window, text=self.status_text())
+        self.status.grid(row=0, column=0, pady=5)
+        self.table = TableView(self.window, PROJECTION_HEADINGS, self.rows())
+        self.table.grid(row=1, column=0)
+        close_button = ttk.Button(self.window, text="Close", command=self.close)
+        close_button.grid(row=2, column=0)
+        close_button.focus_set()
+        self._after = self.window.after(self.interval, self.poll)
+
+    def rows(self) -> List[Tuple[str, float, float, float]]:
+        """Get the table rows of the results so far, as percentages"""
+        return [(name, 100 * probability, 100 * low, 100 * high)
+                for name, probability, low, high in self.projection.results()]
+
+    def status_text(self) -> str:
+        return "{:,} of {:,} games played".format(self.projection.games, self.projection.total)
+
+    def poll(self):
+        """Show the batches that finished since the last poll and poll again later if there are more to come"""
+        self._after = None
+        try:
+            updated = self.projection.poll()
+        except Exception as e:
+            if self.error_log is not None:
+                self.error_log.log(type(e), e, e.__traceback__)
+            self.cancel("Failed: {}".format(type(e).__name__))
+            return
+        if updated:
+            self.table.set_rows(self.rows())
+            self.status.config(text=self.status_text())
+        if not self.projection.finished:
+            self._after = self.window.after(self.interval, self.poll)
+
+    def cancel(self, reason: str):
+        """Stop the projection if it's still running, keeping the results so far and showing why it stopped"""
+        if self.projection.finished:
+            return
+        self.projection.cancel()
+        if self._after is not None:
+            self.window.after_cancel(self._after)
+            self._after = None
+        self.status.config(text="{} ({})".format(reason, self.status_text()))
+
+    def close(self):
+        self.cancel("Closed")
+        self.window.destroy()
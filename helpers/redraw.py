@@ -0,0 +1,43 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+from time import monotonic
+
+
+class RedrawScheduler:
+    """Collects what needs redrawing and redraws it all at once, at most max_rate times per second.
+
+    Marking something dirty never redraws right away, it schedules a single flush on the Tk event loop (when idle, or
+    after the rest of the minimum interval since the last flush) which calls redraw with everything marked since.
+    """
+
+    def __init__(self, widget, redraw, max_rate: int = 30):
+        self.widget = widget
+        self.redraw = redraw
+        self.interval = 1 / max_rate if max_rate > 0 else 0
+        self._dirty = set()
+        self._scheduled = False
+        self._last_flush = 0.0
+
+    def mark_dirty(self, items):
+        """Mark items as needing a redraw"""
+        self._dirty.update(items)
+        if self._scheduled:
+            return
+        self._scheduled = True
+        delay = self._last_flush + self.interval - monotonic()
+        if delay <= 0:
+            self.widget.after_idle(self.flush)
+        else:
+            self.widget.after(int(delay * 1000) + 1, self.flush)
+
+    def flush(self):
+        """Redraw everything marked dirty"""
+        self._scheduled = False
+        self._last_flush = monotonic()
+        dirty, self._dirty = self._dirty, set()
+        if len(dirty) > 0:
+            self.redraw(dirty)
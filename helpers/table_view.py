@@ -0,0 +1,77 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+from tkinter import *
+from tkinter import font, ttk
+from typing import List, Tuple
+
+
+def format_value(value) -> str:
+    """Format a table value for display"""
+    if type(value) is int:
+        return "{:,}".format(value)
+    if type(value) is float:
+        return "{:,.1f}".format(value)
+    return str(value)
+
+
+def sort_key(value):
+    """Sort numbers numerically and before any text"""
+    if type(value) in (int, float):
+        return 0, value, ""
+    return 1, 0, str(value).casefold()
+
+
+class TableView:
+    """A table backed by a ttk.Treeview, which only draws the rows that are visible however many there are.
+
+    Column widths are measured with the font instead of creating a widget per value, and clicking a column heading
+    sorts the rows by that column (clicking it again reverses the order). Geometry methods (grid, pack, destroy, ...)
+    are passed on to the outer frame.
+    """
+
+    def __init__(self, master, headings: List[str], rows: List[Tuple], height: int = 15, **kwargs):
+        self.outer = ttk.Frame(master, **kwargs)
+        self.rows = list(rows)
+        self.tree = ttk.Treeview(self.outer, columns=list(range(len(headings))), show="headings",
+                                 height=max(1, min(height, len(self.rows))), selectmode=BROWSE)
+        self.vsb = ttk.Scrollbar(self.outer, orient=VERTICAL, command=self.tree.yview)
+        self.tree["yscrollcommand"] = self.vsb.set
+        self.tree.pack(side=LEFT, fill=BOTH, expand=True)
+        self.vsb.pack(side=RIGHT, fill=Y)
+
+        tree_font = font.nametofont("TkDefaultFont")
+        heading_font = font.nametofont("TkHeadingFont")
+        self._sorted_by = None
+        for column, heading in enumerate(headings):
+            width = max([heading_font.measure(heading)] +
+                        [tree_font.measure(format_value(row[column])) for row in self.rows])
+            self.tree.heading(column, text=heading, command=lambda column=column: self.sort(column))
+            self.tree.column(column, width=width + 20, stretch=False,
+                             anchor=E if self.rows and type(self.rows[0][column]) in (int, float) else W)
+        for row in self.rows:
+            self.tree.insert("", END, values=[format_value(value) for value in row])
+
+    def __getattr__(self, item):
+        return getattr(self.outer, item)
+
+    def sort(self, column: int, reverse: bool = None):
+        """Sort the rows by a column, reversing the order if they're already sorted by it unless reverse is given"""
+        if reverse is None:
+            reverse = self._sorted_by == (column, False)
+        self.rows.sort(key=lambda row: sort_key(row[column]), reverse=reverse)
+        self._sorted_by = (column, reverse)
+        for item, row in zip(self.tree.get_children(), self.rows):
+            self.tree.item(item, values=[format_value(value) for value in row])
+
+    def set_rows(self, rows: List[Tuple]):
+        """Replace the rows, keeping them sorted the way they were"""
+        self.rows = list(rows)
+        if self._sorted_by is not None:
+            self.rows.sort(key=lambda row: sort_key(row[self._sorted_by[0]]), reverse=self._sorted_by[1])
+        self.tree.delete(*self.tree.get_children())
+        for row in self.rows:
+            self.tree.insert("", END, values=[format_value(value) for value in row])
@@ -0,0 +1,19 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+# Names of the events a Player sends to its listener. Every event is sent as listener(event, player, **data), the
+# keyword data for each event is listed next to it.
+MONEY = "money"  # old, new
+JAIL = "jail"  # old, new
+BANKRUPT_IGNORED = "bankrupt_ignored"  # old, new
+NAME = "name"  # old, new
+PLAYER_ADDED = "player_added"  # money (the money it starts with)
+PLAYER_REMOVED = "player_removed"  # money
+PROPERTY_ADDED = "property_added"  # prop, index (where it was put in the property list)
+PROPERTY_REMOVED = "property_removed"  # prop, index (where it was in the property list)
+MORTGAGE = "mortgage"  # prop, old, new
+HOUSES = "houses"  # prop, old, new
+STEP = "step"  # prop, rent, steps (optional, 1 if missing, -1 for an undone step, any number from BoardState.apply_to)
@@ -0,0 +1,109 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+from array import array
+from typing import Tuple, Union
+
+
+class MoneyHistory:
+    """Compact history of a player's money (8 bytes per change), optionally only keeping the latest values.
+
+    When a limit is set the values are kept in a ring buffer of that size and the oldest value is overwritten by
+    every new one.
+    """
+
+    def __init__(self, start: int, limit: Union[int, None] = None):
+        if limit is not None and limit < 1:
+            raise ValueError("Money history limit must be at least 1")
+        self.limit = limit
+        self.total = 1  # Number of values ever recorded, including overwritten ones
+        self._values = array("q", [start])
+        self._oldest = 0
+
+    def append(self, money: int):
+        """Record the money after a change"""
+        if self.limit is None or len(self._values) < self.limit:
+            self._values.append(money)
+        else:
+            self._values[self._oldest] = money
+            self._oldest = (self._oldest + 1) % self.limit
+        self.total += 1
+
+    def pop(self, previous: int):
+        """Forget the newest value as if it was never recorded, previous being the value recorded before it.
+
+        A ring buffer that wrapped around has overwritten its oldest values, which can't be brought back, so it keeps
+        one value less until the next append (previous is only needed when it keeps a single value).
+        """
+        self.total -= 1
+        if len(self._values) == 1:
+            self._values[0] = previous
+            return
+        if self._oldest != 0:
+            self._values = array("q", self)
+            self._oldest = 0
+        del self._values[-1]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __iter__(self):
+        newer, older = self.segments()
+        yield from older
+        yield from newer
+
+    def segments(self) -> Tuple[memoryview, memoryview]:
+        """Get the kept values as two views without copying, the values are the second view followed by the first"""
+        view = memoryview(self._values)
+        return view[:self._oldest], view[self._oldest:]
+
+    def first_index(self) -> int:
+        """Get the transaction number of the oldest kept value"""
+        return self.total - len(self._values)
+
+    def as_array(self):
+        """Get the kept values as a NumPy array, without copying unless the ring buffer has wrapped around"""
+        import numpy as np
+
+        newer, older = self.segments()
+        if len(newer) == 0:
+            return np.frombuffer(older, dtype=np.int64)
+        return np.concatenate((np.frombuffer(older, dtype=np.int64), np.frombuffer(newer, dtype=np.int64)))
+
+    def summary(self, points: int):
+        """Downsample the kept values into at most points buckets.
+
+        Returns the transaction number where each bucket starts and the minimum, maximum and last money of each bucket.
+        """
+        return summarize(self.as_array(), points, self.first_index())
+
+
+def summarize(values, points: int, first: int = 0):
+    """Downsample a NumPy array of money values into at most points buckets, see MoneyHistory.summary"""
+    import numpy as np
+
+    starts = np.arange(0, len(values), max(1, -(-len(values) // points)))
+    ends = np.append(starts[1:], len(values)) - 1
+    return starts + first, np.minimum.reduceat(values, starts), np.maximum.reduceat(values, starts), values[ends]
+
+
+def show_money_graph(name: str, values, first: int = 0, points: int = 2000, block: bool = False):
+    """Show a graph of a money history given as a NumPy array whose first value is transaction number first, long
+    histories are drawn as the range and last value of buckets"""
+    # Plotting libraries are slow to import, so they're only imported once a graph is shown
+    import matplotlib.pyplot as plt
+    import numpy as np
+
+    if len(values) <= points:
+        plt.plot(np.arange(first, first + len(values)), values)
+    else:
+        starts, lows, highs, lasts = summarize(values, points, first)
+        plt.fill_between(starts, lows, highs, alpha=0.3)
+        plt.plot(starts, lasts)
+    plt.title("Money History of {}".format(name))
+    plt.xlabel("Transactions")
+    plt.ylabel("Money")
+    plt.show(block=block)
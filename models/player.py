@@ -4,48 +4,71 @@
 #  file, You can obtain one at http://mozilla.org/MPL/2.0/.
 # ------------------------------------------------------------------------------
 
-import matplotlib.pyplot as plt
-import numpy as np
-
-from helpers.gvars import DEFAULTS
+from .events import *
 from .exceptions import *
+from .money_history import MoneyHistory, show_money_graph
 from .properties import Property, NormalProperty
 
 NOTFOUND_PROPERTY = "Couldn't find property {} in property list."
 
 
 class Player:
-    def __init__(self, name: str, update_money_func, update_jail_func, update_name_func, bankrupt_err_func):
+    # When True every get_networth call checks the cached net worth against a full recompute
+    check_networth = False
+
+    def __init__(self, name: str, money: int, go_money: int, listener=None, history_limit: int = None):
         self.name = name
         self.in_jail = False
         self.bankrupt_ignored = False
-        self._money = DEFAULTS.getint("money")
-        self.go_money = DEFAULTS.getint("go_money")
-        self._money_history = [self._money]
+        self._money = money
+        self.go_money = go_money
+        self._money_history = MoneyHistory(self._money, history_limit)
+        # Money plus the value of every owned property, updated by every change instead of recomputed
+        self._networth = self._money
         self.properties = []
-        self.update_money_func = update_money_func
-        self.update_jail_func = update_jail_func
-        self.update_name_func = update_name_func
-        self.bankrupt_err_func = bankrupt_err_func
+        # Number of owned properties per colour and per property type, kept up to date by every change to properties
+        self._colour_counts = {}
+        self._type_counts = {}
+        # Owned properties per rent group, so a change only invalidates the rent of the properties it affects
+        self._rent_groups = {}
+        self.listener = listener
+
+    def notify(self, event: str, **data):
+        """Send an event (see models.events) about this player to its listener, if it has one"""
+        if self.listener is not None:
+            self.listener(event, self, **data)
 
     def add_money(self, amount: int):
         """Add money to the player"""
+        old = self._money
+        # Recorded first, so an amount that isn't an int raises before anything changed
+        self._money_history.append(old + amount)
         self._money += amount
-        self._money_history.append(self._money)
-        self.update_money_func()
-        self.bankrupt_err_func(self)
+        self._networth += amount
+        self.notify(MONEY, old=old, new=self._money)
 
     def subtract_money(self, amount: int):
         """Subtract money from the player"""
+        old = self._money
+        self._money_history.append(old - amount)
         self._money -= amount
-        self._money_history.append(self._money)
-        self.update_money_func()
-        self.bankrupt_err_func(self)
+        self._networth -= amount
+        self.notify(MONEY, old=old, new=self._money)
+
+    def rollback_money(self, old: int):
+        """Take the last money change back without recording or sending anything, used to roll a failed batch back"""
+        self._networth += old - self._money
+        self._money = old
+        self._money_history.pop(old)
 
     def get_money(self) -> int:
         """Get the amount of money the player has"""
         return self._money
 
+    def get_money_history(self) -> MoneyHistory:
+        """Get the history of the player's money (read only, it's changed by every money change)"""
+        return self._money_history
+
     def add_go_money(self):
         """Adds the default go money amount"""
         self.add_money(self.go_money)
@@ -60,14 +83,14 @@ class Player:
         if self.in_jail:
             raise AlreadyChosenValue("The player is already jailed.")
         self.in_jail = True
-        self.update_jail_func()
+        self.notify(JAIL, old=False, new=True)
 
     def unjail(self):
         """Unjail the player"""
         if not self.in_jail:
             raise AlreadyChosenValue("The player is not in jail.")
         self.in_jail = False
-        self.update_jail_func()
+        self.notify(JAIL, old=True, new=False)
 
     def check_bankrupt(self) -> bool:
         """Check whether or not the user is bankrupt"""
@@ -80,40 +103,74 @@ class Player:
         if self.bankrupt_ignored:
             raise AlreadyChosenValue("Bankrupt is already being ignored.")
         self.bankrupt_ignored = True
+        self.notify(BANKRUPT_IGNORED, old=False, new=True)
 
     def unignore_bankrupt(self):
         if not self.bankrupt_ignored:
             raise AlreadyChosenValue("Bankrupt is not being ignored.")
         self.bankrupt_ignored = False
-
-    def add_property(self, prop: Property):
-        """Add a property"""
-        self.properties.append(prop)
+        self.notify(BANKRUPT_IGNORED, old=True, new=False)
+
+    def _index_property(self, prop: Property, change: int):
+        """Update the ownership counts after a property was added (change 1) or removed (change -1)"""
+        self._type_counts[type(prop)] = self._type_counts.get(type(prop), 0) + change
+        if type(prop) is NormalProperty:
+            colour = prop.group["colour"]
+            self._colour_counts[colour] = self._colour_counts.get(colour, 0) + change
+        group = self._rent_groups.setdefault(prop.rent_group, [])
+        if change > 0:
+            group.append(prop)
+        else:
+            group.remove(prop)
+        prop.invalidate_rent()
+        for owned in group:
+            owned.invalidate_rent()
+
+    def get_colour_count(self, colour: str) -> int:
+        """Get the number of normal properties of a colour the player owns"""
+        return self._colour_counts.get(colour, 0)
+
+    def get_type_count(self, prop_type: type) -> int:
+        """Get the number of properties of a type (e.g. Railroad) the player owns"""
+        return self._type_counts.get(prop_type, 0)
+
+    def add_property(self, prop: Property, index: int = None):
+        """Add a property, at the end of the property list or at an index of it"""
+        if index is None:
+            index = len(self.properties)
+        self.properties.insert(index, prop)
+        self._index_property(prop, 1)
+        self._networth += prop.get_value()
         prop.set_owner(self)
+        self.notify(PROPERTY_ADDED, prop=prop, index=index)
 
     def remove_property(self, prop: Property):
         """Remove a property"""
         try:
-            self.properties.remove(prop)
-            prop.set_owner(None)
+            index = self.properties.index(prop)
         except ValueError as e:
             raise NotFound(NOTFOUND_PROPERTY.format(prop.name)) from e
+        del self.properties[index]
+        self._index_property(prop, -1)
+        self._networth -= prop.get_value()
+        prop.set_owner(None)
+        self.notify(PROPERTY_REMOVED, prop=prop, index=index)
 
     def change_name(self, new_name: str):
         """Change the player name"""
-        self.update_name_func(self.name, new_name)
+        old_name = self.name
         self.name = new_name
+        self.notify(NAME, old=old_name, new=new_name)
 
-    def show_money_graph(self):
-        """Show a graph of the player money history"""
-        plt.plot(self._money_history)
-        plt.title("Money History of {}".format(self.name))
-        plt.xlabel("Transactions")
-        plt.ylabel("Money")
-        plt.show(block=False)
+    def show_money_graph(self, points: int = 2000):
+        """Show a graph of the player money history, long histories are drawn as the range and last value of buckets"""
+        show_money_graph(self.name, self._money_history.as_array(), self._money_history.first_index(), points)
 
     def show_property_graph(self):
         """Show a graph of which properties was stepped on how many times and how much money they made"""
+        import matplotlib.pyplot as plt
+        import numpy as np
+
         price_step_label = [[], [], []]
         # Iterate through all owned properties and add data to list
         for prop in self.properties:
@@ -153,19 +210,37 @@ class Player:
         # Show the graph
         plt.show(block=False)
 
+    def revalue_property(self, old_value: int, new_value: int):
+        """Update the net worth after the value of an owned property changed (mortgage or houses)"""
+        self._networth += new_value - old_value
+
     def get_networth(self) -> int:
         """Get networth of player"""
+        if self.check_networth and self._networth != self.compute_networth():
+            raise UnexpectedValue("Cached net worth of {} is {:,} but it should be {:,}".format(
+                self.name, self._networth, self.compute_networth()))
+        return self._networth
+
+    def compute_networth(self) -> int:
+        """Compute the networth of the player from scratch"""
         networth = self._money
         for prop in self.properties:
-            if prop.mortgaged:
-                networth -= prop.unmortgage_price
-            networth += prop.price
-            if type(prop) is NormalProperty:
-                networth += prop.houses * prop.house_price
+            networth += prop.get_value()
         return networth
 
     def transfer_all_properties(self, to: 'Player'):
         """Transfer all properties from player to another player"""
-        for prop in self.properties:
-            to.add_property(prop)
+        properties = self.properties
         self.properties = []
+        self._colour_counts = {}
+        self._type_counts = {}
+        self._rent_groups = {}
+        self._networth = self._money
+        # Every property is ownerless before the first event, so listeners never see one owned by a player that
+        # doesn't list it
+        for prop in properties:
+            prop.set_owner(None)
+        for prop in properties:
+            # Removed one after the other from the front of the list
+            self.notify(PROPERTY_REMOVED, prop=prop, index=0)
+            to.add_property(prop)
@@ -4,8 +4,10 @@
 #  file, You can obtain one at http://mozilla.org/MPL/2.0/.
 # ------------------------------------------------------------------------------
 
+from abc import ABC, abstractmethod
 from typing import Union
 
+from .events import *
 from .exceptions import *
 
 
@@ -17,11 +19,12 @@ def step_decorator(func):
         player.transfer_from(self.owner, rent)
         self.times_stepped += 1
         self.stepped_price += rent
+        self.owner.notify(STEP, prop=self, rent=rent)
 
     return wrapper
 
 
-class Property:
+class Property(ABC):
     """Represents a Monopoly Property"""
 
     def __init__(self, name: str, price_data: dict):
@@ -33,13 +36,34 @@ class Property:
         self.mortgaged = False
         self.times_stepped = 0
         self.stepped_price = 0
+        # Properties with the same rent group owned by the same player change each other's rent
+        self.rent_group = (type(self), None)
+        self._rent = None
+
+    def invalidate_rent(self):
+        """Forget the cached rent, called whenever its ownership, mortgage or houses change"""
+        self._rent = None
+
+    def get_current_rent(self) -> int:
+        """Get the rent (the multiplier for utilities) of the property as it is now, cached until it's invalidated"""
+        if self._rent is None:
+            self._rent = self.lookup_rent()
+        return self._rent
+
+    @abstractmethod
+    def lookup_rent(self) -> int:
+        """Look the current rent up in the rent table of the property"""
 
     def mortgage(self):
         """Mortgage the Property"""
         self.ownerless_check()
         if self.mortgaged:
             raise AlreadyChosenValue("The property is already mortgaged")
+        old_value = self.get_value()
         self.mortgaged = True
+        self.invalidate_rent()
+        self.owner.revalue_property(old_value, self.get_value())
+        self.owner.notify(MORTGAGE, prop=self, old=False, new=True)
         self.owner.add_money(self.mortgage_price)
 
     def unmortgage(self):
@@ -47,12 +71,23 @@ class Property:
         self.ownerless_check()
         if not self.mortgaged:
             raise AlreadyChosenValue("The property is not mortgaged")
+        old_value = self.get_value()
         self.mortgaged = False
+        self.invalidate_rent()
+        self.owner.revalue_property(old_value, self.get_value())
+        self.owner.notify(MORTGAGE, prop=self, old=True, new=False)
         self.owner.subtract_money(self.unmortgage_price)
 
+    def get_value(self) -> int:
+        """Get how much the property adds to its owner's net worth"""
+        if self.mortgaged:
+            return self.price - self.unmortgage_price
+        return self.price
+
     def set_owner(self, player):
         """Set the property owner"""
         self.owner = player
+        self.invalidate_rent()
 
     def check_owner(self, chk) -> bool:
         """Check if a player is this properties owner"""
@@ -116,8 +151,11 @@ class NormalProperty(Property):
         self.house_price = price_data["buy_house"]
         self.rent = {0: price_data["rent"], 0.5: price_data["street"], 1: price_data["1"], 2: price_data["2"],
                      3: price_data["3"], 4: price_data["4"], 5: price_data["hotel"]}
+        # Rent indexed by houses + 6 * (whether the owner has the colour set), street rent replaces the normal rent
+        self.rent_table = tuple(self.rent[houses] for houses in (0, 1, 2, 3, 4, 5, 0.5, 1, 2, 3, 4, 5))
         self.group = group
         self.houses = 0
+        self.rent_group = (NormalProperty, group["colour"])
 
     def get_rent(self, houses: Union[int, float]) -> int:
         """Get the rent for x amount of houses in this property"""
@@ -128,13 +166,13 @@ class NormalProperty(Property):
                 "Could not find rent for {} houses (0: Normal Rent, 0.5: Street, 1-4: Houses, 5: Hotel)".format(
                     houses)) from e
 
+    def get_value(self) -> int:
+        """Get how much the property and its houses add to its owner's net worth"""
+        return super().get_value() + self.houses * self.house_price
+
     def check_colour_set(self) -> bool:
         """Check whether or not the owner has the entire colour set of the property"""
-        group_count = 0
-        for prop in self.owner.properties:
-            if type(prop) is NormalProperty and prop.group["colour"] == self.group["colour"]:
-                group_count += 1
-        return group_count == self.group["count"]
+        return self.owner.get_colour_count(self.group["colour"]) == self.group["count"]
 
     def add_house(self, num: int):
         """Add houses to the property"""
@@ -144,6 +182,9 @@ class NormalProperty(Property):
         if self.houses + num > 5:
             raise LimitReached("Adding too many houses. You can add at most {} houses".format(5 - self.houses))
         self.houses += num
+        self.invalidate_rent()
+        self.owner.revalue_property(self.get_value() - self.house_price * num, self.get_value())
+        self.owner.notify(HOUSES, prop=self, old=self.houses - num, new=self.houses)
         self.owner.subtract_money(self.house_price * num)
 
     def sell_house(self, num: int):
@@ -152,15 +193,19 @@ class NormalProperty(Property):
         if self.houses - num < 0:
             raise LimitReached("Selling too many houses. You can sell at most {} houses".format(self.houses))
         self.houses -= num
-        self.owner.add_money((self.house_price / 2) * num)
+        self.invalidate_rent()
+        self.owner.revalue_property(self.get_value() + self.house_price * num, self.get_value())
+        self.owner.notify(HOUSES, prop=self, old=self.houses + num, new=self.houses)
+        self.owner.add_money(self.house_price * num // 2)
+
+    def lookup_rent(self) -> int:
+        """Look the current rent up in the rent table of the property"""
+        return self.rent_table[self.houses + 6 * self.check_colour_set()]
 
     @step_decorator
     def step_property(self):
         """Perform the action for when a user steps on the property"""
-        if self.check_colour_set() and self.houses == 0:
-            return self.get_rent(0.5)
-        else:
-            return self.get_rent(self.houses)
+        return self.get_current_rent()
 
     def get_property_info(self) -> str:
         """Return formatted string of property info"""
@@ -193,6 +238,8 @@ class Railroad(Property):
     def __init__(self, name: str, price_data: dict):
         super().__init__(name, price_data)
         self.rent = {1: price_data["1"], 2: price_data["2"], 3: price_data["3"], 4: price_data["4"]}
+        # Rent indexed by the number of railroads the owner has
+        self.rent_table = (0,) + tuple(self.rent[railroads] for railroads in (1, 2, 3, 4))
 
     def get_rent(self, railroads: int) -> int:
         """Get the rent for x amount of railroads"""
@@ -203,16 +250,19 @@ class Railroad(Property):
 
     def get_railroad_count(self) -> int:
         """Get the number of railroads the owner has"""
-        set_count = 0
-        for prop in self.owner.properties:
-            if type(prop) is Railroad:
-                set_count += 1
-        return set_count
+        return self.owner.get_type_count(Railroad)
+
+    def lookup_rent(self) -> int:
+        """Look the current rent up in the rent table of the property"""
+        railroads = self.get_railroad_count()
+        if railroads >= len(self.rent_table):
+            return self.get_rent(railroads)
+        return self.rent_table[railroads]
 
     @step_decorator
     def step_property(self):
         """Perform the action for when a user steps on the property"""
-        return self.get_rent(self.get_railroad_count())
+        return self.get_current_rent()
 
     def get_property_info(self) -> str:
         """Return formatted string of property info"""
@@ -238,6 +288,8 @@ class Utility(Property):
     def __init__(self, name: str, price_data: dict):
         super().__init__(name, price_data)
         self.rent = {1: price_data["1"], 2: price_data["2"]}
+        # Multiplier indexed by the number of utilities the owner has
+        self.rent_table = (0, self.rent[1], self.rent[2])
 
     def get_multiplier(self, utilities: int) -> int:
         """Get the rent for x amount of utilities"""
@@ -248,16 +300,19 @@ class Utility(Property):
 
     def get_utility_count(self) -> int:
         """Get the number of utilities the owner has"""
-        utility_count = 0
-        for prop in self.owner.properties:
-            if type(prop) is Utility:
-                utility_count += 1
-        return utility_count
+        return self.owner.get_type_count(Utility)
+
+    def lookup_rent(self) -> int:
+        """Look the current multiplier up in the rent table of the property"""
+        utilities = self.get_utility_count()
+        if utilities >= len(self.rent_table):
+            return self.get_multiplier(utilities)
+        return self.rent_table[utilities]
 
     @step_decorator
     def step_property(self, dice_roll: int):
         """Perform the action for when a user steps on the property"""
-        return self.get_multiplier(self.get_utility_count()) * dice_roll
+        return self.get_current_rent() * dice_roll
 
     def get_property_info(self) -> str:
         """Return formatted string of property info"""
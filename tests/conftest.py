@@ -0,0 +1,54 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import os
+import sys
+from random import Random
+
+import pytest
+
+# The program reads its defaults and data relative to the repository root, helpers.gvars even does so when imported
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(ROOT)
+sys.path.insert(0, ROOT)
+
+from engine.game import Game  # noqa: E402
+from engine.journal import session_state  # noqa: E402
+from engine.session import GameSession  # noqa: E402
+from engine.strategies import STRATEGIES  # noqa: E402
+from helpers.file import get_board  # noqa: E402
+from models import Player  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def check_networth(monkeypatch):
+    """Cross check every cached net worth against a full recompute"""
+    monkeypatch.setattr(Player, "check_networth", True)
+
+
+@pytest.fixture
+def session() -> GameSession:
+    """A session with three players"""
+    session = GameSession.from_card_set_file(1500, 200)
+    for name in ("A", "B", "C"):
+        session.add_player(name)
+    return session
+
+
+def play(session: GameSession, seed: int, rounds: int = 40):
+    """Play a simulated game on a session, every player with a different strategy"""
+    strategies = {name: STRATEGIES[strategy]() for name, strategy in zip(session.players, STRATEGIES)}
+    Game(session, get_board(), strategies, Random(seed)).play(rounds)
+
+
+def full_state(session: GameSession) -> dict:
+    """Everything a change can touch: the session state, the property order, net worths, rents and money histories"""
+    state = session_state(session)
+    state["networths"] = {name: player.get_networth() for name, player in session.players.items()}
+    state["money_histories"] = {name: (player.get_money_history().first_index(), list(player.get_money_history()))
+                                for name, player in session.players.items()}
+    state["rents"] = {prop.name: prop.get_current_rent() for prop in session.card_set if prop.owner is not None}
+    return state
@@ -0,0 +1,43 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+from conftest import play
+from engine.analytics import analyze, group_rent
+from engine.history import History
+from engine.journal import Journal, session_state
+from engine.session import GameSession
+
+
+def record_game(path: str, seed: int) -> dict:
+    """Record a seeded game (with a rename and a few undone steps) and get its final state"""
+    session = GameSession.from_card_set_file(1500, 200)
+    journal = Journal(session, path, path + ".snapshot", snapshot_every=10 ** 9)
+    for name in ("A", "B", "C"):
+        session.add_player(name)
+    history = History(session)
+    play(session, seed, rounds=150)
+    for _ in range(3):
+        history.undo()
+    session.get_player("A").change_name("Renamed")
+    journal.close()
+    return session_state(session)
+
+
+def test_totals_match_session_state(tmp_path):
+    states = [record_game(str(tmp_path / "game-{}.jsonl".format(seed)), seed) for seed in range(4)]
+    card_set = GameSession.from_card_set_file(1500, 200).card_set
+    events = sum(len((tmp_path / "game-{}.jsonl".format(seed)).read_text().splitlines()) for seed in range(4))
+
+    stats = analyze([str(tmp_path)], card_set, workers=2, chunk_size=7)
+    assert stats["games"] == 4 and stats["steps"].sum() > 0
+    assert stats["events"] == events
+    assert stats["players"] == 12
+    assert stats["bankruptcies"] == sum(player["money"] <= 0 for state in states for player in state["players"]) > 0
+    assert stats["bankrupt_timing"].sum() == stats["bankruptcies"]
+    for prop_num, prop in enumerate(card_set):
+        assert stats["steps"][prop_num] == sum(state["properties"][prop.name]["times_stepped"] for state in states)
+        assert stats["rent"][prop_num] == sum(state["properties"][prop.name]["stepped_price"] for state in states)
+    assert sum(rent for _, _, rent in group_rent(stats, card_set)) == stats["rent"].sum()
@@ -0,0 +1,66 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import numpy as np
+import pytest
+
+from conftest import play
+from engine.archive import Archive, game_columns
+from engine.session import GameSession
+from models.exceptions import *
+
+
+def played(seed: int, history_limit: int = None) -> GameSession:
+    session = GameSession.from_card_set_file(1500, 200, history_limit=history_limit)
+    for name in ("A", "B", "C"):
+        session.add_player(name)
+    play(session, seed, rounds=30)
+    return session
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "archive")
+    # The second game keeps only the newest 16 values of every money history, so its buffers have wrapped around
+    sessions = [played(1), played(2, history_limit=16)]
+    archive = Archive(path)
+    for session in sessions:
+        archive.append(game_columns(session.players, session.card_set))
+
+    reopened = Archive(path)
+    assert len(reopened) == 2
+    for game, session in enumerate(sessions):
+        assert reopened.get_players(game) == list(session.players)
+        for name, player in session.players.items():
+            history = player.get_money_history()
+            first, money = reopened.get_money(game, name)
+            assert isinstance(money, np.memmap)
+            assert first == history.first_index()
+            assert money.tolist() == list(history)
+            assert money[-1] == player.get_money()
+        names, steps, rent = reopened.get_steps(game)
+        assert names == [prop.name for prop in session.card_set]
+        assert steps.tolist() == [prop.times_stepped for prop in session.card_set]
+        assert rent.tolist() == [prop.stepped_price for prop in session.card_set]
+    history = sessions[1].get_player("A").get_money_history()
+    assert len(history) == 16 < history.total
+    with pytest.raises(NotFound):
+        reopened.get_money(0, "D")
+
+
+def test_torn_append(tmp_path):
+    path = str(tmp_path / "archive")
+    session = played(3)
+    archive = Archive(path)
+    archive.append(game_columns(session.players, session.card_set))
+    # A crash after writing the columns but before the index line leaves data behind that isn't indexed
+    with open(path + ".bin", "ab") as f:
+        f.write(b"\x01" * 100)
+
+    archive = Archive(path)
+    archive.append(game_columns(session.players, session.card_set))
+    assert len(Archive(path)) == 2
+    assert Archive(path).get_money(1, "B")[1].tolist() == list(session.get_player("B").get_money_history())
+    assert (tmp_path / "archive.bin").stat().st_size == Archive(path).games[-1]["end"] * 8
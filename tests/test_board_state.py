@@ -0,0 +1,84 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import pytest
+
+from conftest import full_state
+from engine.board_state import NO_OWNER, BoardState
+from engine.history import History
+from engine.journal import Journal, restore_session, session_state
+from engine.session import GameSession
+from models.events import HOUSES, MONEY, MORTGAGE, PROPERTY_ADDED, PROPERTY_REMOVED, STEP
+from models.exceptions import *
+
+
+@pytest.fixture
+def changed(session):
+    """A session with some properties and a board state of it after a few more moves"""
+    a = session.get_player("A")
+    for name in ("Park Place", "Boardwalk", "Reading Railroad", "Short Line", "Baltic Avenue"):
+        session.get_card(name).buy(a)
+    session.get_card("Baltic Avenue").mortgage()
+    state = BoardState.from_session(session)
+    num = state.get_prop_num
+    state.mortgage(num("Reading Railroad"))
+    state.add_house(num("Boardwalk"), 2)
+    for _ in range(3):
+        state.step_property(1, num("Boardwalk"))
+    state.buy(2, num("Mediterranean Avenue"))
+    state.transfer(num("Short Line"), 1)
+    # Given back to the bank, which resets its mortgage
+    state.owner[num("Baltic Avenue")] = NO_OWNER
+    state.mortgaged[num("Baltic Avenue")] = False
+    return session, state
+
+
+def test_apply_to_sends_every_change(changed):
+    session, state = changed
+    events = []
+    session.subscribe(lambda event, player, **data: events.append(event))
+    state.apply_to(session)
+    assert BoardState.from_session(session, state.table) == state
+    assert set(events) == {MONEY, MORTGAGE, HOUSES, STEP, PROPERTY_ADDED, PROPERTY_REMOVED}
+    assert session.get_card("Boardwalk").times_stepped == 3
+    assert session.get_card("Boardwalk").get_current_rent() == session.get_card("Boardwalk").lookup_rent()
+
+
+def test_apply_to_undo(changed):
+    session, state = changed
+    history = History(session)
+    before = full_state(session)
+    state.apply_to(session)
+    after = full_state(session)
+    history.undo()
+    # The money histories grow with the undo, everything else is back to how it was
+    undone = full_state(session)
+    del undone["money_histories"], before["money_histories"]
+    assert undone == before
+    history.redo()
+    assert session_state(session) == {"players": after["players"], "properties": after["properties"]}
+
+
+def test_apply_to_journal(changed, tmp_path):
+    session, state = changed
+    journal_path, snapshot_path = str(tmp_path / "journal.jsonl"), str(tmp_path / "snapshot.json")
+    journal = Journal(session, journal_path, snapshot_path, snapshot_every=10 ** 9)
+    journal.snapshot()
+    state.apply_to(session)
+    journal.close()
+
+    copy = GameSession.from_card_set_file(1500, 200)
+    restore_session(copy, journal_path, snapshot_path)
+    assert session_state(copy) == session_state(session)
+    assert BoardState.from_session(copy, state.table) == state
+
+
+def test_apply_to_ownerless_change(session):
+    state = BoardState.from_session(session)
+    state.times_stepped[state.get_prop_num("Boardwalk")] = 1
+    with pytest.raises(PropertyNotOwned):
+        state.apply_to(session)
+    assert session.get_card("Boardwalk").times_stepped == 0
@@ -0,0 +1,82 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import copy
+import json
+import os
+
+import pytest
+
+from helpers import card_set
+from models.exceptions import *
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Keep the compiled card sets of the tests out of the data folder"""
+    monkeypatch.setattr(card_set, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(card_set, "_compiled", {})
+    return tmp_path / "cache"
+
+
+@pytest.fixture
+def cards() -> list:
+    return card_set.load_json(card_set.edition_path(card_set.get_editions()[0]))
+
+
+def test_default_editions_are_valid():
+    for edition in card_set.get_editions():
+        assert len(card_set.load_edition(edition)) > 0
+    with pytest.raises(NotFound):
+        card_set.load_edition("nowhere")
+
+
+def test_every_problem_is_listed(cards):
+    template = card_set.load_template()
+    broken = copy.deepcopy(cards)
+    normal = next(card for card in broken if card["type"] == "normal")
+    del normal["prices"]["mortgage"]
+    normal["unknown"] = 1
+    broken[1]["name"] = broken[2]["name"]
+    broken.append({"name": "Nowhere", "type": "castle"})
+    with pytest.raises(UnexpectedValue) as e:
+        card_set.validate_card_set(broken, template, "test")
+    problems = str(e.value).split("\n")[1:]
+    assert len(problems) == 4
+    assert any("'mortgage'" in problem for problem in problems)
+    assert any("'unknown'" in problem for problem in problems)
+    assert any("same name" in problem for problem in problems)
+    assert any("'castle'" in problem for problem in problems)
+
+
+def test_colour_group_size(cards):
+    broken = [card for card in cards if card["name"] != "Boardwalk"]
+    with pytest.raises(UnexpectedValue, match="colour group"):
+        card_set.validate_card_set(broken, card_set.load_template(), "test")
+
+
+def test_invalid_json(tmp_path):
+    path = tmp_path / "cards.json"
+    path.write_text('[{"name": "Nowhere",}]')
+    with pytest.raises(UnexpectedValue, match="line 1"):
+        card_set.load_card_set(str(path))
+    with pytest.raises(NotFound):
+        card_set.load_card_set(str(tmp_path / "missing.json"))
+
+
+def test_compiled_once_per_content(cards, tmp_path, cache_dir):
+    path = tmp_path / "cards.json"
+    path.write_text(json.dumps(cards))
+    assert card_set.load_card_set(str(path)) == cards
+    assert len(os.listdir(cache_dir)) == 1
+    # A copy every call, changing it doesn't change the next one
+    card_set.load_card_set(str(path))[0]["name"] = "Changed"
+    assert card_set.load_card_set(str(path)) == cards
+
+    cards[0]["name"] = "Renamed"
+    path.write_text(json.dumps(cards, indent=1))
+    assert card_set.load_card_set(str(path))[0]["name"] == "Renamed"
+    assert len(os.listdir(cache_dir)) == 2
@@ -0,0 +1,60 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import json
+import os
+
+from helpers.error_log import ErrorLog
+from models.exceptions import *
+
+
+def raised(error: BaseException) -> tuple:
+    """Get the sys.excepthook arguments of a raised error"""
+    try:
+        raise error
+    except BaseException as e:
+        return type(e), e, e.__traceback__
+
+
+def read_records(path: str) -> list:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_close_writes_errors_and_metrics(tmp_path):
+    path = str(tmp_path / "errors.jsonl")
+    log = ErrorLog(path, rate_limit=2)
+    log.log(*raised(NotFound("No such property")))
+    for number in range(4):
+        log.log(*raised(ValueError("bad value {}".format(number))))
+    log.log(*raised(KeyError("key")))
+    log.close()
+
+    records = read_records(path)
+    errors = [record for record in records if record["level"] == "error"]
+    assert [(record["type"], record["message"]) for record in errors] == [
+        ("ValueError", "bad value 0"), ("ValueError", "bad value 1"), ("KeyError", "'key'")]
+    assert "raise error" in errors[0]["traceback"]
+    assert records[-1]["level"] == "metrics"
+    assert records[-1]["expected"] == {"NotFound": 1}
+    assert records[-1]["suppressed"] == {"ValueError": 2}
+    assert records[-1]["dropped"] == 0
+
+
+def test_rotation(tmp_path):
+    path = str(tmp_path / "errors.jsonl")
+    log = ErrorLog(path, max_bytes=2000, backups=2, rate_limit=100)
+    for number in range(40):
+        log.log(*raised(RuntimeError("error {}".format(number))))
+    log.close()
+
+    assert os.path.isfile(path + ".1") and os.path.isfile(path + ".2") and not os.path.isfile(path + ".3")
+    for name in (path, path + ".1", path + ".2"):
+        assert os.path.getsize(name) <= 2000
+    # The newest errors are in the current file, every file is in order
+    messages = [record["message"] for name in (path + ".2", path + ".1", path) for record in read_records(name)
+                if record["level"] == "error"]
+    assert messages == ["error {}".format(number) for number in range(40 - len(messages), 40)]
@@ -0,0 +1,62 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import time
+
+import pytest
+
+from conftest import play
+from engine import evaluator
+from engine.board_state import BoardState
+from helpers.file import get_board
+
+
+@pytest.fixture
+def position(session):
+    """A seeded mid game position and landing weights for it"""
+    play(session, seed=11, rounds=25)
+    weights = evaluator.landing_weights(get_board(), session.card_set, walkers=2000, turns=20)
+    name = max(session.players.values(), key=lambda player: len(player.properties)).name
+    return session, name, weights
+
+
+def test_serial_and_pool_agree(position):
+    session, name, weights = position
+    results = [evaluator.evaluate(session.players, session.card_set, name, max_depth=2, time_budget=60,
+                                  workers=workers, weights=weights) for workers in (1, 2)]
+    assert results[0] == results[1]
+    assert len(results[0]) > 1
+    assert all(depth == 2 for _, _, depth in results[0])
+    assert [value for _, value, _ in results[0]] == sorted((value for _, value, _ in results[0]), reverse=True)
+
+
+def test_time_budget(position):
+    session, name, weights = position
+    start = time.monotonic()
+    results = evaluator.evaluate(session.players, session.card_set, name, max_depth=50, time_budget=0.3, workers=1,
+                                 weights=weights)
+    # Every root move gets at least its one round score, deeper searches stop once the budget is spent
+    assert time.monotonic() - start < 5
+    assert len(results) == len(evaluator.candidate_actions(BoardState.from_session(session),
+                                                           list(session.players).index(name)))
+    assert all(1 <= depth < 50 for _, _, depth in results)
+
+    results = evaluator.evaluate(session.players, session.card_set, name, max_depth=3, time_budget=0, workers=1,
+                                 weights=weights)
+    assert all(depth == 1 for _, _, depth in results)
+
+
+def test_transposition_cache(position):
+    session, name, weights = position
+    state = BoardState.from_session(session)
+    player_num = state.get_player_num(name)
+    evaluator._init_worker(weights)
+    value = evaluator.search(state, player_num, 2, weights, time.monotonic() + 60)
+    assert (state.key(), player_num, 2) in evaluator._cache
+    # Past its deadline a search only returns if the state is in the cache
+    assert evaluator.search(state.copy(), player_num, 2, weights, 0) == value
+    with pytest.raises(evaluator._OutOfTime):
+        evaluator.search(state, player_num, 3, weights, 0)
@@ -0,0 +1,32 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+from random import Random
+
+from engine.game import Game
+from engine.history import History
+from engine.journal import session_state
+from engine.strategies import STRATEGIES
+from helpers.file import get_board
+
+
+def test_bankrupt_to_bank_can_be_undone(session):
+    a = session.get_player("A")
+    for name in ("Mediterranean Avenue", "Baltic Avenue", "Reading Railroad"):
+        session.get_card(name).buy(a)
+    session.get_card("Baltic Avenue").add_house(2)
+    session.get_card("Reading Railroad").mortgage()
+    a.subtract_money(10 ** 6)
+    game = Game(session, get_board(), {name: STRATEGIES["cautious"]() for name in session.players}, Random(0))
+    history = History(session)
+    before = session_state(session)
+
+    with session.batch():
+        game.settle(a, None)
+    assert a.properties == [] and a in game.eliminated
+    assert not session.get_card("Reading Railroad").mortgaged and session.get_card("Baltic Avenue").houses == 0
+    history.undo()
+    assert session_state(session) == before
@@ -0,0 +1,124 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import pytest
+
+from conftest import full_state, play
+from engine.history import History
+from engine.journal import Journal, restore_session, session_state
+from engine.session import GameSession
+from models.exceptions import *
+
+
+def test_undo_redo_transfer_all_properties(session):
+    a, b = session.get_player("A"), session.get_player("B")
+    for name in ("Park Place", "Reading Railroad", "Electric Company", "Baltic Avenue"):
+        session.get_card(name).buy(a)
+    for name in ("Boardwalk", "Short Line"):
+        session.get_card(name).buy(b)
+    session.get_card("Electric Company").mortgage()
+    history = History(session)
+    before = full_state(session)
+
+    session.transfer_all_properties(a, b)
+    after = full_state(session)
+    assert a.properties == []
+    assert b.get_colour_count("blue") == 2
+    assert session.get_card("Park Place").get_current_rent() == session.get_card("Park Place").lookup_rent()
+
+    history.undo()
+    assert full_state(session)["rents"] == before["rents"]
+    assert session_state(session) == session_state_of(before)
+    assert [prop.name for prop in a.properties] == ["Park Place", "Reading Railroad", "Electric Company",
+                                                    "Baltic Avenue"]
+    assert [prop.name for prop in b.properties] == ["Boardwalk", "Short Line"]
+    assert a.get_colour_count("blue") == 1 and b.get_colour_count("blue") == 1
+
+    history.redo()
+    assert session_state(session) == session_state_of(after)
+    assert full_state(session)["rents"] == after["rents"]
+
+
+def session_state_of(state: dict) -> dict:
+    return {"players": state["players"], "properties": state["properties"]}
+
+
+def test_undo_redo_game(session):
+    history = History(session)
+    states = [session_state(session)]
+    session.subscribe_changes(lambda players: states.append(session_state(session)))
+    play(session, seed=3, rounds=20)
+    steps = len(history._undo)
+    assert steps == len(states) - 1
+
+    for state in reversed(states[:-1]):
+        history.undo()
+        assert session_state(session) == state
+    assert not history.can_undo
+    for state in states[1:steps + 1]:
+        history.redo()
+        assert session_state(session) == state
+    assert not history.can_redo
+
+
+def test_new_change_clears_redo(session):
+    history = History(session)
+    a = session.get_player("A")
+    a.add_money(10)
+    history.undo()
+    assert history.can_redo
+    a.add_money(20)
+    assert not history.can_redo
+    with pytest.raises(LimitReached):
+        history.redo()
+    history.undo()
+    with pytest.raises(LimitReached):
+        history.undo()
+    assert a.get_money() == 1500
+
+
+def test_undo_inside_batch(session):
+    history = History(session)
+    session.get_player("A").add_money(10)
+    with pytest.raises(NotAuthorized):
+        with session.batch():
+            history.undo()
+    assert session.get_player("A").get_money() == 1510
+
+
+def test_undo_is_journaled(session, tmp_path):
+    journal_path, snapshot_path = str(tmp_path / "journal.jsonl"), str(tmp_path / "snapshot.json")
+    journal = Journal(session, journal_path, snapshot_path, snapshot_every=10 ** 9)
+    journal.snapshot()
+    history = History(session)
+    play(session, seed=5, rounds=10)
+    for _ in range(5):
+        history.undo()
+    history.redo()
+    journal.close()
+
+    copy = GameSession.from_card_set_file(1500, 200)
+    restore_session(copy, journal_path, snapshot_path)
+    assert session_state(copy) == session_state(session)
+
+
+def test_undo_redo_add_player(session, tmp_path):
+    journal_path, snapshot_path = str(tmp_path / "journal.jsonl"), str(tmp_path / "snapshot.json")
+    journal = Journal(session, journal_path, snapshot_path, snapshot_every=10 ** 9)
+    journal.snapshot()
+    history = History(session)
+    d = session.add_player("D")
+    d.add_money(50)
+    history.undo()
+    history.undo()
+    assert list(session.players) == ["A", "B", "C"]
+    history.redo()
+    assert session.get_player("D") is d and d.get_money() == 1500
+    journal.close()
+
+    copy = GameSession.from_card_set_file(1500, 200)
+    restore_session(copy, journal_path, snapshot_path)
+    assert session_state(copy) == session_state(session)
@@ -0,0 +1,50 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import pytest
+
+from helpers.instrument import BUCKETS, CallStats, Instrumentation
+from models import Player
+
+
+def test_call_stats():
+    stats = CallStats()
+    for elapsed in (1, 3, 100, 1000):
+        stats.add(elapsed)
+    assert (stats.count, stats.total, stats.maximum) == (4, 1104, 1000)
+    assert stats.buckets[1] == stats.buckets[2] == stats.buckets[7] == stats.buckets[10] == 1
+    assert stats.percentile(0.5) == 3
+    assert stats.percentile(1.0) == 1023
+    stats.add(1 << 60)
+    assert stats.buckets[BUCKETS - 1] == 1
+
+
+def test_patch_and_restore():
+    original = Player.get_networth
+    instrumentation = Instrumentation()
+    instrumentation.patch(Player, "get_networth")
+    player = Player("A", 1500, 200)
+    for _ in range(5):
+        assert player.get_networth() == 1500
+    instrumentation.restore()
+    player.get_networth()
+    assert Player.get_networth is original
+    stats = instrumentation.stats["Player.get_networth"]
+    assert stats.count == 5 and stats.total >= stats.maximum > 0
+    assert "Player.get_networth" in instrumentation.report()
+
+
+def test_wrap_counts_failing_calls():
+    instrumentation = Instrumentation()
+
+    def fail():
+        raise ValueError
+
+    wrapped = instrumentation.wrap("fail", fail)
+    assert wrapped.__name__ == "fail"
+    with pytest.raises(ValueError):
+        wrapped()
+    assert instrumentation.stats["fail"].count == 1
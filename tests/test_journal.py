@@ -0,0 +1,64 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import pytest
+
+from conftest import play
+from engine.journal import Journal, has_saved_session, restore_session, session_state
+from engine.session import GameSession
+
+
+def restored(journal_path, snapshot_path) -> GameSession:
+    session = GameSession.from_card_set_file(1500, 200)
+    restore_session(session, str(journal_path), str(snapshot_path))
+    return session
+
+
+@pytest.mark.parametrize("snapshot_every", [1, 50, 10 ** 9])
+def test_round_trip(session, tmp_path, snapshot_every):
+    journal_path, snapshot_path = tmp_path / "journal.jsonl", tmp_path / "snapshot.json"
+    journal = Journal(session, str(journal_path), str(snapshot_path), snapshot_every)
+    journal.snapshot()
+    play(session, seed=7)
+    session.get_player("A").change_name("Renamed")
+    journal.close()
+
+    assert has_saved_session(str(journal_path), str(snapshot_path))
+    copy = restored(journal_path, snapshot_path)
+    assert session_state(copy) == session_state(session)
+    for name, player in session.players.items():
+        assert [prop.name for prop in copy.get_player(name).properties] == [prop.name for prop in player.properties]
+        assert copy.get_player(name).get_networth() == player.get_networth()
+
+
+def test_torn_last_line(session, tmp_path):
+    journal_path, snapshot_path = tmp_path / "journal.jsonl", tmp_path / "snapshot.json"
+    journal = Journal(session, str(journal_path), str(snapshot_path), snapshot_every=10 ** 9)
+    journal.snapshot()
+    session.get_player("A").add_money(100)
+    expected = session_state(session)
+    session.get_player("B").add_money(100)
+    journal.close()
+    # A crash while writing the last record leaves half a line behind
+    content = journal_path.read_text()
+    journal_path.write_text(content[:-10])
+
+    assert session_state(restored(journal_path, snapshot_path)) == expected
+
+
+def test_journal_continues_after_restore(session, tmp_path):
+    journal_path, snapshot_path = tmp_path / "journal.jsonl", tmp_path / "snapshot.json"
+    journal = Journal(session, str(journal_path), str(snapshot_path), snapshot_every=10 ** 9)
+    journal.snapshot()
+    session.get_card("Boardwalk").buy(session.get_player("A"))
+    journal.close()
+
+    copy = restored(journal_path, snapshot_path)
+    journal = Journal(copy, str(journal_path), str(snapshot_path), snapshot_every=10 ** 9)
+    copy.get_card("Boardwalk").transfer(copy.get_player("C"))
+    journal.close()
+
+    assert restored(journal_path, snapshot_path).get_card("Boardwalk").get_owner_name() == "C"
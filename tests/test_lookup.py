@@ -0,0 +1,77 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+from random import Random
+
+import pytest
+
+from helpers.gvars import CONFIG
+from helpers.lookup import PropertyIndex
+from helpers.model import get_property
+from models.exceptions import *
+
+
+def typo(name: str, random: Random) -> str:
+    """Misspell a name by dropping, doubling, swapping and replacing characters"""
+    chars = list(name)
+    for _ in range(random.randint(1, 3)):
+        i = random.randrange(len(chars))
+        change = random.randrange(4)
+        if change == 0 and len(chars) > 1:
+            del chars[i]
+        elif change == 1:
+            chars.insert(i, chars[i])
+        elif change == 2 and i + 1 < len(chars):
+            chars[i], chars[i + 1] = chars[i + 1], chars[i]
+        else:
+            chars[i] = random.choice("abcdefghijklmnopqrstuvwxyz ")
+    return "".join(chars)
+
+
+def substring(name: str, random: Random) -> str:
+    """Get a part of a name, cut anywhere"""
+    start = random.randrange(len(name))
+    return name[start:random.randint(start + 1, len(name))]
+
+
+def partial(names: list, random: Random) -> str:
+    """Get a few words of one or two names, in any order"""
+    words = random.choice(names).split() + (random.choice(names).split() if random.random() < 0.3 else [])
+    random.shuffle(words)
+    return " ".join(words[:random.randint(1, len(words))])
+
+
+def queries(names: list, seed: int, count: int) -> list:
+    random = Random(seed)
+    result = ["", "x", "Avenue", "Railroad", "Zzzzzz", "rk Ave", "North New", "Carolina Charles"]
+    for _ in range(count):
+        kind = random.randrange(3)
+        if kind == 0:
+            result.append(typo(random.choice(names), random))
+        elif kind == 1:
+            result.append(substring(random.choice(names), random))
+        else:
+            result.append(partial(names, random))
+    return result
+
+
+def test_exact_names(session):
+    for card in session.card_set:
+        assert session.property_index.get(card.name.upper()) == (card, False)
+
+
+@pytest.mark.parametrize("min_similarity", [30, 50, 55, 60, 80])
+def test_matches_get_property(session, monkeypatch, min_similarity):
+    monkeypatch.setitem(CONFIG["DEFAULTS"], "min_prop_similarity", str(min_similarity))
+    index = PropertyIndex(session.card_set, min_similarity)
+    for query in queries([card.name for card in session.card_set], min_similarity, 400):
+        try:
+            expected = get_property(query, session.card_set)
+        except NotFound:
+            with pytest.raises(NotFound):
+                index.get(query)
+        else:
+            assert index.get(query) == expected, query
@@ -0,0 +1,55 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import pytest
+
+from models import Player
+from models.money_history import MoneyHistory
+
+
+@pytest.mark.parametrize("limit", [None, 1, 3, 10])
+def test_keeps_the_newest_values(limit):
+    history = MoneyHistory(0, limit)
+    for money in range(1, 8):
+        history.append(money)
+    expected = list(range(8))[-limit:] if limit is not None else list(range(8))
+    assert list(history) == expected
+    assert history.as_array().tolist() == expected
+    assert history.first_index() == 8 - len(expected)
+    assert history.total == 8
+
+
+@pytest.mark.parametrize("limit, popped, appended", [
+    (None, [0, 1, 2, 3], [0, 1, 2, 3, 9]),
+    (1, [3], [9]),
+    (3, [2, 3], [2, 3, 9]),
+    (4, [1, 2, 3], [1, 2, 3, 9]),
+])
+def test_pop(limit, popped, appended):
+    history = MoneyHistory(0, limit)
+    for money in range(1, 5):
+        history.append(money)
+    history.pop(3)
+    # A ring buffer that wrapped around can't bring its overwritten oldest value back
+    assert list(history) == popped
+    assert history.first_index() + len(history) == history.total == 4
+    history.append(9)
+    assert list(history) == appended
+    assert history.as_array().tolist() == appended
+
+
+def test_limit_must_be_positive():
+    with pytest.raises(ValueError):
+        MoneyHistory(0, 0)
+
+
+def test_wrong_amount_changes_nothing():
+    player = Player("A", 1500, 200)
+    for change in (player.add_money, player.subtract_money):
+        with pytest.raises(TypeError):
+            change(1.5)
+    assert player.get_money() == player.get_networth() == 1500
+    assert list(player.get_money_history()) == [1500]
@@ -0,0 +1,58 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import pytest
+
+from conftest import play
+from engine import projection
+from engine.journal import session_state
+from helpers.file import get_board, get_card_set
+
+GAMES, ROUNDS, SEED = 60, 10, 9
+
+
+@pytest.mark.parametrize("wins, games, low, high", [
+    (5, 10, 0.2366, 0.7634),
+    (0, 10, 0.0, 0.2775),
+    (10, 10, 0.7225, 1.0),
+    (50, 100, 0.4038, 0.5962),
+    (0, 0, 0.0, 1.0),
+])
+def test_wilson_interval(wins, games, low, high):
+    assert projection.wilson_interval(wins, games) == pytest.approx((low, high), abs=1e-4)
+
+
+def test_wilson_interval_narrows():
+    widths = [high - low for low, high in (projection.wilson_interval(games * 0.3, games) for games in (10, 100, 1000))]
+    assert widths == sorted(widths, reverse=True)
+    low, high = projection.wilson_interval(3, 10)
+    assert low < 0.3 < high
+
+
+def test_serial_and_pool_agree(session):
+    play(session, seed=4, rounds=15)
+    results = []
+    for workers in (1, 3):
+        run = projection.Projection(session, GAMES, ROUNDS, batch_size=7, workers=workers, seed=SEED,
+                                    card_data=get_card_set())
+        run.wait()
+        assert run.finished and run.games == GAMES
+        results.append(run.wins)
+    assert results[0] == results[1]
+    assert sum(results[0].values()) == pytest.approx(GAMES)
+
+    # The same continuations played in this process, one after the other
+    projection._init_worker(get_card_set(), get_board(), session.go_money)
+    serial = projection._play_batch(session_state(session), "cautious", SEED, 0, GAMES, ROUNDS)
+    assert serial == pytest.approx(results[0])
+
+
+def test_state_is_copied(session):
+    run = projection.Projection(session, 20, ROUNDS, batch_size=5, workers=1, seed=SEED, card_data=get_card_set())
+    session.add_player("D")
+    run.wait()
+    assert set(run.wins) == {"A", "B", "C"}
+    assert [row[0] for row in run.results()] == sorted(run.wins, key=run.wins.get, reverse=True)
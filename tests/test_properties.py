@@ -0,0 +1,58 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import pytest
+
+from conftest import play
+from models.properties import Property
+
+
+def check_rents(session):
+    for prop in session.card_set:
+        if prop.owner is not None:
+            assert prop.get_current_rent() == prop.lookup_rent(), prop.name
+
+
+def test_property_is_abstract():
+    with pytest.raises(TypeError):
+        Property("Somewhere", {"property": 100, "mortgage": 50, "unmortgage": 55})
+
+
+def test_rent_follows_ownership(session):
+    a, b = session.get_player("A"), session.get_player("B")
+    railroads = [session.get_card(name) for name in ("Reading Railroad", "Pennsylvania Railroad", "B&O Railroad",
+                                                     "Short Line")]
+    for count, railroad in enumerate(railroads, 1):
+        railroad.buy(a)
+        assert [prop.get_current_rent() for prop in railroads[:count]] == [railroad.get_rent(count)] * count
+    railroads[0].transfer(b)
+    assert [prop.get_current_rent() for prop in railroads] == [railroads[0].get_rent(1)] + \
+        [railroads[0].get_rent(3)] * 3
+
+    park_place, boardwalk = session.get_card("Park Place"), session.get_card("Boardwalk")
+    park_place.buy(a)
+    rent = park_place.get_current_rent()
+    boardwalk.buy(a)
+    assert park_place.get_current_rent() == park_place.get_rent(0.5) != rent
+    boardwalk.add_house(2)
+    assert boardwalk.get_current_rent() == boardwalk.get_rent(2)
+    check_rents(session)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_cached_rents_after_game(session, seed):
+    checked = []
+
+    def check(players):
+        check_rents(session)
+        checked.append(players)
+
+    session.subscribe_changes(check)
+    play(session, seed)
+    # Bankrupt players transfer their properties outside a batch, so the rents are also checked half way through
+    session.transfer_all_properties(*list(session.players.values())[:2])
+    check_rents(session)
+    assert len(checked) > 0
@@ -0,0 +1,57 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+from helpers.redraw import RedrawScheduler
+
+
+class FakeWidget:
+    """Stands in for a Tk widget, keeping the callbacks scheduled on it instead of running them"""
+
+    def __init__(self):
+        self.idle = []
+        self.later = []
+
+    def after_idle(self, callback):
+        self.idle.append(callback)
+
+    def after(self, ms: int, callback):
+        self.later.append((ms, callback))
+
+
+def test_marks_are_coalesced():
+    widget = FakeWidget()
+    redraws = []
+    scheduler = RedrawScheduler(widget, redraws.append, max_rate=10)
+    scheduler.mark_dirty({"A"})
+    scheduler.mark_dirty({"B"})
+    scheduler.mark_dirty({"A", "C"})
+    assert len(widget.idle) == 1 and widget.later == []
+    assert redraws == []
+    widget.idle.pop()()
+    assert redraws == [{"A", "B", "C"}]
+
+    # Within the minimum interval of the last flush, the next flush waits for the rest of it
+    scheduler.mark_dirty({"B"})
+    scheduler.mark_dirty({"C"})
+    assert widget.idle == [] and len(widget.later) == 1
+    ms, flush = widget.later.pop()
+    assert 0 < ms <= 101
+    flush()
+    assert redraws == [{"A", "B", "C"}, {"B", "C"}]
+
+
+def test_flush_without_marks():
+    widget = FakeWidget()
+    redraws = []
+    scheduler = RedrawScheduler(widget, redraws.append, max_rate=0)
+    scheduler.flush()
+    assert redraws == []
+    scheduler.mark_dirty(["A"])
+    scheduler.mark_dirty(["A"])
+    # No rate limit, always flushed when idle
+    assert len(widget.idle) == 1 and widget.later == []
+    widget.idle.pop()()
+    assert redraws == [{"A"}]
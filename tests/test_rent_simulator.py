@@ -0,0 +1,61 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import numpy as np
+import pytest
+
+from engine.rent_simulator import NORMAL_LEVELS, Board, group_tables, rent_tables, simulate_landings
+from helpers.file import get_board
+from models.properties import Railroad
+
+WALKERS, TURNS, OPPONENTS = 20000, 30, 3
+
+
+@pytest.fixture
+def simulated(session):
+    board = Board(get_board(), session.card_set)
+    landings, roll_sums = simulate_landings(board, WALKERS, TURNS, seed=5)
+    return board, landings, roll_sums
+
+
+def test_seeded_landings(simulated):
+    board, landings, roll_sums = simulated
+    assert np.array_equal(simulate_landings(board, WALKERS, TURNS, seed=5)[0], landings)
+    # Every turn is at least one move, doubles add more
+    assert WALKERS * TURNS <= landings.sum() < WALKERS * TURNS * 1.3
+    assert landings[board.types.index("go_to_jail")] == 0
+    assert landings.argmax() == board.jail
+    landed = landings > 0
+    assert np.all((roll_sums[landed] / landings[landed] >= 2) & (roll_sums[landed] / landings[landed] <= 12))
+
+
+def test_portfolio_yield(session, simulated):
+    board, landings, roll_sums = simulated
+    total_turns = WALKERS * TURNS
+    rent, expected, cost = rent_tables(board, landings, roll_sums, total_turns, OPPONENTS)
+    rows = {prop.name: row for row, prop in enumerate(board.properties)}
+    positions = {prop.name: position for position, prop in board.square_properties.items()}
+
+    for name in ("Park Place", "Boardwalk"):
+        prop = session.get_card(name)
+        row = rows[name]
+        assert rent[row].tolist() == [prop.get_rent(level) for level in NORMAL_LEVELS]
+        assert cost[row, 6] == prop.price + 5 * prop.house_price
+        assert expected[row, 6] == pytest.approx(landings[positions[name]] / total_turns * OPPONENTS * prop.get_rent(5))
+
+    for prop in (prop for prop in board.properties if type(prop) is Railroad):
+        assert rent[rows[prop.name], :4].tolist() == [prop.get_rent(count) for count in range(1, 5)]
+        assert np.isnan(rent[rows[prop.name], 4:]).all()
+
+    groups = {(group, level): (group_expected, group_cost)
+              for group, level, group_expected, group_cost in group_tables(board, expected, cost)}
+    blue_expected, blue_cost = groups[("Blue", "Hotel")]
+    assert blue_expected == pytest.approx(expected[rows["Park Place"], 6] + expected[rows["Boardwalk"], 6])
+    assert blue_cost == cost[rows["Park Place"], 6] + cost[rows["Boardwalk"], 6]
+    # Four railroads pay back faster per dollar than one
+    four = groups[("Railroads", "All Owned")]
+    one = expected[rows["Reading Railroad"], 0], cost[rows["Reading Railroad"], 0]
+    assert four[1] / four[0] < one[1] / one[0]
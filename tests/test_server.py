@@ -0,0 +1,90 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import json
+
+import pytest
+
+from engine.journal import apply_record, load_state, session_state
+from engine.server import GameServer
+from engine.session import GameSession
+from models.events import PLAYER_ADDED
+
+
+@pytest.fixture
+def server() -> GameServer:
+    """A server with one table and players A and B"""
+    server = GameServer()
+    assert server.handle_message(None, {"op": "create_table", "table": "t", "players": ["A", "B"]})["ok"]
+    return server
+
+
+def test_commands(server):
+    response = server.handle_message(None, {"id": 1, "op": "buy", "table": "t", "player": "A", "prop": "Boardwalk"})
+    assert response == {"id": 1, "ok": True, "result": None}
+    response = server.handle_message(None, {"op": "step", "table": "t", "player": "B", "prop": "Boardwalk"})
+    assert response["ok"] and response["result"] == server.tables["t"].session.get_card("Boardwalk").get_rent(0)
+    assert server.handle_message(None, {"op": "list_tables"})["result"] == ["t"]
+
+
+@pytest.mark.parametrize("message, error", [
+    ({}, "UnexpectedValue"),
+    ({"op": 1}, "UnexpectedValue"),
+    ({"op": "fly"}, "NotFound"),
+    ({"op": "buy", "player": "A", "prop": "Boardwalk"}, "UnexpectedValue"),
+    ({"op": "buy", "table": "u", "player": "A", "prop": "Boardwalk"}, "NotFound"),
+    ({"op": "buy", "table": "t", "player": "A"}, "UnexpectedValue"),
+    ({"op": "buy", "table": "t", "player": "A", "prop": "Boardwalk", "amount": "100"}, "UnexpectedValue"),
+    # JSON booleans are ints in Python but not amounts
+    ({"op": "buy", "table": "t", "player": "A", "prop": "Boardwalk", "amount": True}, "UnexpectedValue"),
+    ({"op": "transfer_money", "table": "t", "from": "A", "to": "B", "amount": 1.5}, "UnexpectedValue"),
+    ({"op": "create_table", "table": "t"}, "AlreadyChosenValue"),
+    ({"op": "create_table", "players": ["A", 2]}, "UnexpectedValue"),
+])
+def test_bad_requests(server, message, error):
+    before = session_state(server.tables["t"].session)
+    response = server.handle_message(None, dict(message, id=7))
+    assert (response["id"], response["ok"], response["error"]) == (7, False, error)
+    assert list(server.tables) == ["t"]
+    assert session_state(server.tables["t"].session) == before
+
+
+def test_failing_command_changes_nothing(server):
+    session = server.tables["t"].session
+    before = session_state(session)
+    response = server.handle_message(None, {"op": "transfer_property", "table": "t", "from": "A", "to": "B",
+                                            "prop": "Boardwalk"})
+    assert not response["ok"]
+    assert session_state(session) == before
+
+
+class Watcher:
+    """Stands in for a connection, keeping the delta lines pushed to it"""
+
+    def __init__(self):
+        self.watching = set()
+        self.lines = []
+
+    def push(self, line: bytes):
+        self.lines.append(json.loads(line))
+
+
+def test_subscriber_follows_added_players(server):
+    watcher = Watcher()
+    state = server.handle_message(watcher, {"op": "subscribe", "table": "t"})["result"]
+    client = GameSession.from_card_set_file(1500, 200)
+    load_state(client, state)
+
+    for message in ({"op": "add_player", "table": "t", "player": "C"},
+                    {"op": "transfer_money", "table": "t", "from": "A", "to": "C", "amount": 100},
+                    {"op": "buy", "table": "t", "player": "C", "prop": "Boardwalk"}):
+        assert server.handle_message(None, message)["ok"]
+    assert watcher.lines[0]["events"][0] == {"event": PLAYER_ADDED, "player": "C", "money": 1500}
+    for line in watcher.lines:
+        for event in line["events"]:
+            apply_record(client, event)
+    assert watcher.lines[-1]["version"] == server.tables["t"].version
+    assert session_state(client) == session_state(server.tables["t"].session)
@@ -0,0 +1,95 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import pytest
+
+from conftest import full_state
+from engine.session import GameSession
+from models.events import MONEY, PROPERTY_ADDED
+from models.exceptions import *
+
+
+def test_batch_notifies_once(session):
+    events = []
+    changes = []
+    session.subscribe(lambda event, player, **data: events.append(event))
+    session.subscribe_changes(changes.append)
+    a, b = session.get_player("A"), session.get_player("B")
+    with session.batch():
+        session.get_card("Boardwalk").buy(a)
+        session.transfer_money(a, b, 100)
+        assert events == []
+    assert events == [PROPERTY_ADDED, MONEY, MONEY, MONEY]
+    assert changes == [{a, b}]
+
+
+def test_batch_rollback(session):
+    a, b = session.get_player("A"), session.get_player("B")
+    for name in ("Mediterranean Avenue", "Baltic Avenue", "Reading Railroad"):
+        session.get_card(name).buy(a)
+    session.get_card("Mediterranean Avenue").add_house(1)
+    before = full_state(session)
+    events = []
+    session.subscribe(lambda event, player, **data: events.append(event))
+
+    with pytest.raises(LimitReached):
+        with session.batch():
+            session.get_card("Baltic Avenue").add_house(2)
+            session.get_card("Reading Railroad").mortgage()
+            session.get_card("Short Line").buy(a)
+            session.transfer_money(a, b, 300)
+            a.transfer_all_properties(b)
+            a.jail()
+            session.get_card("Boardwalk").buy(b)
+            session.get_card("Boardwalk").add_house(1)  # B doesn't have the colour set
+    assert events == []
+    assert full_state(session) == before
+    assert [prop.name for prop in a.properties] == ["Mediterranean Avenue", "Baltic Avenue", "Reading Railroad"]
+
+
+def test_nested_batch_rollback(session):
+    a = session.get_player("A")
+    with session.batch():
+        a.add_money(10)
+        inner = full_state(session)
+        with pytest.raises(NotFound):
+            with session.batch():
+                a.add_money(20)
+                session.get_card("Nowhere")
+        assert full_state(session) == inner
+    assert a.get_money() == 1510
+    assert list(a.get_money_history()) == [1500, 1510]
+
+
+@pytest.mark.parametrize("limit", [1, 2, 5])
+def test_batch_rollback_limited_history(limit):
+    session = GameSession.from_card_set_file(1500, 200, history_limit=limit)
+    a = session.add_player("A")
+    for amount in range(1, 5):
+        a.add_money(amount)
+    history = a.get_money_history()
+    kept = list(history)
+    with pytest.raises(RuntimeError):
+        with session.batch():
+            for amount in range(3):
+                a.subtract_money(amount)
+            raise RuntimeError
+    assert a.get_money() == a.get_networth() == 1510
+    # Values overwritten inside the batch are gone, the ones left are the newest values from before it
+    assert list(history) == kept[len(kept) - len(history):]
+    assert list(history)[-1] == 1510
+    assert history.first_index() + len(history) == history.total == 5
+
+
+def test_batch_rollback_add_player(session):
+    with pytest.raises(NotFound):
+        with session.batch():
+            session.add_player("D").add_money(10)
+            session.get_card("Nowhere")
+    assert list(session.players) == ["A", "B", "C"]
+    session.get_card("Boardwalk").buy(session.get_player("A"))
+    with pytest.raises(NotAuthorized):
+        session.remove_player("A")
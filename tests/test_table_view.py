@@ -0,0 +1,69 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+from helpers.table_view import TableView, format_value, sort_key
+
+
+class FakeTree:
+    """Stands in for a ttk.Treeview, keeping the values of its items"""
+
+    def __init__(self):
+        self.items = {}
+
+    def get_children(self):
+        return list(self.items)
+
+    def insert(self, parent, index, values):
+        self.items[len(self.items)] = values
+
+    def item(self, item, values):
+        self.items[item] = values
+
+    def delete(self, *items):
+        for item in items:
+            del self.items[item]
+
+
+def table_view(rows) -> TableView:
+    """A TableView without Tk, only its rows and tree"""
+    view = TableView.__new__(TableView)
+    view.tree = FakeTree()
+    view.rows = list(rows)
+    view._sorted_by = None
+    for row in view.rows:
+        view.tree.insert("", "end", values=[format_value(value) for value in row])
+    return view
+
+
+def test_format_value():
+    assert format_value(1234567) == "1,234,567"
+    assert format_value(2.25) == "2.2"
+    assert format_value("Boardwalk") == "Boardwalk"
+
+
+def test_sort_key():
+    values = ["b", 10, "A", 2.5, "-", 2]
+    assert sorted(values, key=sort_key) == [2, 2.5, 10, "-", "A", "b"]
+
+
+def test_sort_and_reverse():
+    view = table_view([("Boardwalk", 400), ("Baltic Avenue", 60), ("Park Place", 1350)])
+    view.sort(1)
+    assert [row[0] for row in view.rows] == ["Baltic Avenue", "Boardwalk", "Park Place"]
+    assert view.tree.items[2] == ["Park Place", "1,350"]
+    view.sort(1)
+    assert [row[0] for row in view.rows] == ["Park Place", "Boardwalk", "Baltic Avenue"]
+    view.sort(0, reverse=False)
+    assert [row[0] for row in view.rows] == ["Baltic Avenue", "Boardwalk", "Park Place"]
+
+
+def test_set_rows_keeps_order():
+    view = table_view([("Boardwalk", 400)])
+    view.sort(1, reverse=True)
+    view.set_rows([("Short Line", 200), ("Park Place", 350), ("Reading Railroad", 200)])
+    assert [row[0] for row in view.rows] == ["Park Place", "Short Line", "Reading Railroad"]
+    assert list(view.tree.items.values()) == [["Park Place", "350"], ["Short Line", "200"],
+                                              ["Reading Railroad", "200"]]
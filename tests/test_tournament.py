@@ -0,0 +1,29 @@
+# ------------------------------------------------------------------------------
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# ------------------------------------------------------------------------------
+
+import pytest
+
+from engine.tournament import run_tournament
+from models.exceptions import *
+
+
+@pytest.mark.parametrize("strategy_names, games, error", [
+    (["aggressive", "nobody"], 10, NotFound),
+    (["aggressive", "aggressive"], 10, AlreadyChosenValue),
+    (["aggressive", "cautious"], 0, LimitReached),
+])
+def test_invalid_tournaments(strategy_names, games, error):
+    with pytest.raises(error):
+        run_tournament(strategy_names, games, workers=1)
+
+
+def test_results_do_not_depend_on_workers():
+    results = [run_tournament(["aggressive", "cautious", "builder"], 12, seed=1, max_rounds=60, workers=workers)
+               for workers in (1, 3)]
+    assert results[0] == results[1]
+    assert results[0]["games"] == 12
+    assert sum(results[0]["wins"].values()) == pytest.approx(12)
+    assert all(len(networths) == 12 for networths in results[0]["networths"].values())